@@ -0,0 +1,52 @@
+"""Import time of the metra package, measured in fresh interpreters
+
+    python benchmarks/bench_import.py [repeat]
+
+Lightweight imports must not load the heavy dependencies or print
+anything. The script exits with status 1 if one of them does, or if it
+takes longer than its budget, so it can run as a check.
+"""
+import sys
+import json
+import subprocess
+
+HEAVY = ('pandas','numpy','requests')
+
+# statement, heavy modules it may load, budget in ms
+CASES = [
+    ('import metra',(),25),
+    ('from metra import Route',(),25),
+    ('from metra.constants import ROUTE_NAMES',(),25),
+    ('from metra import StaticAPI',HEAVY,None),
+]
+
+PROBE = '''
+import sys, time, json
+start = time.perf_counter()
+exec({stmt!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms':elapsed*1000,'loaded':[m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+def run(stmt:str) -> tuple[float,list[str],str]:
+    out = subprocess.run([sys.executable,'-c',PROBE.format(stmt=stmt,heavy=HEAVY)],capture_output=True,text=True,cwd='.',check=True)
+    *noise, result = out.stdout.strip().splitlines()
+    result = json.loads(result)
+    return result['ms'], result['loaded'], '\n'.join(noise)
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    failed = False
+    print(f'  {"statement":<42}{"best ms":>10}  heavy modules loaded')
+    for stmt, allowed, budget in CASES:
+        runs = [run(stmt) for _ in range(repeat)]
+        best = min(ms for ms, _, _ in runs)
+        loaded = runs[0][1]
+        problems = [f'loads {m}' for m in loaded if m not in allowed]
+        if any(noise for _, _, noise in runs):
+            problems.append('prints at import')
+        if budget is not None and best > budget:
+            problems.append(f'over {budget} ms budget')
+        failed |= bool(problems)
+        print(f'  {stmt:<42}{best:>10.1f}  {", ".join(loaded) or "-"}{"  FAIL: " + "; ".join(problems) if problems else ""}')
+    sys.exit(1 if failed else 0)
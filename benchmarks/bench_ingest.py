@@ -0,0 +1,58 @@
+"""Compare the columnar ingest engine against the legacy per-row loader
+on a synthetic "stop_times.txt"
+
+    python benchmarks/bench_ingest.py [n_rows]
+"""
+import io
+import sys
+import time
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,'.')
+from metra.ingest import read_table
+
+BASE_DT = dt.datetime(2022,8,13)
+
+def make_stop_times(n_rows:int) -> bytes:
+    rng = np.random.default_rng(0)
+    secs = np.sort(rng.integers(4*3600,26*3600,n_rows))
+    times = [f'{s//3600:02d}:{s%3600//60:02d}:{s%60:02d}' for s in secs]
+    lines = ['trip_id,arrival_time,departure_time,stop_id,stop_sequence,pickup_type,drop_off_type,center_boarding,south_boarding,bikes_allowed,notice']
+    for i,t in enumerate(times):
+        lines.append(f'BNSF_BN{i//20:04d}_V2_B, {t}, {t},STOP{i%20:02d} ,{i%20+1},0,0,0,0,1,0')
+    return ('\n'.join(lines) + '\n').encode()
+
+def legacy_stop_times(data:bytes) -> pd.DataFrame:
+    def convert(time:str):
+        time = time.strip()
+        hh, mm, ss = (int(time[:2]), int(time[3:5]), int(time[-2:]))
+        return BASE_DT + dt.timedelta(hours=hh,minutes=mm,seconds=ss)
+    df = pd.read_csv(io.BytesIO(data))
+    df.columns = list(map(lambda x: str(x).strip(),df.columns))
+    df.drop(columns=['departure_time','notice'],inplace=True)
+    df['arrival_time'] = df['arrival_time'].apply(convert)
+    df['trip_id'] = df['trip_id'].apply(lambda x : str(x).strip())
+    df['stop_id'] = df['stop_id'].apply(lambda x : str(x).strip())
+    return df
+
+def best_of(fn,repeat:int=3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    data = make_stop_times(n_rows)
+    pd.testing.assert_frame_equal(legacy_stop_times(data),read_table(data,'stop_times',base_dt=BASE_DT))
+    legacy = best_of(lambda: legacy_stop_times(data))
+    columnar = best_of(lambda: read_table(data,'stop_times',base_dt=BASE_DT))
+    print(f'stop_times.txt ({n_rows:,} rows)')
+    print(f'  legacy per-row : {legacy*1000:9.1f} ms')
+    print(f'  columnar       : {columnar*1000:9.1f} ms')
+    print(f'  speedup        : {legacy/columnar:9.1f}x')
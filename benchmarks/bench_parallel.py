@@ -0,0 +1,65 @@
+"""Compare serial table decoding with the thread and process pools of
+`metra.parallel` on synthetic feeds (offline)
+
+    python benchmarks/bench_parallel.py [scale] [workers ...]
+
+Speedups depend on the number of cores available.
+"""
+import os
+import sys
+import time
+import zipfile
+import datetime as dt
+
+import pandas as pd
+
+sys.path.insert(0,'.')
+sys.path.insert(0,'benchmarks')
+from metra.ingest import read_table
+from metra.ingest import TABLE_SPECS
+from metra.parallel import read_feeds
+from synthetic_feed import make_feed
+
+BASE_DT = dt.datetime.combine(dt.date.today(),dt.time(0,0))
+
+def serial(paths:list[str]) -> list[dict[str,pd.DataFrame]]:
+    results = []
+    for path in paths:
+        zf = zipfile.ZipFile(path)
+        results.append({name:read_table(zf,name,base_dt=BASE_DT) for name in TABLE_SPECS})
+    return results
+
+def best_of(fn,repeat:int=3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+if __name__ == '__main__':
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    worker_counts = [int(w) for w in sys.argv[2:]] or [2,4]
+    os.makedirs('/tmp/metra-bench',exist_ok=True)
+    paths = []
+    for seed in range(4):
+        path = f'/tmp/metra-bench/feed-{scale:g}-{seed}.zip'
+        if not os.path.exists(path):
+            with open(path,'wb') as fp:
+                fp.write(make_feed(scale,seed=seed))
+        paths.append(path)
+
+    print(f'scale {scale:g}, {os.cpu_count()} cpu(s)')
+    for label, feeds in (('1 feed',paths[:1]),('4 feeds',paths)):
+        expected = serial(feeds)
+        base = best_of(lambda: serial(feeds))
+        print(f'  {label}')
+        print(f'    {"serial":<16}{base*1000:9.1f} ms')
+        for executor in ('thread','process'):
+            for workers in worker_counts:
+                run = lambda: read_feeds(feeds,base_dts=[BASE_DT]*len(feeds),workers=workers,executor=executor)
+                for got, want in zip(run(),expected):
+                    for name in TABLE_SPECS:
+                        pd.testing.assert_frame_equal(got[name],want[name])
+                elapsed = best_of(run)
+                print(f'    {f"{executor} x{workers}":<16}{elapsed*1000:9.1f} ms  ({base/elapsed:.2f}x)')
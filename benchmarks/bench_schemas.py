@@ -0,0 +1,72 @@
+"""Compare construction time and retained memory of the columnar response
+collections in `metra.schemas` against the previous one-object-per-row
+classes
+
+    python benchmarks/bench_schemas.py [n_shapes] [n_trips]
+"""
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0,'.')
+from metra.schemas import Trips, Shapes
+
+class LegacyTrip:
+    def __init__(self,data:dict):
+        self.route_id = data.get('route_id','')
+        self.service_id = data.get('service_id','')
+        self.trip_id = data.get('trip_id','')
+        self.trip_headsign = data.get('trip_headsign','')
+        self.block_id = data.get('block_id','')
+        self.shape_id = data.get('shape_id','')
+        self.direction_id = data.get('direction_id',-1)
+        self.direction = 'inbound' if self.direction_id == 1 else 'outbound'
+
+class LegacyTrips:
+    def __init__(self,resp:list[dict]):
+        self.trips = [LegacyTrip(d) for d in resp]
+        column_format = "{:<20}{:<22}{:<10}{:<6}{:<6}"
+        header = column_format.format('id','headsign','direction','route','service')
+        rows = [column_format.format(t.trip_id,t.trip_headsign,t.direction,t.route_id,t.service_id) for t in self.trips]
+        self.reprdata = '\n'.join(([header,'-' * len(header)] + rows))
+
+class LegacyShape:
+    def __init__(self,data:dict):
+        self.shape_id = data.get('shape_id','')
+        self.lat = data.get('shape_pt_lat')
+        self.lon = data.get('shape_pt_lon')
+        self.sequence = data.get('shape_pt_sequence')
+
+class LegacyShapes:
+    def __init__(self,resp:list[dict]):
+        self.shapes = [LegacyShape(d) for d in resp]
+
+def make_shapes(n:int) -> list[dict]:
+    return [{'shape_id':f'SHP_{i//500}','shape_pt_lat':41.8 + i*1e-5,'shape_pt_lon':-87.6 - i*1e-5,'shape_pt_sequence':i%500 + 1} for i in range(n)]
+
+def make_trips(n:int) -> list[dict]:
+    return [{'route_id':'BNSF','service_id':f'A{i%4}','trip_id':f'BNSF_BN{i:04d}_V2_B','trip_headsign':'Chicago Union Station',
+             'block_id':f'B{i}','shape_id':f'SHP_{i%20}','direction_id':i%2} for i in range(n)]
+
+def measure(cls,resp:list[dict]) -> tuple[float,int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = cls(resp)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return elapsed, retained
+
+if __name__ == '__main__':
+    n_shapes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_trips = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    for label, resp, legacy, columnar in [
+        (f'Shapes ({n_shapes:,} rows)',make_shapes(n_shapes),LegacyShapes,Shapes),
+        (f'Trips ({n_trips:,} rows)',make_trips(n_trips),LegacyTrips,Trips),
+    ]:
+        lt, lm = measure(legacy,resp)
+        ct, cm = measure(columnar,resp)
+        print(label)
+        print(f'  legacy   : {lt*1000:8.1f} ms {lm/2**20:8.2f} MiB')
+        print(f'  columnar : {ct*1000:8.1f} ms {cm/2**20:8.2f} MiB')
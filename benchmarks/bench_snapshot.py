@@ -0,0 +1,89 @@
+"""Per-worker start time and memory of building a `StaticAPI` from
+schedule.zip versus attaching to a shared snapshot file (offline)
+
+    python benchmarks/bench_snapshot.py [scale] [workers]
+
+Workers are started with "spawn" so nothing is shared through fork. Memory
+is the proportional set size (PSS) from /proc, which splits shared pages
+between the processes mapping them.
+"""
+import io
+import os
+import sys
+import time
+import zipfile
+import datetime as dt
+import multiprocessing as mp
+from unittest import mock
+
+sys.path.insert(0,'.')
+sys.path.insert(0,'benchmarks')
+
+FEED = '/tmp/metra-bench/snapshot-feed.zip'
+SNAPSHOT = '/tmp/metra-bench/feed.snap'
+NOW = dt.datetime.combine(dt.date.today(),dt.time(12,0))
+
+def pss_mib() -> float:
+    with open('/proc/self/smaps_rollup') as fp:
+        for line in fp:
+            if line.startswith('Pss:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+def worker(mode:str,ready,release,results) -> None:
+    import metra.static
+    from metra.static import StaticAPI
+    from metra.snapshot import FeedSnapshot
+    from metra.ingest import TABLE_SPECS
+    with open(FEED,'rb') as fp:
+        data = fp.read()
+    with mock.patch.object(metra.static,'get_schedule_zip',lambda: zipfile.ZipFile(io.BytesIO(data))), \
+         mock.patch.object(metra.static,'get_last_local_publish',lambda: NOW):
+        base = pss_mib()
+        start = time.perf_counter()
+        if mode == 'build':
+            api = StaticAPI(eager=True,cache=False)
+        else:
+            api = StaticAPI(snapshot=FeedSnapshot(SNAPSHOT,categorical=mode == 'snapshot (categorical)'))
+        for name in TABLE_SPECS:
+            # touch every column so mapped pages are actually resident
+            getattr(api,name)().sum(numeric_only=True)
+        api.next_trains('R0000S10','CUS',date=NOW)
+        elapsed = time.perf_counter() - start
+        ready.release()
+        release.wait()
+        results.put((elapsed,pss_mib() - base))
+
+if __name__ == '__main__':
+    from synthetic_feed import make_feed
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    os.makedirs(os.path.dirname(FEED),exist_ok=True)
+    with open(FEED,'wb') as fp:
+        fp.write(make_feed(scale))
+
+    import metra.static
+    from metra.static import StaticAPI
+    with mock.patch.object(metra.static,'get_schedule_zip',lambda: zipfile.ZipFile(FEED)), \
+         mock.patch.object(metra.static,'get_last_local_publish',lambda: NOW):
+        start = time.perf_counter()
+        StaticAPI(eager=True,cache=False).save_snapshot(SNAPSHOT)
+        print(f'scale {scale:g}: snapshot written in {(time.perf_counter()-start)*1000:.0f} ms ({os.path.getsize(SNAPSHOT)/2**20:.1f} MiB)')
+
+    ctx = mp.get_context('spawn')
+    print(f'  {"mode":<26}{"start ms":>10}{"PSS MiB/worker":>16}  ({n_workers} workers)')
+    for mode in ('build','snapshot','snapshot (categorical)'):
+        ready, release, results = ctx.Semaphore(0), ctx.Event(), ctx.Queue()
+        procs = [ctx.Process(target=worker,args=(mode,ready,release,results)) for _ in range(n_workers)]
+        for p in procs:
+            p.start()
+        # measure while every worker is alive so shared pages are split
+        for _ in procs:
+            ready.acquire()
+        release.set()
+        out = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = sum(o[0] for o in out) / len(out)
+        pss = sum(o[1] for o in out) / len(out)
+        print(f'  {mode:<26}{elapsed*1000:>10.0f}{pss:>16.1f}')
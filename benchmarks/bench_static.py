@@ -0,0 +1,76 @@
+"""Time and memory of the main `StaticAPI` entry points on synthetic feeds
+of increasing size. Runs fully offline: the feed is generated in memory and
+handed to `StaticAPI` in place of the downloaded schedule.zip
+
+    python benchmarks/bench_static.py [scale ...]
+
+Each query is reported cold (first call on a fresh instance, so it includes
+building whatever index it needs) and warm (best of 5 later calls).
+"""
+import io
+import sys
+import time
+import zipfile
+import tracemalloc
+import datetime as dt
+from unittest import mock
+
+sys.path.insert(0,'.')
+sys.path.insert(0,'benchmarks')
+import metra.static
+from metra.static import StaticAPI
+from synthetic_feed import make_feed
+
+def measure(fn):
+    """(seconds, peak traced MiB, result) of one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+def best_of(fn,repeat:int=5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run(scale:float) -> None:
+    data = make_feed(scale)
+    now = dt.datetime.combine(dt.date.today(),dt.time(12,0))
+    patches = (
+        mock.patch.object(metra.static,'get_schedule_zip',lambda: zipfile.ZipFile(io.BytesIO(data))),
+        mock.patch.object(metra.static,'get_last_local_publish',lambda: now),
+    )
+    for p in patches:
+        p.start()
+    try:
+        elapsed, peak, api = measure(lambda: StaticAPI(eager=True,cache=False))
+        print(f'scale {scale:g}: {len(data)/2**20:.1f} MiB zip, {len(api.stop_times()):,} stop times, {len(api.shapes()):,} shape points')
+        print(f'  {"operation":<20}{"cold ms":>10}{"warm ms":>10}{"peak MiB":>10}')
+        print(f'  {"__init__ (eager)":<20}{elapsed*1000:>10.1f}{"":>10}{peak:>10.1f}')
+
+        origin, destination = 'R0000S10', 'CUS'
+        queries = {
+            'next_trains': lambda: api.next_trains(origin,destination,date=now),
+            'trips_with_stop': lambda: api.trips_with_stop(origin),
+            'upcoming_schedule': lambda: api.upcoming_schedule(date=now,start=now,end=dt.timedelta(hours=2)),
+            'trip_fare': lambda: api.trip_fare(origin,destination),
+            'stop_search': lambda: api.stop_search('r0001 stop 1',limit=10),
+        }
+        for name, fn in queries.items():
+            cold, peak, _ = measure(fn)
+            warm = best_of(fn)
+            print(f'  {name:<20}{cold*1000:>10.1f}{warm*1000:>10.2f}{peak:>10.1f}')
+    finally:
+        for p in patches:
+            p.stop()
+
+if __name__ == '__main__':
+    scales = [float(s) for s in sys.argv[1:]] or [1,10,100]
+    for scale in scales:
+        run(scale)
@@ -0,0 +1,199 @@
+"""Generate a synthetic Metra-like GTFS feed (schedule.zip)
+
+The network is a set of lines radiating out of one downtown terminal, like
+Metra's. Every size knob can be changed, and `scale` multiplies the number of
+routes so feeds from 1x to 100x the real network are easy to produce.
+
+    python benchmarks/synthetic_feed.py out.zip [scale]
+"""
+import io
+import sys
+import zipfile
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+TERMINAL = ('CUS','Chicago Union Station',41.8786,-87.6403)
+
+def _clock(seconds:np.ndarray) -> np.ndarray:
+    """Format seconds past midnight as "HH:MM:SS" (hours may exceed 23)"""
+    table = np.array([f'{s//3600:02d}:{s%3600//60:02d}:{s%60:02d}' for s in range(int(seconds.max())+1)],dtype=object)
+    return table[seconds]
+
+def make_feed(scale:float=1,routes:int=11,trips_per_route:int=70,stops_per_trip:int=20,
+              shape_points_per_stop:int=20,services:int=3,exceptions:int=4,
+              published:dt.date=None,seed:int=0) -> bytes:
+    """Build a schedule.zip in the layout `StaticAPI` reads
+
+    Params:
+    -------
+    scale : float
+        Multiplies the number of routes (and so stops, trips and shapes).
+        Defaults to `1`
+    routes : int
+        Routes at scale 1. Defaults to `11`
+    trips_per_route : int
+        Trips per route, alternating inbound/outbound. Defaults to `70`
+    stops_per_trip : int
+        Stops per trip, including the shared downtown terminal. Defaults to `20`
+    shape_points_per_stop : int
+        Shape points between consecutive stops. Defaults to `20`
+    services : int
+        Number of calendar services (weekday, saturday, sunday, then random
+        day patterns). Defaults to `3`
+    exceptions : int
+        calendar_dates exceptions per service. Defaults to `4`
+    published : Optional[datetime.date]
+        Service day the calendar is centred on. Defaults to today
+    seed : int
+        Random seed. Defaults to `0`
+
+    Returns:
+    --------
+    bytes
+        The zip archive
+    """
+    rng = np.random.default_rng(seed)
+    published = published or dt.date.today()
+    n_routes = max(1,int(round(routes*scale)))
+    n_stops = stops_per_trip - 1
+
+    # stops: line r leaves the terminal at angle theta_r, one stop every ~2.5 km
+    route_ids = np.array([f'R{r:04d}' for r in range(n_routes)],dtype=object)
+    theta = np.linspace(0,np.pi,n_routes,endpoint=False) + np.pi/2 + rng.normal(0,0.02,n_routes)
+    km = np.cumsum(rng.uniform(1.5,3.5,(n_routes,n_stops)),axis=1)
+    stop_lat = TERMINAL[2] + km*np.sin(theta)[:,None]/111.0
+    stop_lon = TERMINAL[3] - km*np.cos(theta)[:,None]/(111.0*np.cos(np.radians(TERMINAL[2])))
+    stop_ids = np.array([[f'{rid}S{s+1:02d}' for s in range(n_stops)] for rid in route_ids],dtype=object)
+    zone_idx = np.minimum(np.arange(1,stops_per_trip)*10//stops_per_trip,9)
+    zones = np.array(list('ABCDEFGHIJ'),dtype=object)
+    stops = pd.DataFrame({
+        'stop_id': np.concatenate(([TERMINAL[0]],stop_ids.ravel())),
+        'stop_name': np.concatenate(([f' {TERMINAL[1]} '],[f' {r} Stop {s+1} ' for r in route_ids for s in range(n_stops)])),
+        'stop_desc': '',
+        'stop_lat': np.concatenate(([TERMINAL[2]],stop_lat.ravel())),
+        'stop_lon': np.concatenate(([TERMINAL[3]],stop_lon.ravel())),
+        'zone_id': np.concatenate((['A'],np.tile(zones[zone_idx],n_routes))),
+        'stop_url': '',
+        'wheelchair_boarding': 1,
+    })
+
+    # calendar: weekday / saturday / sunday, then random patterns
+    patterns = [[1,1,1,1,1,0,0],[0,0,0,0,0,1,0],[0,0,0,0,0,0,1]]
+    patterns += [list(rng.integers(0,2,7)) for _ in range(max(0,services-3))]
+    patterns = np.array(patterns[:services])
+    service_ids = np.array([f'SV{i}' for i in range(services)],dtype=object)
+    start, end = published - dt.timedelta(days=30), published + dt.timedelta(days=60)
+    calendar = pd.DataFrame(patterns,columns=['monday','tuesday','wednesday','thursday','friday','saturday','sunday'])
+    calendar.insert(0,'service_id',service_ids)
+    calendar['start_date'] = start.strftime('%Y%m%d')
+    calendar['end_date'] = end.strftime('%Y%m%d')
+    offsets = rng.integers(-30,60,(services,exceptions))
+    calendar_dates = pd.DataFrame({
+        'service_id': np.repeat(service_ids,exceptions),
+        'date': [(published + dt.timedelta(days=int(d))).strftime('%Y%m%d') for d in offsets.ravel()],
+        'exception_type': rng.integers(1,3,services*exceptions),
+    }).drop_duplicates(['service_id','date'])
+
+    # trips: alternate outbound (0) / inbound (1), spread over the service day
+    n_trips = n_routes*trips_per_route
+    trip_route = np.repeat(np.arange(n_routes),trips_per_route)
+    direction = np.tile(np.arange(trips_per_route) % 2,n_routes)
+    trip_ids = np.array([f'{route_ids[r]}_T{i:05d}' for i,r in enumerate(trip_route)],dtype=object)
+    trips = pd.DataFrame({
+        'route_id': route_ids[trip_route],
+        'service_id': service_ids[rng.integers(0,services,n_trips)],
+        'trip_id': trip_ids,
+        'trip_headsign': np.where(direction == 0,[f' {r} Outbound' for r in route_ids[trip_route]],f' {TERMINAL[1]}'),
+        'block_id': '',
+        'shape_id': [f'{route_ids[r]}_SHP_{d}' for r,d in zip(trip_route,direction)],
+        'direction_id': direction,
+    })
+
+    # stop times: terminal first on outbound trips, last on inbound ones
+    path = np.concatenate((np.zeros((n_routes,1),dtype=np.int64),1 + np.arange(n_routes)[:,None]*n_stops + np.arange(n_stops)),axis=1)
+    all_stop_ids = stops['stop_id'].to_numpy()
+    seq = np.where(direction[:,None] == 0,path[trip_route],path[trip_route][:,::-1])
+    first = rng.integers(4*3600,23*3600,n_trips)
+    hops = rng.integers(3*60,6*60,(n_trips,stops_per_trip))
+    hops[:,0] = 0
+    seconds = first[:,None] + np.cumsum(hops,axis=1)
+    clock = _clock(seconds.ravel())
+    stop_times = pd.DataFrame({
+        'trip_id': np.repeat(trip_ids,stops_per_trip),
+        'arrival_time': clock,
+        'departure_time': clock,
+        'stop_id': all_stop_ids[seq.ravel()],
+        'stop_sequence': np.tile(np.arange(1,stops_per_trip+1),n_trips),
+        'pickup_type': 0,
+        'drop_off_type': 0,
+        'center_boarding': 0,
+        'south_boarding': 0,
+        'bikes_allowed': 1,
+        'notice': 0,
+    })
+
+    # shapes: points interpolated between consecutive stops, with jitter
+    lat, lon = stops['stop_lat'].to_numpy(), stops['stop_lon'].to_numpy()
+    frac = np.arange(shape_points_per_stop)/shape_points_per_stop
+    shape_frames = []
+    for d in (0,1):
+        route_path = path if d == 0 else path[:,::-1]
+        a, b = route_path[:,:-1], route_path[:,1:]
+        pts_lat = lat[a][...,None] + (lat[b]-lat[a])[...,None]*frac
+        pts_lon = lon[a][...,None] + (lon[b]-lon[a])[...,None]*frac
+        pts_lat = np.concatenate((pts_lat.reshape(n_routes,-1),lat[route_path[:,-1:]]),axis=1)
+        pts_lon = np.concatenate((pts_lon.reshape(n_routes,-1),lon[route_path[:,-1:]]),axis=1)
+        pts_lat += rng.normal(0,2e-5,pts_lat.shape)
+        n_pts = pts_lat.shape[1]
+        shape_frames.append(pd.DataFrame({
+            'shape_id': np.repeat([f'{r}_SHP_{d}' for r in route_ids],n_pts),
+            'shape_pt_lat': pts_lat.ravel(),
+            'shape_pt_lon': pts_lon.ravel(),
+            'shape_pt_sequence': np.tile(np.arange(1,n_pts+1),n_routes),
+        }))
+    shapes = pd.concat(shape_frames,ignore_index=True)
+
+    route_table = pd.DataFrame({
+        'route_id': route_ids,
+        'route_short_name': route_ids,
+        'route_long_name': [f'{r} Line' for r in route_ids],
+        'route_desc': '',
+        'agency_id': 'METRA',
+        'route_type': 2,
+        'route_color': '458900',
+        'route_url': '',
+        'route_text_color': 'FFFFFF',
+    })
+
+    # fares: every zone pair, one dollar per zone crossed
+    zi, zj = np.meshgrid(np.arange(10),np.arange(10),indexing='ij')
+    fare_ids = [f'{zones[i]}{zones[j]}' for i,j in zip(zi.ravel(),zj.ravel())]
+    fare_rules = pd.DataFrame({'fare_id': fare_ids,'route_id': '','origin_id': zones[zi.ravel()],'destination_id': zones[zj.ravel()],'contains_id': ''})
+    fare_attributes = pd.DataFrame({
+        'fare_id': fare_ids,
+        'price': 3.75 + np.abs(zi - zj).ravel(),
+        'currency_type': 'USD ',
+        'payment_method': 1,
+        'transfers': 0,
+    })
+
+    tables = {
+        'stops': stops, 'trips': trips, 'stop_times': stop_times, 'routes': route_table,
+        'shapes': shapes, 'calendar': calendar, 'calendar_dates': calendar_dates,
+        'fare_rules': fare_rules, 'fare_attributes': fare_attributes,
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer,'w',compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, df in tables.items():
+            zf.writestr(f'{name}.txt',df.to_csv(index=False))
+    return buffer.getvalue()
+
+if __name__ == '__main__':
+    out = sys.argv[1] if len(sys.argv) > 1 else 'schedule.zip'
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+    data = make_feed(scale)
+    with open(out,'wb') as fp:
+        fp.write(data)
+    print(f'wrote {out} ({len(data)/1024:,.0f} KiB, scale {scale:g})')
@@ -1,14 +1,84 @@
-from .static import StaticAPI
-from .static import stops
-from .static import trips
-from .static import shapes
-from .static import routes
-from .static import calendar
-from .static import calendar_dates
-
-from .routes import Route
-
-from .utils import get_publish_time
-from .utils import get_last_local_publish
-from .utils import update_schedule_zip
-from .utils import get_schedule_zip
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+# Public names are resolved on first access, so `import metra` (or
+# `from metra import Route`) does not pull in pandas, requests or the API
+# credentials until something actually needs them.
+_LAZY = {
+    'StaticAPI': 'static',
+    'FeedManager': 'feed',
+    'FeedSnapshot': 'snapshot',
+    'PROFILER': 'profiling',
+    'stops': 'static',
+    'trips': 'static',
+    'shapes': 'static',
+    'routes': 'static',
+    'calendar': 'static',
+    'calendar_dates': 'static',
+
+    'ScheduleClient': 'client',
+    'AsyncScheduleClient': 'client',
+    'RealtimeStore': 'realtime',
+    'RealtimePoller': 'realtime',
+
+    'Route': 'routes',
+
+    'get_publish_time': 'utils',
+    'get_last_local_publish': 'utils',
+    'update_schedule_zip': 'utils',
+    'get_schedule_zip': 'utils',
+}
+
+_SUBMODULES = (
+    'auth','cache','client','compact','constants','fares','feed','geometry','index','ingest',
+    'parallel','paths','patterns','planner','profiling','realtime','schemas','search',
+    'service','snapshot','spatial','static','utils',
+)
+
+__all__ = list(_LAZY)
+
+def _import(module:str):
+    mod = importlib.import_module(f'.{module}',__name__)
+    # importing a submodule binds it on the package; a public name spelled
+    # the same (`routes`, the table accessor of `static`) takes precedence
+    if module in _LAZY and globals().get(module) is mod:
+        del globals()[module]
+    return mod
+
+def __getattr__(name:str):
+    module = _LAZY.get(name)
+    if module is not None:
+        value = getattr(_import(module),name)
+    elif name in _SUBMODULES:
+        value = _import(name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY) | set(_SUBMODULES))
+
+if TYPE_CHECKING:
+    from .static import StaticAPI
+    from .feed import FeedManager
+    from .snapshot import FeedSnapshot
+    from .profiling import PROFILER
+    from .static import stops
+    from .static import trips
+    from .static import shapes
+    from .static import routes
+    from .static import calendar
+    from .static import calendar_dates
+
+    from .client import ScheduleClient
+    from .client import AsyncScheduleClient
+    from .realtime import RealtimeStore
+    from .realtime import RealtimePoller
+
+    from .routes import Route
+
+    from .utils import get_publish_time
+    from .utils import get_last_local_publish
+    from .utils import update_schedule_zip
+    from .utils import get_schedule_zip
@@ -1,18 +1,36 @@
+import functools
+
 from .paths import KEYS_PATH
-from .constants import METRA_API_KEY
-from .constants import METRA_SECRET_KEY
+from . import constants
+
+# Credentials are resolved on first use rather than at import time, so
+# importing the package never touches the filesystem or prints anything.
+# `METRA_API_KEY` / `METRA_SECRET_KEY` remain available as module attributes.
 
-if METRA_API_KEY == "" or METRA_SECRET_KEY == "":
-    try:
-        with open(KEYS_PATH,'r') as txt:
-            lines = txt.readlines()
-            METRA_API_KEY = lines[0].strip()
-            METRA_SECRET_KEY = lines[1].strip()
-    except:
-        print('''ERROR: You must provide your own API credentials.\n
+@functools.lru_cache(maxsize=None)
+def get_credentials() -> tuple[str,str]:
+    """(API key, secret key) from the constants in "constants.py" or, when
+    those are empty, from "keys.txt" in the package's root directory"""
+    api_key, secret_key = constants.METRA_API_KEY, constants.METRA_SECRET_KEY
+    if api_key == "" or secret_key == "":
+        try:
+            with open(KEYS_PATH,'r') as txt:
+                lines = txt.readlines()
+                api_key = lines[0].strip()
+                secret_key = lines[1].strip()
+        except:
+            print('''ERROR: You must provide your own API credentials.\n
               There are two ways of doing this:\n
-              1) Populate METRA_API_KEY & METRA_SECRET_KEY constants located 
+              1) Populate METRA_API_KEY & METRA_SECRET_KEY constants located
               in the "constants.py" file\n
               2) Create a file called "keys.txt" in the package's root directory.
               Insert the API Key on the first line and the secret key on the second
-              ''')
\ No newline at end of file
+              ''')
+    return api_key, secret_key
+
+def __getattr__(name:str):
+    if name == 'METRA_API_KEY':
+        return get_credentials()[0]
+    if name == 'METRA_SECRET_KEY':
+        return get_credentials()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
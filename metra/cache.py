@@ -0,0 +1,132 @@
+import os
+import json
+import shutil
+import hashlib
+import zipfile
+import datetime as dt
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .paths import DATA_PATH
+
+CACHE_PATH = os.path.join(DATA_PATH,'cache')
+CACHE_VERSION = 2
+
+# Parsed tables are stored as one directory per table holding a "manifest.json"
+# and one ".npy" file per column. String columns are dictionary-encoded into
+# "<col>.codes.npy" + "<col>.values.npy" so that no pickling is involved and a
+# warm start only has to memory-copy typed arrays.
+
+def feed_hash(source:Union[str,zipfile.ZipFile]=None) -> str:
+    """SHA-256 of a schedule.zip.
+
+    Params:
+    -------
+    source: Union[str,zipfile.ZipFile]
+        Path of the archive, defaults to the local schedule.zip. An open
+        `ZipFile` is hashed from the bytes it reads its members from, so the
+        hash describes exactly the feed that was loaded even if the file on
+        disk has been replaced since
+    """
+    h = hashlib.sha256()
+    if isinstance(source,zipfile.ZipFile):
+        fp = source.fp
+        if hasattr(fp,'getbuffer'):
+            h.update(fp.getbuffer())
+            return h.hexdigest()
+        pos = fp.tell()
+        try:
+            fp.seek(0)
+            for chunk in iter(lambda: fp.read(1 << 20),b''):
+                h.update(chunk)
+        finally:
+            fp.seek(pos)
+        return h.hexdigest()
+    with open(source or os.path.join(DATA_PATH,'schedule.zip'),'rb') as fp:
+        for chunk in iter(lambda: fp.read(1 << 20),b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def cache_key(published:dt.datetime,feed_hash:str=None) -> str:
+    """Cache key for a feed identified by its publish timestamp and,
+    optionally, its content hash"""
+    key = f"v{CACHE_VERSION}-{published.strftime(r'%Y%m%d%H%M%S')}"
+    if feed_hash:
+        key += f"-{feed_hash[:16]}"
+    return key
+
+def load_table(key:str,name:str) -> pd.DataFrame:
+    """Load a cached table. Returns `None` on a cache miss"""
+    folder = os.path.join(CACHE_PATH,key,name)
+    try:
+        with open(os.path.join(folder,'manifest.json'),'r') as fp:
+            manifest = json.load(fp)
+        data = {}
+        for col in manifest['columns']:
+            fname = os.path.join(folder,col['file'])
+            if col['encoding'] == 'dictionary':
+                codes = np.load(f'{fname}.codes.npy')
+                # trailing NaN so that the -1 "missing" code maps onto it
+                values = np.append(np.load(f'{fname}.values.npy').astype(object),np.nan)
+                data[col['name']] = pd.Series(values[codes],dtype=object).astype(col['dtype'])
+            else:
+                data[col['name']] = pd.Series(np.load(f'{fname}.npy'),dtype=col['dtype'])
+        return pd.DataFrame(data)
+    except (OSError,ValueError,KeyError):
+        return None
+
+def save_table(key:str,name:str,df:pd.DataFrame) -> None:
+    """Write a parsed table to the cache. The table directory is written
+    under a temporary name and renamed into place so readers never see a
+    partial table"""
+    root = os.path.join(CACHE_PATH,key)
+    folder = os.path.join(root,name)
+    if os.path.isdir(folder):
+        return
+    tmp = os.path.join(root,f'.{name}.{os.getpid()}.tmp')
+    os.makedirs(tmp,exist_ok=True)
+
+    columns = []
+    for i, (col, s) in enumerate(df.items()):
+        fname = os.path.join(tmp,f'{i:03d}')
+        if s.dtype.kind in 'biufcmM':
+            np.save(f'{fname}.npy',s.to_numpy())
+            columns.append({'name':col,'file':f'{i:03d}','dtype':str(s.dtype),'encoding':'plain'})
+        else:
+            codes, values = pd.factorize(s)
+            np.save(f'{fname}.codes.npy',codes.astype(np.int32))
+            np.save(f'{fname}.values.npy',np.asarray(values,dtype=str))
+            columns.append({'name':col,'file':f'{i:03d}','dtype':str(s.dtype),'encoding':'dictionary'})
+    with open(os.path.join(tmp,'manifest.json'),'w') as fp:
+        json.dump({'table':name,'rows':len(df),'columns':columns},fp)
+
+    try:
+        os.rename(tmp,folder)
+    except OSError:
+        # another process won the race
+        shutil.rmtree(tmp,ignore_errors=True)
+    prune_cache(older_than=key)
+
+def _published(key:str) -> str:
+    # "v<version>-<YYYYmmddHHMMSS>[-<hash>]" -> "<YYYYmmddHHMMSS>"
+    parts = key.split('-')
+    return parts[1] if len(parts) > 1 else ''
+
+def prune_cache(older_than:str=None) -> None:
+    """Remove cached feeds published before the feed of `older_than`, and
+    those written by other cache versions. Keys of the same feed (with and
+    without a content hash) and of newer feeds are kept, so a process still
+    serving an old feed never deletes the cache of a newer one. Removes
+    every cached feed when `older_than` is None"""
+    if not os.path.isdir(CACHE_PATH):
+        return
+    prefix = f"v{CACHE_VERSION}-"
+    for key in os.listdir(CACHE_PATH):
+        if older_than is None or not key.startswith(prefix) or _published(key) < _published(older_than):
+            shutil.rmtree(os.path.join(CACHE_PATH,key),ignore_errors=True)
+
+def clear_cache() -> None:
+    """Remove every cached feed"""
+    prune_cache(older_than=None)
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+
+from .schemas import Stops
+from .schemas import Trips
+from .schemas import Shapes
+from .schemas import Routes
+from .schemas import Calendars
+from .constants import METRA_BASE
+from .auth import get_credentials
+
+# endpoint name -> response wrapper (None = raw JSON)
+ENDPOINTS = {
+    'stops': Stops,
+    'trips': Trips,
+    'shapes': Shapes,
+    'routes': Routes,
+    'calendar': Calendars,
+    'calendar_dates': None,
+}
+
+class ScheduleClient:
+    """Pooled HTTP client for the GTFS-Static schedule REST endpoints.
+
+    One `requests.Session` is shared across calls so TLS connections are
+    kept alive and reused. Idempotent requests are retried with backoff, and
+    responses are revalidated with `If-None-Match` / `If-Modified-Since` so an
+    unchanged endpoint costs a 304 instead of a full download.
+
+    Params:
+    -------
+    base : str
+        API root. Defaults to `METRA_BASE`
+    auth : Optional[requests.auth.AuthBase]
+        Defaults to basic auth with the configured API keys
+    timeout : float | tuple[float, float]
+        Connect/read timeout in seconds. Defaults to `(5, 30)`
+    retries : int
+        Retries on connection errors and 429/5xx responses. Defaults to `3`
+    backoff : float
+        Exponential backoff factor between retries. Defaults to `0.5`
+    pool_size : int
+        Maximum kept-alive connections. Defaults to `len(ENDPOINTS)`
+    """
+    def __init__(self,base:str=METRA_BASE,auth=None,timeout=(5,30),retries:int=3,backoff:float=0.5,pool_size:int=len(ENDPOINTS)):
+        self.base = base.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.auth = auth if auth is not None else HTTPBasicAuth(*get_credentials())
+        retry = Retry(total=retries,backoff_factor=backoff,status_forcelist=(429,500,502,503,504),allowed_methods=['GET'])
+        adapter = HTTPAdapter(pool_connections=pool_size,pool_maxsize=pool_size,max_retries=retry)
+        self.session.mount('http://',adapter)
+        self.session.mount('https://',adapter)
+        self.__validators: dict[str,tuple[str,str,object]] = {}
+        self.__lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc):
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def get_json(self,endpoint:str):
+        """GET `<base>/schedule/<endpoint>` and decode the JSON body. A 304
+        response returns the previously downloaded body"""
+        url = f'{self.base}/schedule/{endpoint}'
+        headers = {}
+        cached = self.__validators.get(url)
+        if cached is not None:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        resp = self.session.get(url,headers=headers,timeout=self.timeout)
+        if resp.status_code == 304 and cached is not None:
+            return cached[2]
+        resp.raise_for_status()
+        data = resp.json()
+        etag, last_modified = resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self.__lock:
+                self.__validators[url] = (etag,last_modified,data)
+        return data
+
+    def fetch(self,endpoint:str):
+        """Fetch an endpoint and wrap it in its response class"""
+        wrapper = ENDPOINTS[endpoint]
+        data = self.get_json(endpoint)
+        return data if wrapper is None else wrapper(data)
+
+    def fetch_all(self,endpoints:list[str]=None) -> dict:
+        """Fetch several endpoints concurrently (all of them by default)"""
+        endpoints = list(endpoints or ENDPOINTS)
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+            return dict(zip(endpoints,pool.map(self.fetch,endpoints)))
+
+    def stops(self) -> Stops:
+        return self.fetch('stops')
+
+    def trips(self) -> Trips:
+        return self.fetch('trips')
+
+    def shapes(self) -> Shapes:
+        return self.fetch('shapes')
+
+    def routes(self) -> Routes:
+        return self.fetch('routes')
+
+    def calendar(self) -> Calendars:
+        return self.fetch('calendar')
+
+    def calendar_dates(self) -> list[dict]:
+        return self.fetch('calendar_dates')
+
+class AsyncScheduleClient:
+    """asyncio front-end for `ScheduleClient`.
+
+    Requests run on the pooled session in a thread pool sized to the
+    connection pool, so `fetch_all` issues every endpoint at once with
+    `asyncio.gather`. Takes the same parameters as `ScheduleClient`.
+    """
+    def __init__(self,**kwargs):
+        self.client = ScheduleClient(**kwargs)
+        self.__executor = ThreadPoolExecutor(max_workers=kwargs.get('pool_size',len(ENDPOINTS)))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self,*exc):
+        self.close()
+
+    def close(self) -> None:
+        self.__executor.shutdown(wait=False)
+        self.client.close()
+
+    async def fetch(self,endpoint:str):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor,self.client.fetch,endpoint)
+
+    async def fetch_all(self,endpoints:list[str]=None) -> dict:
+        endpoints = list(endpoints or ENDPOINTS)
+        results = await asyncio.gather(*(self.fetch(e) for e in endpoints))
+        return dict(zip(endpoints,results))
+
+_default_client = None
+_default_lock = threading.Lock()
+
+def default_client() -> ScheduleClient:
+    """Shared client used by the module-level endpoint functions"""
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = ScheduleClient()
+    return _default_client
@@ -0,0 +1,122 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+# Compact representation of the two largest tables:
+#   * id columns become categoricals, and `trip_id` / `stop_id` share one
+#     dictionary across stops, trips and stop_times so their codes line up
+#   * `arrival_time` becomes int32 seconds since the start of the service day,
+#     with `MISSING_SECONDS` standing in for a missing (NaT) time
+#   * `stop_sequence`, `direction_id` and the flag columns use the smallest
+#     integer type that holds them
+COMPACT_TABLES = ('trips','stop_times')
+ID_COLUMNS = {
+    'trips': ['route_id','service_id','trip_id','trip_headsign','shape_id'],
+    'stop_times': ['trip_id','stop_id'],
+}
+TIME_COLUMNS = {'stop_times': ['arrival_time']}
+MISSING_SECONDS = np.iinfo(np.int32).min
+
+def missing_times(values:np.ndarray) -> np.ndarray:
+    """Mask of the missing entries of a time column in either form"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return values == MISSING_SECONDS
+    return np.isnat(values)
+
+def _smallest_int(values:np.ndarray) -> np.dtype:
+    if not len(values):
+        return np.dtype(np.int8)
+    lo, hi = values.min(), values.max()
+    for dtype in (np.int8,np.int16,np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+def _dictionary(*columns:pd.Series) -> pd.CategoricalDtype:
+    values = pd.unique(pd.concat([c.dropna() for c in columns],ignore_index=True))
+    return pd.CategoricalDtype(pd.Index(values).sort_values())
+
+class CompactFeed:
+    """Encoder/decoder between the regular and compact forms of `trips` and
+    `stop_times`.
+
+    Params:
+    -------
+    stops : pd.DataFrame
+        The stops dataset, whose ids seed the shared `stop_id` dictionary
+    trips : pd.DataFrame
+        The trips dataset
+    stop_times : pd.DataFrame
+        The stop times dataset
+    base_dt : datetime.datetime
+        Service day `arrival_time` is anchored to
+    """
+    def __init__(self,stops:pd.DataFrame,trips:pd.DataFrame,stop_times:pd.DataFrame,base_dt:dt.datetime):
+        self.base_dt = pd.Timestamp(base_dt)
+        self.dictionaries: dict[str,pd.CategoricalDtype] = {
+            'trip_id': _dictionary(trips['trip_id'],stop_times['trip_id']),
+            'stop_id': _dictionary(stops['stop_id'],stop_times['stop_id']),
+        }
+        for col in ID_COLUMNS['trips']:
+            if col not in self.dictionaries:
+                self.dictionaries[col] = _dictionary(trips[col])
+        self.__dictionary_values: dict[str,np.ndarray] = {}
+        self.__dtypes = {'trips':trips.dtypes.to_dict(),'stop_times':stop_times.dtypes.to_dict()}
+
+    def encode(self,name:str,df:pd.DataFrame) -> pd.DataFrame:
+        """Compact form of a `COMPACT_TABLES` table"""
+        data = {}
+        for col, s in df.items():
+            if col in ID_COLUMNS[name]:
+                data[col] = s.astype(self.dictionaries[col])
+            elif col in TIME_COLUMNS.get(name,()):
+                seconds = (s - self.base_dt) // pd.Timedelta(seconds=1)
+                data[col] = seconds.fillna(MISSING_SECONDS).to_numpy().astype(np.int32)
+            elif s.dtype.kind in 'iub':
+                values = s.to_numpy()
+                data[col] = values.astype(_smallest_int(values))
+            else:
+                data[col] = s
+        return pd.DataFrame(data,index=df.index)
+
+    def decode(self,name:str,df:pd.DataFrame) -> pd.DataFrame:
+        """Regular form of (rows of) a compact table"""
+        dtypes = self.__dtypes[name]
+        data = {}
+        for col, s in df.items():
+            dtype = dtypes[col]
+            if col in TIME_COLUMNS.get(name,()):
+                data[col] = self.datetimes(s.to_numpy())
+            elif isinstance(s.dtype,pd.CategoricalDtype):
+                # take from the dictionary directly, -1 (missing) maps to the
+                # trailing NaN
+                values = self.__values(col)
+                data[col] = pd.array(values[s.cat.codes.to_numpy()],dtype=dtype)
+            elif isinstance(dtype,np.dtype):
+                data[col] = s.to_numpy().astype(dtype,copy=False)
+            else:
+                data[col] = s.astype(dtype)
+        return pd.DataFrame(data,index=df.index,copy=False)
+
+    def __values(self,col:str) -> np.ndarray:
+        values = self.__dictionary_values.get(col)
+        if values is None:
+            categories = self.dictionaries[col].categories.to_numpy(dtype=object)
+            values = self.__dictionary_values[col] = np.append(categories,np.nan)
+        return values
+
+    def datetimes(self,seconds:np.ndarray) -> np.ndarray:
+        """Decode compact time values to the regular datetime64 values"""
+        dtype = self.__dtypes['stop_times']['arrival_time']
+        seconds = np.asarray(seconds)
+        values = np.datetime64(self.base_dt.to_datetime64(),'s').astype(dtype) + seconds.astype('timedelta64[s]').astype(f'timedelta64[{np.datetime_data(dtype)[0]}]')
+        values[seconds == MISSING_SECONDS] = np.datetime64('NaT')
+        return values
+
+    def seconds(self,t) -> int:
+        """Seconds since the start of the service day, as stored in compact
+        time columns"""
+        return int(np.floor((pd.Timestamp(t) - self.base_dt) / pd.Timedelta(seconds=1)))
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+class FareTable:
+    """Zone-to-zone fare matrix and stop-to-zone mapping for a feed.
+
+    Fares only depend on the origin and destination zones, so every rule is
+    resolved once into a dense `zones x zones` price matrix. Pricing a batch
+    of stop pairs is then two array lookups.
+
+    Params:
+    -------
+    stops : pd.DataFrame
+        The stops dataset (see `StaticAPI.stops()`)
+    fare_rules : pd.DataFrame
+        The fare rules dataset (see `StaticAPI.fare_rules()`)
+    fare_attributes : pd.DataFrame
+        The fare attributes dataset (see `StaticAPI.fare_attributes()`)
+    """
+    def __init__(self,stops:pd.DataFrame,fare_rules:pd.DataFrame,fare_attributes:pd.DataFrame):
+        zones = pd.Index(pd.unique(pd.concat([stops['zone_id'],fare_rules['origin_id'],fare_rules['destination_id']])))
+        self.zone_ids = zones
+
+        # the first matching rule wins, as with a row-by-row lookup
+        rules = fare_rules.drop_duplicates(['origin_id','destination_id'])
+        prices = rules['fare_id'].map(fare_attributes.drop_duplicates('fare_id').set_index('fare_id')['price'])
+        self.prices = np.full((len(zones),len(zones)),np.nan)
+        self.prices[zones.get_indexer(rules['origin_id']),zones.get_indexer(rules['destination_id'])] = prices.to_numpy(dtype=float)
+
+        self.stop_ids = pd.Index(stops['stop_id'])
+        self.stop_zones = zones.get_indexer(stops['zone_id'])
+
+    def zone(self,stop_id:str) -> str:
+        """Get the fare zone of a stop"""
+        return self.zone_ids[self.stop_zones[self.stop_ids.get_loc(stop_id)]]
+
+    def price(self,origin:str,destination:str) -> float:
+        """Get the fare between two stops"""
+        price = self.prices[self.stop_zones[self.stop_ids.get_loc(origin)],self.stop_zones[self.stop_ids.get_loc(destination)]]
+        if np.isnan(price):
+            raise KeyError(f"No fare rule from '{origin}' to '{destination}'")
+        return price
+
+    def prices_for(self,origins:list[str],destinations:list[str]) -> np.ndarray:
+        """Get the fares for aligned arrays of origin and destination stops.
+        Unknown stops or zone pairs without a rule are priced as NaN"""
+        o = self.stop_ids.get_indexer(origins)
+        d = self.stop_ids.get_indexer(destinations)
+        valid = (o >= 0) & (d >= 0)
+        out = np.full(len(o),np.nan)
+        out[valid] = self.prices[self.stop_zones[o[valid]],self.stop_zones[d[valid]]]
+        return out
+
+    def matrix(self) -> pd.DataFrame:
+        """Get the full stop x stop fare matrix"""
+        z = self.stop_zones
+        return pd.DataFrame(self.prices[np.ix_(z,z)],index=self.stop_ids,columns=self.stop_ids)
@@ -0,0 +1,110 @@
+import logging
+import threading
+import datetime as dt
+from typing import Callable
+
+from .static import StaticAPI
+from .utils import update_schedule_zip
+
+logger = logging.getLogger(__name__)
+
+class FeedManager:
+    """Keeps an always-current `StaticAPI` snapshot for long-running services.
+
+    A background thread polls the feed's publish timestamp every `interval`
+    seconds. When a new feed is published (or the service day rolls over) a
+    complete `StaticAPI`, with every table loaded and every index built, is
+    prepared off the request path and then published with a single reference
+    assignment. Queries that already hold the previous snapshot finish
+    against it undisturbed.
+
+    Attribute access falls through to the current snapshot, so
+    `manager.next_trains(...)` is the same as `manager.snapshot.next_trains(...)`.
+
+    Params:
+    -------
+    interval : float
+        Seconds between publish checks. Defaults to `900`
+    on_update : Optional[Callable[[StaticAPI], None]]
+        Called with each newly published snapshot
+    **kwargs
+        Passed to `StaticAPI` (`eager=True` is the default)
+    """
+    def __init__(self,interval:float=900,on_update:Callable[[StaticAPI],None]=None,**kwargs):
+        self.interval = interval
+        self.on_update = on_update
+        self.__kwargs = dict({'eager':True},**kwargs)
+        self.__snapshot: StaticAPI = None
+        self.__service_date: dt.date = None
+        self.__stop = threading.Event()
+        self.__thread: threading.Thread = None
+        self.__refresh_lock = threading.Lock()
+
+    def __getattr__(self,name:str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.snapshot,name)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self,*exc):
+        self.stop()
+
+    @property
+    def snapshot(self) -> StaticAPI:
+        """The current immutable snapshot (built synchronously on first use
+        if the manager has not been started)"""
+        snapshot = self.__snapshot
+        if snapshot is None:
+            self.refresh()
+            snapshot = self.__snapshot
+        return snapshot
+
+    def refresh(self,force:bool=False) -> bool:
+        """Check for a new feed and swap in a new snapshot if there is one
+
+        Returns:
+        --------
+        bool
+            Whether a new snapshot was published
+        """
+        with self.__refresh_lock:
+            changed = update_schedule_zip()
+            today = dt.date.today()
+            if not (force or changed or self.__snapshot is None or self.__service_date != today):
+                return False
+            snapshot = StaticAPI(**self.__kwargs)
+            # indexes are otherwise built by the first queries after the swap
+            snapshot.warm(dt.datetime.now())
+            self.__snapshot = snapshot
+            self.__service_date = today
+        logger.info('published new StaticAPI snapshot (feed changed: %s)',changed)
+        if self.on_update is not None:
+            self.on_update(snapshot)
+        return True
+
+    def start(self) -> None:
+        """Build the first snapshot and start polling in a daemon thread"""
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        self.snapshot
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run,name='metra-feed-refresh',daemon=True)
+        self.__thread.start()
+
+    def stop(self,timeout:float=None) -> None:
+        """Stop polling"""
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+            self.__thread = None
+
+    def __run(self) -> None:
+        while not self.__stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                # keep serving the current snapshot and try again next interval
+                logger.exception('feed refresh failed')
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+
+from .spatial import EARTH_RADIUS_M
+from .spatial import haversine
+
+# points x segments compared in one block while projecting; small enough
+# that the temporaries stay in cache
+BLOCK_SIZE = 131_072
+
+class ShapeGeometry:
+    """Packed shape geometries for linear referencing.
+
+    Points of every shape are stored in contiguous coordinate arrays ordered
+    by `shape_pt_sequence`, with `offsets[i]:offsets[i+1]` holding shape `i`,
+    `sequences` the points' original `shape_pt_sequence` and `distances` the
+    cumulative haversine distance in meters from the first point of its
+    shape.
+
+    Params:
+    -------
+    shapes : pd.DataFrame
+        The shapes dataset (see `StaticAPI.shapes()`)
+    """
+    def __init__(self,shapes:pd.DataFrame):
+        df = shapes.sort_values(['shape_id','shape_pt_sequence'],kind='stable')
+        codes, shape_ids = pd.factorize(df['shape_id'],sort=True)
+        self.shape_ids = np.asarray(shape_ids,dtype=object)
+        self.shape_lookup: dict[str,int] = {s:i for i,s in enumerate(self.shape_ids)}
+        self.offsets = np.searchsorted(codes,np.arange(len(shape_ids)+1))
+        self.lats = df['shape_pt_lat'].to_numpy(dtype=float)
+        self.lons = df['shape_pt_lon'].to_numpy(dtype=float)
+        self.sequences = df['shape_pt_sequence'].to_numpy()
+
+        step = haversine(self.lats[:-1],self.lons[:-1],self.lats[1:],self.lons[1:])
+        step[codes[1:] != codes[:-1]] = 0
+        self.distances = np.concatenate(([0.0],np.cumsum(step)))
+        self.distances -= np.repeat(self.distances[self.offsets[:-1]],np.diff(self.offsets))
+
+    def __len__(self) -> int:
+        return len(self.shape_ids)
+
+    def __slice(self,shape_id:str) -> slice:
+        code = self.shape_lookup.get(shape_id)
+        if code is None:
+            raise KeyError(shape_id)
+        return slice(self.offsets[code],self.offsets[code+1])
+
+    def coords(self,shape_id:str) -> tuple[np.ndarray,np.ndarray]:
+        """Latitudes and longitudes of a shape's points, in sequence order"""
+        s = self.__slice(shape_id)
+        return self.lats[s], self.lons[s]
+
+    def length(self,shape_id:str) -> float:
+        """Length of a shape in meters"""
+        s = self.__slice(shape_id)
+        return float(self.distances[s.stop - 1]) if s.stop > s.start else 0.0
+
+    def project(self,shape_id:str,lats,lons) -> tuple[np.ndarray,np.ndarray,np.ndarray]:
+        """Snap points onto a shape
+
+        Every point is compared against every segment of the shape at once
+        (in blocks of `BLOCK_SIZE` pairs) on a local flat projection,
+        and assigned to the segment it is closest to.
+
+        Params:
+        -------
+        shape_id : str
+            Shape to project onto
+        lats : array-like
+            Latitudes in degrees
+        lons : array-like
+            Longitudes in degrees, aligned with `lats`
+
+        Returns:
+        --------
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            Distance along the shape in meters, distance from the shape in
+            meters and the index of the matched segment
+        """
+        s = self.__slice(shape_id)
+        lats = np.asarray(lats,dtype=float).ravel()
+        lons = np.asarray(lons,dtype=float).ravel()
+        shape_lats, shape_lons, cum = self.lats[s], self.lons[s], self.distances[s]
+        if len(shape_lats) < 2:
+            offset = haversine(lats,lons,shape_lats[:1],shape_lons[:1]) if len(shape_lats) else np.full(len(lats),np.nan)
+            return np.zeros(len(lats)), offset, np.zeros(len(lats),dtype=np.intp)
+
+        scale = np.cos(np.radians(shape_lats.mean()))
+        sx = np.radians(shape_lons) * EARTH_RADIUS_M * scale
+        sy = np.radians(shape_lats) * EARTH_RADIUS_M
+        px = np.radians(lons) * EARTH_RADIUS_M * scale
+        py = np.radians(lats) * EARTH_RADIUS_M
+        ax, ay = sx[:-1], sy[:-1]
+        dx, dy = sx[1:] - ax, sy[1:] - ay
+        seg_len2 = dx*dx + dy*dy
+        inv_len2 = np.divide(1.0,seg_len2,out=np.zeros_like(seg_len2),where=seg_len2 > 0)
+
+        missing = ~(np.isfinite(px) & np.isfinite(py))
+        px, py = np.where(missing,0,px), np.where(missing,0,py)
+        segment = np.zeros(len(lats),dtype=np.intp)
+        frac = np.zeros(len(lats))
+        block = max(1,BLOCK_SIZE // len(ax))
+        for start in range(0,len(lats),block):
+            # ex, ey: offset from each point to its closest point on each segment
+            ex = ax - px[start:start+block,None]
+            ey = ay - py[start:start+block,None]
+            t = ex * dx
+            t += ey * dy
+            t *= -inv_len2
+            np.clip(t,0,1,out=t)
+            ex += t * dx
+            ey += t * dy
+            ex *= ex
+            ey *= ey
+            ex += ey
+            best = ex.argmin(axis=1)
+            segment[start:start+block] = best
+            frac[start:start+block] = t[np.arange(len(best)),best]
+
+        along = cum[segment] + frac * (cum[segment+1] - cum[segment])
+        snapped_lat = shape_lats[segment] + frac * (shape_lats[segment+1] - shape_lats[segment])
+        snapped_lon = shape_lons[segment] + frac * (shape_lons[segment+1] - shape_lons[segment])
+        offset = haversine(lats,lons,snapped_lat,snapped_lon)
+        along[missing] = np.nan
+        return along, offset, segment
+
+    def project_batch(self,shape_ids,lats,lons) -> tuple[np.ndarray,np.ndarray]:
+        """Snap points that each belong to their own shape (e.g. pings from
+        many vehicles). Points are grouped by shape and each group is projected
+        in one step
+
+        Returns:
+        --------
+        tuple[numpy.ndarray, numpy.ndarray]
+            Distance along and distance from the shape in meters. Points on
+            unknown shapes get `NaN`
+        """
+        lats = np.asarray(lats,dtype=float).ravel()
+        lons = np.asarray(lons,dtype=float).ravel()
+        along = np.full(len(lats),np.nan)
+        offset = np.full(len(lats),np.nan)
+        codes, uniques = pd.factorize(pd.Series(shape_ids,dtype=object))
+        order = np.argsort(codes,kind='stable')
+        bounds = np.searchsorted(codes[order],np.arange(len(uniques)+1))
+        for i, shape_id in enumerate(uniques):
+            if shape_id not in self.shape_lookup:
+                continue
+            rows = order[bounds[i]:bounds[i+1]]
+            along[rows], offset[rows], _ = self.project(shape_id,lats[rows],lons[rows])
+        return along, offset
+
+    def stop_distances(self,shape_id:str,lats,lons) -> np.ndarray:
+        """Distance along a shape of a trip's stops, given in visiting order.
+        Distances never decrease, so a stop that snaps to an earlier part of
+        a looping shape is held at the previous stop's distance"""
+        along, _, _ = self.project(shape_id,lats,lons)
+        return np.fmax.accumulate(along) if len(along) else along
+
+    def simplify(self,shape_id:str,tolerance_m:float) -> np.ndarray:
+        """Douglas-Peucker simplification of a shape
+
+        Params:
+        -------
+        shape_id : str
+            Shape to simplify
+        tolerance_m : float
+            Largest allowed deviation from the original line in meters
+
+        Returns:
+        --------
+        numpy.ndarray
+            Positions (within the shape) of the points to keep
+        """
+        s = self.__slice(shape_id)
+        lats, lons = self.lats[s], self.lons[s]
+        n = len(lats)
+        if n < 3:
+            return np.arange(n)
+        scale = np.cos(np.radians(lats.mean()))
+        x = np.radians(lons) * EARTH_RADIUS_M * scale
+        y = np.radians(lats) * EARTH_RADIUS_M
+
+        keep = np.zeros(n,dtype=bool)
+        keep[[0,n-1]] = True
+        stack = [(0,n-1)]
+        while stack:
+            i, j = stack.pop()
+            if j - i < 2:
+                continue
+            dx, dy = x[j] - x[i], y[j] - y[i]
+            px, py = x[i+1:j] - x[i], y[i+1:j] - y[i]
+            len2 = dx*dx + dy*dy
+            t = np.clip((px*dx + py*dy) / len2,0,1) if len2 > 0 else np.zeros(len(px))
+            dist = np.hypot(px - t*dx,py - t*dy)
+            k = int(np.argmax(dist))
+            if dist[k] > tolerance_m:
+                k += i + 1
+                keep[k] = True
+                stack.append((i,k))
+                stack.append((k,j))
+        return np.flatnonzero(keep)
+
+    def simplified(self,tolerance_m:float) -> pd.DataFrame:
+        """Every shape simplified with `simplify`, in the layout of the shapes
+        dataset (useful for rendering). Kept points retain their original
+        `shape_pt_sequence`, so they can be joined back to the shapes dataset"""
+        rows = np.concatenate(
+            [self.simplify(shape_id,tolerance_m) + self.offsets[i] for i, shape_id in enumerate(self.shape_ids)]
+            + [np.empty(0,dtype=np.intp)]
+        )
+        codes = np.searchsorted(self.offsets,rows,side='right') - 1
+        return pd.DataFrame({
+            'shape_id': self.shape_ids[codes],
+            'shape_pt_lat': self.lats[rows],
+            'shape_pt_lon': self.lons[rows],
+            'shape_pt_sequence': self.sequences[rows],
+            'shape_dist_traveled': self.distances[rows],
+        })
@@ -0,0 +1,142 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from .compact import missing_times
+
+class StopTripIndex:
+    """Inverted index from each stop to the trips that serve it.
+
+    Rows of `stop_times` are grouped by stop and, within a stop, sorted by
+    trip code. The trips serving a stop are then a contiguous, sorted slice,
+    so an origin/destination lookup is an intersection of two sorted arrays
+    followed by a vectorized `stop_sequence` comparison.
+
+    Params:
+    -------
+    stop_times : pd.DataFrame
+        The stop times dataset (see `StaticAPI.stop_times()`)
+    """
+    def __init__(self,stop_times:pd.DataFrame):
+        trip_codes, trip_ids = pd.factorize(stop_times['trip_id'])
+        stop_codes, stop_ids = pd.factorize(stop_times['stop_id'])
+        self.trip_ids = np.asarray(trip_ids,dtype=object)
+        self.stop_ids = np.asarray(stop_ids,dtype=object)
+        self.trip_lookup: dict[str,int] = {t:i for i,t in enumerate(self.trip_ids)}
+        self.stop_lookup: dict[str,int] = {s:i for i,s in enumerate(self.stop_ids)}
+
+        # trip code of every stop_times row (in the original row order)
+        self.row_trips = trip_codes
+
+        order = np.lexsort((trip_codes,stop_codes))
+        self.rows = order
+        self.trips = trip_codes[order]
+        self.sequences = stop_times['stop_sequence'].to_numpy()[order]
+        self.offsets = np.searchsorted(stop_codes[order],np.arange(len(stop_ids)+1))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __stop_slice(self,stop_id:str) -> slice:
+        code = self.stop_lookup.get(stop_id)
+        if code is None:
+            return slice(0,0)
+        return slice(self.offsets[code],self.offsets[code+1])
+
+    def trips_serving(self,stop_id:str) -> list[str]:
+        """Get the ids of every trip that serves a stop"""
+        return list(self.trip_ids[np.unique(self.trips[self.__stop_slice(stop_id)])])
+
+    def journeys(self,origin:str,destination:str) -> tuple[np.ndarray,np.ndarray]:
+        """Get row positions (into `stop_times`) of the origin and destination
+        stops for every trip that visits `origin` before `destination`
+
+        Returns:
+        --------
+        (origin_rows, destination_rows) : tuple[np.ndarray, np.ndarray]
+            Aligned arrays; element `i` of each belongs to the same trip
+        """
+        o = self.__stop_slice(origin)
+        d = self.__stop_slice(destination)
+        _, o_pos, d_pos = np.intersect1d(self.trips[o],self.trips[d],return_indices=True)
+        o_pos = o_pos + o.start
+        d_pos = d_pos + d.start
+        forward = self.sequences[o_pos] < self.sequences[d_pos]
+        return self.rows[o_pos[forward]], self.rows[d_pos[forward]]
+
+class TimeIndex:
+    """Stop times partitioned by service and sorted by arrival time.
+
+    Every service's rows form a contiguous run ordered by `arrival_time`, so
+    "everything between `start` and `end`" for a set of services is one
+    `searchsorted` pair per service instead of a boolean mask over the whole
+    dataset.
+
+    Params:
+    -------
+    stop_times : pd.DataFrame
+        The stop times dataset (see `StaticAPI.stop_times()`)
+    trips : pd.DataFrame
+        The trips dataset, used to map each trip to its service
+    base_dt : Optional[datetime.datetime]
+        Service day that integer `arrival_time` seconds (the compact
+        representation) count from
+    """
+    def __init__(self,stop_times:pd.DataFrame,trips:pd.DataFrame,base_dt:dt.datetime=None):
+        trip_codes, trip_ids = pd.factorize(stop_times['trip_id'])
+        self.trip_ids = np.asarray(trip_ids,dtype=object)
+        self.row_trips = trip_codes
+
+        services = stop_times['trip_id'].map(trips.drop_duplicates('trip_id').set_index('trip_id')['service_id'])
+        service_codes, service_ids = pd.factorize(services)
+        self.service_lookup: dict[str,int] = {s:i for i,s in enumerate(service_ids)}
+
+        # rows whose trip is missing from the trips dataset, or without an
+        # arrival time, belong to no service and are left out (code -1 sorts
+        # first and is skipped by the offsets)
+        arrivals = stop_times['arrival_time'].to_numpy()
+        service_codes[missing_times(arrivals)] = -1
+        self.base_dt = None if base_dt is None else pd.Timestamp(base_dt)
+        order = np.lexsort((arrivals,service_codes))
+        self.rows = order
+        self.arrivals = arrivals[order]
+        self.offsets = np.searchsorted(service_codes[order],np.arange(len(service_ids)+1))
+
+    def between(self,service_ids:list[str],start:dt.datetime=None,end:dt.datetime=None) -> np.ndarray:
+        """Get row positions (into `stop_times`) of every stop time of the
+        given services with `start < arrival_time <= end`, in dataset order
+
+        Params:
+        -------
+        service_ids : list[str]
+            Services to include
+        start : Optional[datetime.datetime]
+            Exclusive lower bound. Defaults to no lower bound
+        end : Optional[datetime.datetime]
+            Inclusive upper bound. Defaults to no upper bound
+        """
+        start = None if start is None else self.__key(start)
+        end = None if end is None else self.__key(end)
+        chunks = []
+        for service_id in service_ids:
+            code = self.service_lookup.get(service_id)
+            if code is None:
+                continue
+            lo, hi = self.offsets[code], self.offsets[code+1]
+            times = self.arrivals[lo:hi]
+            if start is not None:
+                lo += np.searchsorted(times,start,side='right')
+            if end is not None:
+                hi = self.offsets[code] + np.searchsorted(times,end,side='right')
+            if lo < hi:
+                chunks.append(self.rows[lo:hi])
+        if not chunks:
+            return np.empty(0,dtype=np.intp)
+        return np.sort(np.concatenate(chunks))
+
+    def __key(self,t:dt.datetime):
+        if self.arrivals.dtype.kind in 'iu':
+            # whole seconds keep "start < t" and "t <= end" exact for integer times
+            return np.floor((pd.Timestamp(t) - self.base_dt) / pd.Timedelta(seconds=1))
+        return np.datetime64(pd.Timestamp(t))
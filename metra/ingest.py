@@ -0,0 +1,133 @@
+import io
+import zipfile
+import datetime as dt
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .utils import CALENDAR_FMT
+from .profiling import PROFILER
+
+# Declarative description of how each GTFS member is turned into a DataFrame.
+#   drop  : columns removed after reading
+#   strip : string columns that get surrounding whitespace removed
+#   times : "HH:MM:SS" columns converted to datetimes on the service day
+#   dates : "YYYYMMDD" columns converted to datetimes
+TABLE_SPECS = {
+    'stops': {
+        'drop': ['stop_url','stop_desc'],
+        'strip': ['stop_id','stop_name','zone_id'],
+    },
+    'stop_times': {
+        'drop': ['departure_time','notice'],
+        'strip': ['trip_id','stop_id'],
+        'times': ['arrival_time'],
+    },
+    'trips': {
+        'drop': ['block_id'],
+        'strip': ['route_id','service_id','trip_id','trip_headsign','shape_id'],
+    },
+    'routes': {
+        'drop': ['route_desc','route_url','agency_id'],
+        'strip': ['route_id','route_short_name','route_long_name','route_color','route_text_color'],
+    },
+    'shapes': {
+        'strip': ['shape_id'],
+    },
+    'calendar': {
+        'strip': ['service_id'],
+        'dates': ['start_date','end_date'],
+    },
+    'calendar_dates': {
+        'strip': ['service_id'],
+        'dates': ['date'],
+    },
+    'fare_rules': {
+        'drop': ['route_id','contains_id'],
+        'strip': ['origin_id','destination_id'],
+    },
+    'fare_attributes': {
+        'strip': ['currency_type'],
+    },
+}
+
+def strip_column(s:pd.Series) -> pd.Series:
+    """Whole-column equivalent of `s.apply(lambda x: str(x).strip())`"""
+    if s.dtype.kind in 'iub':
+        return s.astype(str)
+    s = s.astype(str) if s.dtype.kind == 'f' else s
+    return s.str.strip().fillna('nan')
+
+def parse_time_seconds(s:pd.Series) -> np.ndarray:
+    """Parse a column of "HH:MM:SS" strings (hours may exceed 23) into
+    seconds past midnight in a single pass.
+
+    A feed only has a few thousand distinct times, so each distinct
+    string is parsed once and broadcast back to the rows. Missing or blank
+    times come back as NaN (NaT once offset from the service day)
+    """
+    codes, uniques = pd.factorize(s)
+    uniques = pd.Series(uniques,dtype=object).str.strip()
+    present = (uniques != '').to_numpy()
+    times = uniques[present]
+    if len(times) and (times.str.len() == 8).all():
+        d = times.to_numpy(dtype='S8').view(np.uint8).reshape(-1,8).astype(np.int64) - 48
+        seconds = (d[:,0]*10 + d[:,1])*3600 + (d[:,3]*10 + d[:,4])*60 + d[:,6]*10 + d[:,7]
+    else:
+        hh = times.str[:2].astype(np.int64).to_numpy()
+        mm = times.str[3:5].astype(np.int64).to_numpy()
+        ss = times.str[-2:].astype(np.int64).to_numpy()
+        seconds = hh*3600 + mm*60 + ss
+    if present.all() and (codes >= 0).all():
+        return seconds[codes]
+    # trailing NaN so that the -1 "missing" code maps onto it
+    values = np.full(len(uniques)+1,np.nan)
+    values[:-1][present] = seconds
+    return values[codes]
+
+def seconds_to_datetimes(seconds:np.ndarray,base_dt:dt.datetime) -> pd.DatetimeIndex:
+    """Offset `base_dt` by an array of seconds"""
+    return pd.Timestamp(base_dt) + pd.to_timedelta(seconds,unit='s')
+
+def _raw_columns(data:bytes) -> list[str]:
+    header = data.split(b'\n',1)[0].decode('utf-8-sig').rstrip('\r')
+    return header.split(',')
+
+def read_table(source:Union[zipfile.ZipFile,bytes],name:str,base_dt:dt.datetime=None) -> pd.DataFrame:
+    """Read a GTFS member and apply its `TABLE_SPECS` entry as whole-column
+    operations
+
+    Params:
+    -------
+    source : zipfile.ZipFile | bytes
+        Open schedule zip, or the raw bytes of the "<name>.txt" member
+    name : str
+        GTFS table name (e.g. "stop_times")
+    base_dt : datetime.datetime
+        Service day that "times" columns are offset from
+    """
+    spec = TABLE_SPECS[name]
+    with PROFILER.span('read_table.decompress',table=name):
+        data = source.read(f'{name}.txt') if isinstance(source,zipfile.ZipFile) else source
+    raw = {c.strip():c for c in _raw_columns(data)}
+    # "strip" columns keep pandas' type inference, so `strip_column` gives the
+    # same text as `str(x).strip()` on the inferred values (e.g. "1.0" for a
+    # float-inferred id with blanks, no leading zeros for numeric ids)
+    dtypes = {raw[c]:str for c in spec.get('times',[]) if c in raw}
+
+    drop = set(spec.get('drop',[]))
+    usecols = [c for c in raw.values() if c.strip() not in drop]
+
+    with PROFILER.span('read_table.parse',table=name) as span:
+        df = pd.read_csv(io.BytesIO(data),dtype=dtypes,usecols=usecols)
+        span.rows = len(df)
+    with PROFILER.span('read_table.convert',table=name):
+        df.columns = [str(c).strip() for c in df.columns]
+        for col in spec.get('times',[]):
+            df[col] = seconds_to_datetimes(parse_time_seconds(df[col]),base_dt)
+        for col in spec.get('strip',[]):
+            df[col] = strip_column(df[col])
+        for col in spec.get('dates',[]):
+            df[col] = pd.to_datetime(df[col],format=CALENDAR_FMT)
+    return df
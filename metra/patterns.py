@@ -0,0 +1,180 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from .compact import missing_times
+
+# timing offset of a stop without a scheduled time, and the time such a
+# visit is reported with (the int64 minimum, NaT's value), which never
+# passes a "time > key" test
+MISSING_OFFSET = np.iinfo(np.int32).min
+MISSING_TIME = np.iinfo(np.int64).min
+
+class TripPatterns:
+    """Trips grouped into patterns of identical stop sequence.
+
+    A pattern stores its stops once. Every trip then only keeps a pattern,
+    a start time and a timing, which is the offset of each stop from the
+    start. Trips that run to the same timing share it, so most trips on a
+    line cost three integers instead of a row per stop. Stop queries are
+    answered per pattern first and expanded to trips only at the end, so
+    they scan one entry per pattern stop plus one per candidate trip.
+
+    Trip codes follow first appearance in `stop_times`, like those of
+    `StopTripIndex` and `TimeIndex`, so the indexes share boolean trip
+    masks.
+
+    Params:
+    -------
+    stop_times : pd.DataFrame
+        The stop times dataset (see `StaticAPI.stop_times()`)
+    base_dt : Optional[datetime.datetime]
+        Service day that integer `arrival_time` seconds (the compact
+        representation) count from
+    """
+    def __init__(self,stop_times:pd.DataFrame,base_dt:dt.datetime=None):
+        trip_codes, trip_ids = pd.factorize(stop_times['trip_id'])
+        stop_codes, stop_ids = pd.factorize(stop_times['stop_id'])
+        self.trip_ids = np.asarray(trip_ids,dtype=object)
+        self.stop_ids = np.asarray(stop_ids,dtype=object)
+        self.trip_lookup: dict[str,int] = {t:i for i,t in enumerate(self.trip_ids)}
+        self.stop_lookup: dict[str,int] = {s:i for i,s in enumerate(self.stop_ids)}
+        self.base_dt = None if base_dt is None else pd.Timestamp(base_dt)
+
+        # stop_times rows ordered by trip, then stop_sequence. Feeds are
+        # usually stored this way already, in which case no row map is kept
+        order = np.lexsort((stop_times['stop_sequence'].to_numpy(),trip_codes))
+        self.rows = None if np.array_equal(order,np.arange(len(order))) else order
+        self.trip_offsets = np.searchsorted(trip_codes[order],np.arange(len(trip_ids)+1))
+        stops = stop_codes[order]
+        arrivals = stop_times['arrival_time'].to_numpy()
+        # integer times are already seconds into the service day
+        self.__relative = arrivals.dtype.kind in 'iu'
+        if self.__relative:
+            times = arrivals.astype(np.int64)[order]
+        else:
+            times = arrivals.astype('datetime64[s]').astype(np.int64)[order]
+        missing = missing_times(arrivals)[order]
+
+        patterns: dict[bytes,int] = {}
+        timings: dict[tuple[int,bytes],int] = {}
+        pattern_stops, timing_offsets = [], []
+        n_trips = len(trip_ids)
+        self.trip_pattern = np.empty(n_trips,dtype=np.int32)
+        self.trip_timing = np.empty(n_trips,dtype=np.int32)
+        self.trip_start = np.empty(n_trips,dtype=np.int64)
+        for trip in range(n_trips):
+            lo, hi = self.trip_offsets[trip], self.trip_offsets[trip+1]
+            seq = stops[lo:hi]
+            pattern = patterns.setdefault(seq.tobytes(),len(patterns))
+            if pattern == len(pattern_stops):
+                pattern_stops.append(seq)
+            # trips start at their first timed stop
+            timed = np.flatnonzero(~missing[lo:hi])
+            start = times[lo + timed[0]] if len(timed) else 0
+            offsets = np.full(hi - lo,MISSING_OFFSET,dtype=np.int32)
+            offsets[timed] = times[lo:hi][timed] - start
+            timing = timings.setdefault((pattern,offsets.tobytes()),len(timings))
+            if timing == len(timing_offsets):
+                timing_offsets.append(offsets)
+            self.trip_pattern[trip] = pattern
+            self.trip_timing[trip] = timing
+            self.trip_start[trip] = start
+
+        self.pattern_offsets = np.concatenate([[0],np.cumsum([len(s) for s in pattern_stops],dtype=np.intp)])
+        self.pattern_stops = np.concatenate(pattern_stops + [np.empty(0,dtype=np.intp)])
+        self.timing_offsets = np.concatenate([[0],np.cumsum([len(o) for o in timing_offsets],dtype=np.intp)])
+        self.timings = np.concatenate(timing_offsets + [np.empty(0,dtype=np.int32)])
+
+        # trips of each pattern, as a contiguous run in trip code order
+        self.pattern_trips = np.argsort(self.trip_pattern,kind='stable')
+        self.pattern_trip_offsets = np.searchsorted(self.trip_pattern[self.pattern_trips],np.arange(len(pattern_stops)+1))
+
+        # stop -> (pattern, position) entries; for each stop the patterns are
+        # in ascending order and a pattern's earliest position comes first
+        stop_order = np.lexsort((np.arange(len(self.pattern_stops)),self.pattern_stops))
+        self.stop_entries = stop_order
+        self.stop_entry_offsets = np.searchsorted(self.pattern_stops[stop_order],np.arange(len(stop_ids)+1))
+        self.entry_pattern = np.repeat(np.arange(len(pattern_stops)),np.diff(self.pattern_offsets))
+
+    def __len__(self) -> int:
+        return len(self.pattern_offsets) - 1
+
+    def key(self,t:dt.datetime) -> int:
+        """`t` as whole seconds in the representation of the trip times, so
+        "t < time" comparisons stay exact"""
+        t = pd.Timestamp(t)
+        if self.__relative:
+            return int(np.floor((t - self.base_dt) / pd.Timedelta(seconds=1)))
+        return int(np.datetime64(t.floor('s'),'s').astype(np.int64))
+
+    def __visits(self,stop_id:str) -> tuple[np.ndarray,np.ndarray]:
+        """(pattern, position) of the first visit to a stop by every pattern
+        serving it"""
+        code = self.stop_lookup.get(stop_id)
+        if code is None:
+            empty = np.empty(0,dtype=np.intp)
+            return empty, empty
+        entries = self.stop_entries[self.stop_entry_offsets[code]:self.stop_entry_offsets[code+1]]
+        patterns, first = np.unique(self.entry_pattern[entries],return_index=True)
+        return patterns, entries[first] - self.pattern_offsets[patterns]
+
+    def __expand(self,patterns:np.ndarray,*positions:np.ndarray) -> tuple:
+        """Trips of the given patterns plus, for each array of per-pattern
+        stop positions, the `stop_times` row and time of that stop on every
+        trip (`MISSING_TIME` for stops without one). Trips are returned in
+        trip code order"""
+        lo, hi = self.pattern_trip_offsets[patterns], self.pattern_trip_offsets[patterns+1]
+        counts = hi - lo
+        owner = np.repeat(np.arange(len(patterns)),counts)
+        trips = self.pattern_trips[np.repeat(lo - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())]
+        order = np.argsort(trips,kind='stable')
+        trips, owner = trips[order], owner[order]
+        out = [trips]
+        for pos in positions:
+            pos = pos[owner]
+            row = self.trip_offsets[trips] + pos
+            out.append(row if self.rows is None else self.rows[row])
+            offsets = self.timings[self.timing_offsets[self.trip_timing[trips]] + pos]
+            out.append(np.where(offsets == MISSING_OFFSET,MISSING_TIME,self.trip_start[trips] + offsets))
+        return tuple(out)
+
+    def stop_visits(self,stop_id:str) -> tuple[np.ndarray,np.ndarray,np.ndarray]:
+        """Every trip calling at a stop
+
+        Returns:
+        --------
+        (trips, rows, times) : tuple[np.ndarray, np.ndarray, np.ndarray]
+            Trip codes, row positions into `stop_times` and arrival times
+            (see `key`, `MISSING_TIME` if the stop has none) of the visit, in
+            trip code order
+        """
+        patterns, pos = self.__visits(stop_id)
+        return self.__expand(patterns,pos)
+
+    def journeys(self,origin:str,destination:str) -> tuple[np.ndarray,...]:
+        """Every trip that visits `origin` before `destination`. Patterns are
+        matched first, so only trips of matching patterns are expanded
+
+        Returns:
+        --------
+        (trips, origin_rows, origin_times, destination_rows, destination_times) : tuple[np.ndarray, ...]
+            Aligned arrays in trip code order. Rows are positions into
+            `stop_times`, times are in the representation of `key`
+            (`MISSING_TIME` if the stop has none)
+        """
+        o_patterns, o_pos = self.__visits(origin)
+        d_patterns, d_pos = self.__visits(destination)
+        patterns, o_idx, d_idx = np.intersect1d(o_patterns,d_patterns,assume_unique=True,return_indices=True)
+        forward = o_pos[o_idx] < d_pos[d_idx]
+        return self.__expand(patterns[forward],o_pos[o_idx][forward],d_pos[d_idx][forward])
+
+    def trip_rows(self,trips:np.ndarray) -> np.ndarray:
+        """Row positions into `stop_times` of every stop of the given trip
+        codes, in stop_sequence order per trip"""
+        trips = np.asarray(trips,dtype=np.intp)
+        lo, hi = self.trip_offsets[trips], self.trip_offsets[trips+1]
+        counts = hi - lo
+        rows = np.repeat(lo - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())
+        return rows if self.rows is None else self.rows[rows]
@@ -0,0 +1,137 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+INF = np.iinfo(np.int64).max
+
+class ConnectionScan:
+    """Earliest-arrival journey planner over one service day (Connection Scan).
+
+    Each pair of consecutive stops on a trip becomes an elementary
+    "connection" (trip, from stop, to stop, departure, arrival). Connections
+    are stored as flat arrays sorted by departure time, so a query is a single
+    forward scan starting at the first connection after the departure time.
+    The scan is repeated once per allowed transfer, which yields the Pareto
+    set of itineraries for arrival time versus number of transfers.
+
+    Params:
+    -------
+    stop_times : pd.DataFrame
+        Stop times of the trips running on the service day. Stops with a
+        missing `arrival_time` are left out
+    """
+    def __init__(self,stop_times:pd.DataFrame):
+        # stops without a scheduled time can be neither boarded nor reached;
+        # the trip runs straight from the previous timed stop to the next one
+        st = stop_times[stop_times['arrival_time'].notna()]
+        st = st.sort_values(['trip_id','stop_sequence'],kind='stable')
+        trip_codes, trip_ids = pd.factorize(st['trip_id'])
+        stop_codes, stop_ids = pd.factorize(st['stop_id'])
+        self.trip_ids = np.asarray(trip_ids,dtype=object)
+        self.stop_ids = np.asarray(stop_ids,dtype=object)
+        self.stop_lookup: dict[str,int] = {s:i for i,s in enumerate(self.stop_ids)}
+
+        times = st['arrival_time'].to_numpy().astype('datetime64[s]').astype(np.int64)
+        same = trip_codes[1:] == trip_codes[:-1]
+        dep, arr = times[:-1][same], times[1:][same]
+        order = np.lexsort((arr,dep))
+
+        self.dep_times = dep[order]
+        # plain lists index much faster than numpy arrays inside the scan loop
+        self.__dep = self.dep_times.tolist()
+        self.__arr = arr[order].tolist()
+        self.__trip = trip_codes[:-1][same][order].tolist()
+        self.__from = stop_codes[:-1][same][order].tolist()
+        self.__to = stop_codes[1:][same][order].tolist()
+
+    def __len__(self) -> int:
+        return len(self.__dep)
+
+    def journeys(self,origin:str,destination:str,depart:dt.datetime,max_transfers:int=2,min_transfer:int=180) -> list[list[tuple]]:
+        """Get the Pareto-optimal itineraries from `origin` to `destination`
+        leaving no earlier than `depart`, fewest transfers first
+
+        Params:
+        -------
+        origin : str
+            stop id for the start of the journey
+        destination : str
+            stop id for the end of the journey
+        depart : datetime.datetime
+            Earliest departure
+        max_transfers : int
+            Maximum number of changes between trips. Defaults to `2`
+        min_transfer : int
+            Minimum time in seconds needed to change trips. Defaults to `180`
+
+        Returns:
+        --------
+        list[list[tuple]]
+            One list of legs per itinerary. A leg is
+            `(trip_id, from_stop, to_stop, departure, arrival)` with
+            `numpy.datetime64` times
+        """
+        o = self.stop_lookup.get(origin)
+        d = self.stop_lookup.get(destination)
+        if o is None or d is None or o == d:
+            return []
+
+        dep_t, arr_t, trip, frm, to = self.__dep, self.__arr, self.__trip, self.__from, self.__to
+        depart = int(np.datetime64(pd.Timestamp(depart),'s').astype(np.int64))
+        first = int(np.searchsorted(self.dep_times,depart,side='left'))
+        n_stops = len(self.stop_ids)
+
+        prev_arr = [INF] * n_stops
+        prev_arr[o] = depart
+        prev_conn = [-1] * n_stops
+        prev_round = [-1] * n_stops
+        rounds = []
+        found = []
+        for k in range(max_transfers + 1):
+            best = list(prev_arr)
+            conn = list(prev_conn)
+            rnd = list(prev_round)
+            boarded: dict[int,int] = {}
+            slack = 0 if k == 0 else min_transfer
+            for c in range(first,len(dep_t)):
+                if dep_t[c] >= best[d]:
+                    break
+                t = trip[c]
+                if t not in boarded:
+                    if prev_arr[frm[c]] + slack > dep_t[c]:
+                        continue
+                    boarded[t] = c
+                s = to[c]
+                if arr_t[c] < best[s]:
+                    best[s] = arr_t[c]
+                    conn[s] = c
+                    rnd[s] = k
+            rounds.append((conn,rnd,boarded))
+            if best[d] < prev_arr[d]:
+                found.append(k)
+            if best == prev_arr:
+                break
+            prev_arr, prev_conn, prev_round = best, conn, rnd
+
+        return [self.__legs(rounds,d,k) for k in found]
+
+    def __legs(self,rounds:list,stop:int,k:int) -> list[tuple]:
+        legs = []
+        while True:
+            conn, rnd, _ = rounds[k]
+            c, j = conn[stop], rnd[stop]
+            b = rounds[j][2][self.__trip[c]]
+            legs.append((
+                self.trip_ids[self.__trip[c]],
+                self.stop_ids[self.__from[b]],
+                self.stop_ids[self.__to[c]],
+                np.datetime64(self.__dep[b],'s'),
+                np.datetime64(self.__arr[c],'s'),
+            ))
+            stop = self.__from[b]
+            if j == 0:
+                break
+            k = j - 1
+        legs.reverse()
+        return legs
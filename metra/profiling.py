@@ -0,0 +1,170 @@
+import time
+import logging
+import functools
+import threading
+import tracemalloc
+from typing import Callable
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class Span:
+    """One timed section. Set `rows` inside the `with` block to record how
+    many rows it produced"""
+    __slots__ = ('profiler','name','labels','rows','start','memory')
+    def __init__(self,profiler:'Profiler',name:str,labels:dict):
+        self.profiler = profiler
+        self.name = name
+        self.labels = labels
+        self.rows: int = None
+
+    def __enter__(self):
+        self.memory = tracemalloc.get_traced_memory()[0] if self.profiler.track_memory else None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self,*exc):
+        seconds = time.perf_counter() - self.start
+        nbytes = tracemalloc.get_traced_memory()[0] - self.memory if self.memory is not None else None
+        self.profiler.record(self.name,seconds,self.rows,nbytes,**self.labels)
+
+class _NullSpan:
+    """Stand-in returned while profiling is disabled"""
+    __slots__ = ()
+    rows = None
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc):
+        pass
+
+    def __setattr__(self,name,value):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Profiler:
+    """Opt-in timing of table loading and `StaticAPI` queries.
+
+    While enabled, every instrumented section produces an event with its
+    name, wall time, row count and (with `track_memory`) net bytes
+    allocated. Events are aggregated into `stats()`, logged to the
+    "metra.profiling" logger and passed to every registered hook, e.g. to
+    forward them to a metrics system. While disabled an instrumented call
+    costs one attribute check.
+
+    Use the module-level `PROFILER` instance (or the `enable`/`disable`/
+    `stats` shortcuts).
+    """
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self.log_level = logging.DEBUG
+        self.__hooks: list[Callable[[dict],None]] = []
+        self.__stats: dict[str,list] = {}
+        self.__lock = threading.Lock()
+        self.__started_tracemalloc = False
+
+    def enable(self,track_memory:bool=False,log_level:int=logging.DEBUG) -> None:
+        """Start recording
+
+        Params:
+        -------
+        track_memory : bool
+            Also record net bytes allocated per section with `tracemalloc`
+            (adds noticeable overhead). Defaults to `False`
+        log_level : int
+            Level events are logged at. Defaults to `logging.DEBUG`
+        """
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracemalloc = True
+        self.track_memory = track_memory
+        self.log_level = log_level
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording (collected stats are kept)"""
+        self.enabled = False
+        self.track_memory = False
+        if self.__started_tracemalloc:
+            tracemalloc.stop()
+            self.__started_tracemalloc = False
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__stats.clear()
+
+    def add_hook(self,hook:Callable[[dict],None]) -> None:
+        """Call `hook(event)` for every recorded event. An event is a dict
+        with "name", "seconds", "rows" and "bytes" keys plus any labels"""
+        self.__hooks.append(hook)
+
+    def remove_hook(self,hook:Callable[[dict],None]) -> None:
+        self.__hooks.remove(hook)
+
+    def span(self,name:str,**labels):
+        """Context manager timing the enclosed block as `name`"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self,name,labels)
+
+    def record(self,name:str,seconds:float,rows:int=None,nbytes:int=None,**labels) -> None:
+        event = dict(labels,name=name,seconds=seconds,rows=rows,bytes=nbytes)
+        # labelled sections are aggregated separately, e.g. "read_table.parse[stops]"
+        key = f"{name}[{','.join(map(str,labels.values()))}]" if labels else name
+        with self.__lock:
+            entry = self.__stats.get(key)
+            if entry is None:
+                entry = self.__stats[key] = [0,0.0,float('inf'),0.0,0,0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = min(entry[2],seconds)
+            entry[3] = max(entry[3],seconds)
+            entry[4] += rows or 0
+            entry[5] += nbytes or 0
+        logger.log(self.log_level,'%s: %.3f ms',key,seconds*1000,extra={'metra_event':event})
+        for hook in list(self.__hooks):
+            try:
+                hook(event)
+            except Exception:
+                logger.exception('profiling hook failed')
+
+    def stats(self) -> pd.DataFrame:
+        """Aggregated timings, one row per section, slowest total first"""
+        with self.__lock:
+            rows = [[name] + list(entry) for name, entry in self.__stats.items()]
+        df = pd.DataFrame(rows,columns=['name','calls','total_s','min_s','max_s','rows','bytes'])
+        df.insert(3,'mean_s',df['total_s'] / df['calls'])
+        return df.sort_values('total_s',ascending=False,ignore_index=True)
+
+PROFILER = Profiler()
+
+def enable(track_memory:bool=False,log_level:int=logging.DEBUG) -> None:
+    PROFILER.enable(track_memory,log_level)
+
+def disable() -> None:
+    PROFILER.disable()
+
+def stats() -> pd.DataFrame:
+    return PROFILER.stats()
+
+def _rows(result):
+    if isinstance(result,(pd.DataFrame,pd.Series)):
+        return len(result)
+    return None
+
+def profiled(fn:Callable) -> Callable:
+    """Record every call of `fn` (named by its qualified name) while the
+    profiler is enabled"""
+    name = fn.__qualname__
+    @functools.wraps(fn)
+    def wrapper(*args,**kwargs):
+        if not PROFILER.enabled:
+            return fn(*args,**kwargs)
+        with PROFILER.span(name) as span:
+            result = fn(*args,**kwargs)
+            span.rows = _rows(result)
+        return result
+    return wrapper
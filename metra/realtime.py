@@ -0,0 +1,354 @@
+import json
+import functools
+import logging
+import threading
+import datetime as dt
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .client import ScheduleClient
+
+logger = logging.getLogger(__name__)
+
+LOCAL_TZ = 'America/Chicago'
+
+# feed name -> (JSON endpoint, protobuf endpoint) relative to METRA_BASE
+FEEDS = {
+    'trip_updates': ('tripUpdates','raw/tripUpdates.dat'),
+    'vehicle_positions': ('positions','raw/positionUpdates.dat'),
+    'alerts': ('alerts','raw/alerts.dat'),
+}
+
+TRIP_UPDATE_COLUMNS = ['trip_id','route_id','start_date','stop_id','stop_sequence','arrival_delay','arrival_time','departure_delay','departure_time']
+VEHICLE_POSITION_COLUMNS = ['trip_id','route_id','vehicle_id','vehicle_label','lat','lon','bearing','current_stop_sequence','stop_id','timestamp']
+ALERT_COLUMNS = ['alert_id','cause','effect','header','description','route_ids','stop_ids','trip_ids','active_start','active_end']
+
+def _get(d:dict,*keys,default=None):
+    # GTFS-RT JSON shows up both with proto field names and camelCase
+    if not d:
+        return default
+    for key in keys:
+        if key in d:
+            return d[key]
+    return default
+
+@functools.lru_cache(maxsize=None)
+def _camel(name:str) -> str:
+    head, *rest = name.split('_')
+    return head + ''.join(w.title() for w in rest)
+
+def _field(d,name:str,default=None):
+    # works on both parsed JSON dicts and protobuf messages
+    if d is None:
+        return default
+    if isinstance(d,dict):
+        return _get(d,name,_camel(name),default=default)
+    try:
+        if not d.HasField(name):
+            return default
+    except ValueError:
+        # repeated fields have no presence
+        pass
+    return getattr(d,name)
+
+def _epoch(value) -> float:
+    """POSIX seconds from the encodings seen in GTFS-RT JSON: int, numeric
+    string, ISO 8601 string or a protobuf.js Long (`{"low":...,"high":...}`)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value,dict):
+        low, high = value.get('low'), value.get('high') or 0
+        if low is None:
+            return None
+        if isinstance(low,(int,float)) or str(low).lstrip('-').isdigit():
+            # `low` and `high` are the signed 32-bit halves of the 64-bit value
+            high = int(high) & 0xffffffff if value.get('unsigned') else int(high)
+            low = (high << 32) | (int(low) & 0xffffffff)
+        value = low
+    if isinstance(value,(int,float)):
+        return float(value) or None
+    value = str(value)
+    if value.lstrip('-').isdigit():
+        return float(value) or None
+    return pd.Timestamp(value).timestamp()
+
+def _text(translated:dict) -> str:
+    translations = _field(translated,'translation',[]) or []
+    return _field(translations[0],'text','') if translations else ''
+
+def decode_entities(data:Union[bytes,str,dict,list]) -> list:
+    """Decode a GTFS-RT feed (protobuf bytes, JSON text, or already-parsed
+    JSON) into a list of entities (dicts for JSON, `FeedEntity` messages for
+    protobuf)"""
+    if isinstance(data,(bytes,bytearray)):
+        stripped = data.lstrip()
+        if stripped[:1] in (b'{',b'['):
+            data = json.loads(data)
+        else:
+            return list(_decode_protobuf(bytes(data)).entity)
+    elif isinstance(data,str):
+        data = json.loads(data)
+    if isinstance(data,dict):
+        data = _field(data,'entity',[]) or []
+    return data
+
+def _decode_protobuf(data:bytes):
+    try:
+        from google.transit import gtfs_realtime_pb2
+    except ImportError as e:
+        raise ImportError("Decoding protobuf feeds requires the 'gtfs-realtime-bindings' package "
+                          "(pip install gtfs-realtime-bindings)") from e
+    message = gtfs_realtime_pb2.FeedMessage()
+    message.ParseFromString(data)
+    return message
+
+def decode_trip_updates(data) -> pd.DataFrame:
+    """One row per stop time update"""
+    rows = []
+    for entity in decode_entities(data):
+        update = _field(entity,'trip_update')
+        if not update:
+            continue
+        trip = _field(update,'trip')
+        trip_id, route_id, start_date = _field(trip,'trip_id'), _field(trip,'route_id'), _field(trip,'start_date')
+        for stu in _field(update,'stop_time_update',[]) or []:
+            arrival, departure = _field(stu,'arrival'), _field(stu,'departure')
+            rows.append((
+                trip_id,route_id,start_date,
+                _field(stu,'stop_id'),_field(stu,'stop_sequence'),
+                _field(arrival,'delay'),_epoch(_field(arrival,'time')),
+                _field(departure,'delay'),_epoch(_field(departure,'time')),
+            ))
+    df = pd.DataFrame(rows,columns=TRIP_UPDATE_COLUMNS)
+    df['stop_sequence'] = pd.to_numeric(df['stop_sequence']).astype('Int64')
+    for col in ('arrival_delay','departure_delay','arrival_time','departure_time'):
+        df[col] = pd.to_numeric(df[col]).astype('float64')
+    for col in ('arrival_time','departure_time'):
+        df[col] = _to_local(df[col])
+    return df
+
+def decode_vehicle_positions(data) -> pd.DataFrame:
+    """One row per vehicle"""
+    rows = []
+    for entity in decode_entities(data):
+        vehicle = _field(entity,'vehicle')
+        if not vehicle:
+            continue
+        trip, desc, pos = _field(vehicle,'trip'), _field(vehicle,'vehicle'), _field(vehicle,'position')
+        rows.append((
+            _field(trip,'trip_id'),_field(trip,'route_id'),
+            _field(desc,'id'),_field(desc,'label'),
+            _field(pos,'latitude'),_field(pos,'longitude'),_field(pos,'bearing'),
+            _field(vehicle,'current_stop_sequence'),_field(vehicle,'stop_id'),
+            _epoch(_field(vehicle,'timestamp')),
+        ))
+    df = pd.DataFrame(rows,columns=VEHICLE_POSITION_COLUMNS)
+    for col in ('lat','lon','bearing','timestamp'):
+        df[col] = pd.to_numeric(df[col]).astype('float64')
+    df['current_stop_sequence'] = pd.to_numeric(df['current_stop_sequence']).astype('Int64')
+    df['timestamp'] = _to_local(df['timestamp'])
+    return df
+
+def decode_alerts(data) -> pd.DataFrame:
+    """One row per alert"""
+    rows = []
+    for entity in decode_entities(data):
+        alert = _field(entity,'alert')
+        if not alert:
+            continue
+        informed = _field(alert,'informed_entity',[]) or []
+        periods = _field(alert,'active_period',[]) or [{}]
+        rows.append((
+            _field(entity,'id'),_field(alert,'cause'),_field(alert,'effect'),
+            _text(_field(alert,'header_text')),_text(_field(alert,'description_text')),
+            sorted({_field(e,'route_id') for e in informed} - {None}),
+            sorted({_field(e,'stop_id') for e in informed} - {None}),
+            sorted({_field(_field(e,'trip'),'trip_id') for e in informed} - {None}),
+            _epoch(_field(periods[0],'start')),_epoch(_field(periods[0],'end')),
+        ))
+    df = pd.DataFrame(rows,columns=ALERT_COLUMNS)
+    for col in ('active_start','active_end'):
+        df[col] = _to_local(pd.to_numeric(df[col]).astype('float64'))
+    return df
+
+DECODERS = {
+    'trip_updates': decode_trip_updates,
+    'vehicle_positions': decode_vehicle_positions,
+    'alerts': decode_alerts,
+}
+
+def _to_local(seconds:pd.Series) -> pd.Series:
+    # POSIX seconds -> naive local time, comparable with the static schedule
+    return pd.to_datetime(seconds,unit='s',utc=True).dt.tz_convert(LOCAL_TZ).dt.tz_localize(None)
+
+def apply_trip_updates(rows:pd.DataFrame,trip_updates:pd.DataFrame,stop_times:pd.DataFrame,base_dt:dt.datetime) -> pd.DataFrame:
+    """Add realtime predictions to rows of the stop times dataset.
+
+    Each update's delay (given directly, or derived from its predicted
+    arrival) is carried forward along the trip to every later stop until the
+    next update, as the GTFS-Realtime spec prescribes. Stops before a trip's
+    first update get no prediction.
+
+    Params:
+    -------
+    rows : pd.DataFrame
+        Rows of `stop_times` to annotate
+    trip_updates : pd.DataFrame
+        Output of `decode_trip_updates`
+    stop_times : pd.DataFrame
+        The full stop times dataset, used to resolve updates to scheduled times
+    base_dt : datetime.datetime
+        Service day the stop times dataset is anchored to
+
+    Returns:
+    --------
+    pd.DataFrame
+        `rows` with "delay" (seconds) and "predicted_arrival_time" columns
+    """
+    out = rows.copy()
+    updates = trip_updates[trip_updates['trip_id'].isin(out['trip_id'].unique())]
+    if updates.empty:
+        out['delay'] = np.nan
+        out['predicted_arrival_time'] = pd.NaT
+        return out
+
+    # resolve each update to its scheduled stop time (by sequence, else by stop id)
+    sched = stop_times[['trip_id','stop_id','stop_sequence','arrival_time']]
+    by_seq = updates[updates['stop_sequence'].notna()].astype({'stop_sequence':'int64'}).merge(
+        sched.drop(columns='stop_id'),on=['trip_id','stop_sequence'],how='inner',suffixes=('','_scheduled'))
+    by_stop = updates[updates['stop_sequence'].isna()].drop(columns='stop_sequence').merge(
+        sched,on=['trip_id','stop_id'],how='inner',suffixes=('','_scheduled'))
+    resolved = pd.concat([by_seq,by_stop],ignore_index=True)
+
+    # an absolute prediction becomes a delay relative to the same service day
+    service_day = pd.to_datetime(resolved['start_date'],format='%Y%m%d',errors='coerce')
+    service_day = service_day.fillna(resolved['arrival_time'].dt.normalize())
+    scheduled_offset = resolved['arrival_time_scheduled'] - pd.Timestamp(base_dt)
+    derived = (resolved['arrival_time'] - (service_day + scheduled_offset)).dt.total_seconds()
+    resolved['delay'] = resolved['arrival_delay'].fillna(derived).fillna(resolved['departure_delay'])
+    resolved = resolved[['trip_id','stop_sequence','delay']].dropna().sort_values('stop_sequence')
+
+    out['_order'] = np.arange(len(out))
+    merged = pd.merge_asof(
+        out.astype({'stop_sequence':'int64'}).sort_values('stop_sequence'),
+        resolved.astype({'stop_sequence':'int64'}),
+        on='stop_sequence',by='trip_id',direction='backward')
+    merged = merged.sort_values('_order').drop(columns='_order')
+    merged.index = rows.index
+    merged['predicted_arrival_time'] = merged['arrival_time'] + pd.to_timedelta(merged['delay'],unit='s')
+    return merged
+
+class RealtimeStore:
+    """Latest decoded realtime feeds, indexed by trip_id and stop_id.
+
+    Each `update` replaces a feed's frame and its indexes in one reference
+    swap, so readers never see a half-applied cycle.
+    """
+    def __init__(self):
+        self.__frames: dict[str,tuple[pd.DataFrame,dict,dict]] = {}
+        self.updated_at: dict[str,dt.datetime] = {}
+
+    def update(self,feed:str,frame:pd.DataFrame) -> None:
+        by_trip = frame.groupby('trip_id',sort=False).indices if 'trip_id' in frame and len(frame) else {}
+        by_stop = frame.groupby('stop_id',sort=False).indices if 'stop_id' in frame and len(frame) else {}
+        self.__frames[feed] = (frame,by_trip,by_stop)
+        self.updated_at[feed] = dt.datetime.now()
+
+    def frame(self,feed:str) -> pd.DataFrame:
+        """Latest frame of a feed ("trip_updates", "vehicle_positions" or "alerts")"""
+        entry = self.__frames.get(feed)
+        return entry[0] if entry is not None else None
+
+    def trip_updates(self) -> pd.DataFrame:
+        frame = self.frame('trip_updates')
+        return frame if frame is not None else pd.DataFrame(columns=TRIP_UPDATE_COLUMNS)
+
+    def vehicle_positions(self) -> pd.DataFrame:
+        frame = self.frame('vehicle_positions')
+        return frame if frame is not None else pd.DataFrame(columns=VEHICLE_POSITION_COLUMNS)
+
+    def alerts(self) -> pd.DataFrame:
+        frame = self.frame('alerts')
+        return frame if frame is not None else pd.DataFrame(columns=ALERT_COLUMNS)
+
+    def for_trip(self,trip_id:str,feed:str='trip_updates') -> pd.DataFrame:
+        """Rows of a feed that belong to a trip"""
+        return self.__lookup(feed,1,trip_id)
+
+    def for_stop(self,stop_id:str,feed:str='trip_updates') -> pd.DataFrame:
+        """Rows of a feed that refer to a stop"""
+        return self.__lookup(feed,2,stop_id)
+
+    def __lookup(self,feed:str,which:int,key:str) -> pd.DataFrame:
+        entry = self.__frames.get(feed)
+        if entry is None:
+            return None
+        rows = entry[which].get(key)
+        return entry[0].iloc[rows if rows is not None else []]
+
+class RealtimePoller:
+    """Polls the GTFS-Realtime feeds in a background thread and keeps a
+    `RealtimeStore` current
+
+    Params:
+    -------
+    store : Optional[RealtimeStore]
+        Store to update. A new one is created by default
+    client : Optional[ScheduleClient]
+        Pooled HTTP client to poll with
+    interval : float
+        Seconds between polls. Defaults to `30`
+    protobuf : bool
+        Poll the protobuf endpoints instead of JSON. Defaults to `False`
+    feeds : Optional[list[str]]
+        Feeds to poll. Defaults to all of `FEEDS`
+    """
+    def __init__(self,store:RealtimeStore=None,client:ScheduleClient=None,interval:float=30,protobuf:bool=False,feeds:list[str]=None):
+        self.store = store if store is not None else RealtimeStore()
+        self.client = client if client is not None else ScheduleClient()
+        self.interval = interval
+        self.protobuf = protobuf
+        self.feeds = list(feeds or FEEDS)
+        self.__stop = threading.Event()
+        self.__thread: threading.Thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self,*exc):
+        self.stop()
+
+    def poll(self) -> RealtimeStore:
+        """Fetch, decode and store every feed once"""
+        for feed in self.feeds:
+            path = FEEDS[feed][1 if self.protobuf else 0]
+            resp = self.client.session.get(f'{self.client.base}/{path}',timeout=self.client.timeout)
+            resp.raise_for_status()
+            self.store.update(feed,DECODERS[feed](resp.content))
+        return self.store
+
+    def start(self) -> None:
+        """Poll once and keep polling in a daemon thread"""
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        self.poll()
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run,name='metra-realtime-poll',daemon=True)
+        self.__thread.start()
+
+    def stop(self,timeout:float=None) -> None:
+        """Stop polling"""
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+            self.__thread = None
+
+    def __run(self) -> None:
+        while not self.__stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception('realtime poll failed')
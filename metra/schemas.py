@@ -1,19 +1,72 @@
+import functools
 import datetime as dt
 
 import pandas as pd
 
-from .utils import get_publish_time
 from .utils import get_last_local_publish
+from .search import StopSearchIndex
+from .ingest import parse_time_seconds
+from .ingest import seconds_to_datetimes
+
+_MISSING = object()
+
+class Columns:
+    """Column-oriented storage for a list of JSON records. Holds one list per
+    field instead of one dict (and one object) per record"""
+    __slots__ = ('columns','length')
+    def __init__(self,resp:list[dict]):
+        self.length = len(resp)
+        keys = dict.fromkeys(resp[0]) if resp else {}
+        self.columns: dict[str,list] = {k:[d.get(k,_MISSING) for d in resp] for k in keys}
+        # records are nearly always uniform; only collect the full key set
+        # when some record has fields the first one lacks
+        present = sum(self.length - col.count(_MISSING) for col in self.columns.values())
+        if present != sum(map(len,resp)):
+            for d in resp:
+                keys.update(dict.fromkeys(d))
+            self.columns = {k:[d.get(k,_MISSING) for d in resp] for k in keys}
+    
+    def __len__(self) -> int:
+        return self.length
+    
+    def column(self,key:str,default=None) -> list:
+        values = self.columns.get(key)
+        if values is None:
+            return [default] * self.length
+        return [default if v is _MISSING else v for v in values]
+    
+    def record(self,idx:int) -> dict:
+        return {k:col[idx] for k,col in self.columns.items() if col[idx] is not _MISSING}
+
+class Rows:
+    """Read-only sequence of row objects that are only created when accessed"""
+    __slots__ = ('data','row_class')
+    def __init__(self,data:Columns,row_class:type):
+        self.data = data
+        self.row_class = row_class
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __getitem__(self,idx):
+        if isinstance(idx,slice):
+            return [self.row_class(self.data.record(i)) for i in range(*idx.indices(len(self.data)))]
+        if idx < 0:
+            idx += len(self.data)
+        if not 0 <= idx < len(self.data):
+            raise IndexError(idx)
+        return self.row_class(self.data.record(idx))
+    
+    def __iter__(self):
+        for i in range(len(self.data)):
+            yield self.row_class(self.data.record(i))
 
 # Trips Response objects
 class Trips:
     def __init__(self,resp:list[dict]):
-        self.trips = [Trip(d) for d in resp]
-        self.__column_format = "{:<20}{:<22}{:<10}{:<6}{:<6}"
-        header = self.__column_format.format('id','headsign','direction','route','service')
-        divider = '-' * len(header)
-        rows = [self.__column_format.format(t.trip_id,t.trip_headsign,t.direction,t.route_id,t.service_id) for t in self.trips]
-        self.__reprdata = '\n'.join(([header,divider] + rows))
+        self.__data = Columns(resp)
+        self.trips = Rows(self.__data,Trip)
+        self.__reprdata = None
         
     def __getitem__(self,idx):
         return self.trips[idx]
@@ -21,11 +74,24 @@ class Trips:
     def __iter__(self):
         return iter(self.trips)
     
+    def __len__(self) -> int:
+        return len(self.trips)
+    
     def __repr__(self) -> str:
+        if self.__reprdata is None:
+            column_format = "{:<20}{:<22}{:<10}{:<6}{:<6}"
+            header = column_format.format('id','headsign','direction','route','service')
+            divider = '-' * len(header)
+            directions = ['inbound' if d == 1 else 'outbound' for d in self.__data.column('direction_id',-1)]
+            rows = [column_format.format(*r) for r in zip(
+                self.__data.column('trip_id',''),self.__data.column('trip_headsign',''),directions,
+                self.__data.column('route_id',''),self.__data.column('service_id',''))]
+            self.__reprdata = '\n'.join(([header,divider] + rows))
         return self.__reprdata
 
 class Trip:
     """Represents a single trip on the static schedule"""
+    __slots__ = ('route_id','service_id','trip_id','trip_headsign','block_id','shape_id','direction_id','direction')
     def __init__(self,data:dict):
         self.route_id = data.get('route_id','')
         self.service_id = data.get('service_id','')
@@ -42,7 +108,9 @@ class Trip:
 # Stops Response objects
 class Stops:
     def __init__(self,resp:list[dict]):
-        self.stops = [Stop(d) for d in resp]
+        self.__data = Columns(resp)
+        self.stops = Rows(self.__data,Stop)
+        self.__search_index = None
         
     def __getitem__(self,idx):
         return self.stops[idx]
@@ -50,15 +118,17 @@ class Stops:
     def __iter__(self):
         return iter(self.stops)
     
-    def search(self,query:str) -> None:
-        query = query.lower()
-        for stop in self.stops:
-            if query in stop.name.lower():
-                print('{:<20}{:<}'.format(stop.stop_id,stop.name))
-            elif query in stop.stop_id.lower():
-                print('{:<20}{:<}'.format(stop.stop_id,stop.name))
+    def __len__(self) -> int:
+        return len(self.stops)
+    
+    def search(self,query:str,limit:int=None,fuzzy:bool=True) -> list['Stop']:
+        """Search stops by id or name, best match first"""
+        if self.__search_index is None:
+            self.__search_index = StopSearchIndex(self.__data.column('stop_id',''),self.__data.column('stop_name',''))
+        return [self.stops[i] for i in self.__search_index.search(query,limit,fuzzy)]
 
 class Stop:
+    __slots__ = ('stop_id','name','desc','lat','lon','zone_id','url','has_wheelchair_boarding')
     def __init__(self,data:dict):
         self.stop_id: str = data.get('stop_id','')
         self.name: str = data.get('stop_name','')
@@ -74,29 +144,64 @@ class Stop:
 
 # Stop Times Response objects
 class StopTimes:
-    """Detailed stop time info for today's scheduled trips"""
-    def __init__(self,resp:list[dict]):
-        published_date = get_last_local_publish()
-        self.__base_dt = dt.datetime.combine(published_date.date(),time=dt.time(0,0,0))
-        df = pd.DataFrame(resp).drop(columns=['departure_time'])
-        df['arrival_time'] = df['arrival_time'].apply(lambda time: self.__convert_time_strings(time))
-        self.__df = df
-        self.stop_times = [StopTime(d) for d in resp]
-        
+    """Detailed stop time info for today's scheduled trips
+
+    Construction parses the arrival and departure columns once. The
+    `StopTime` list and the DataFrame are only built when first used.
+
+    Params:
+    -------
+    resp : list[dict]
+        Stop time records
+    base_date : Optional[datetime.date]
+        Service day the times are relative to. Defaults to the local feed's
+        publish date, looked up the first time datetimes are needed
+    """
+    def __init__(self,resp:list[dict],base_date:dt.date=None):
+        self.__data = Columns(resp)
+        self.__base_date = base_date.date() if isinstance(base_date,dt.datetime) else base_date
+        self.__arrival_seconds = parse_time_seconds(pd.Series(self.__data.column('arrival_time'),dtype=object))
+        self.__stop_times: list[StopTime] = None
+        self.__df: pd.DataFrame = None
+
     def __getitem__(self,idx):
         return self.stop_times[idx]
         
     def __iter__(self):
         return iter(self.stop_times)
     
+    def __len__(self) -> int:
+        return len(self.__data)
+    
+    @property
+    def stop_times(self) -> list['StopTime']:
+        if self.__stop_times is None:
+            self.__stop_times = list(Rows(self.__data,StopTime))
+        return self.__stop_times
+    
+    @property
+    def base_date(self) -> dt.date:
+        if self.__base_date is None:
+            self.__base_date = _publish_date(dt.date.today())
+        return self.__base_date
+    
     def df(self) -> pd.DataFrame:
+        if self.__df is None:
+            nan = float('nan')
+            df = pd.DataFrame({k:self.__data.column(k,nan) for k in self.__data.columns if k != 'departure_time'})
+            base_dt = dt.datetime.combine(self.base_date,time=dt.time(0,0,0))
+            df['arrival_time'] = seconds_to_datetimes(self.__arrival_seconds,base_dt)
+            self.__df = df
         return self.__df
-    
-    def __convert_time_strings(self,time:str):
-        hh, mm, ss = (int(time[:2]), int(time[3:5]), int(time[-2:]))
-        return self.__base_dt + dt.timedelta(hours=hh,minutes=mm,seconds=ss)
+
+@functools.lru_cache(maxsize=1)
+def _publish_date(today:dt.date) -> dt.date:
+    # keyed on today's date so the publish lookup runs at most once a day
+    return get_last_local_publish().date()
 
 class StopTime:
+    __slots__ = ('trip_id','arrival_time','departure_time','stop_id','stop_sequence','pickup_type','drop_off_type',
+                 'center_boarding','south_boarding','bikes_allowed','notice','__arrival_datetime','__departure_datetime')
     def __init__(self,data:dict):
         self.trip_id = data.get('trip_id','')
         self.arrival_time = data.get('arrival_time','')
@@ -109,6 +214,8 @@ class StopTime:
         self.south_boarding = True if data.get('south_boarding',-1) == 1 else False
         self.bikes_allowed = True if data.get('bikes_allowed',-1) == 1 else False
         self.notice = True if data.get('notice',-1) == 1 else False
+        self.__arrival_datetime: dt.datetime = None
+        self.__departure_datetime: dt.datetime = None
         
     def __repr__(self) -> str:
         return f"<(SEQ: {self.stop_sequence}) {self.arrival_time} {self.stop_id}>"
@@ -116,25 +223,33 @@ class StopTime:
     @property
     def arrival_datetime(self) -> dt.datetime:
         """Arrival time as a Python Datetime Object"""
-        return dt.datetime.strptime(self.arrival_time,r"%H:%M:%S")
+        if self.__arrival_datetime is None:
+            self.__arrival_datetime = dt.datetime.strptime(self.arrival_time,r"%H:%M:%S")
+        return self.__arrival_datetime
     
     @property
     def departure_datetime(self) -> dt.datetime:
         """Departure time as a Python Datetime Object"""
-        return dt.datetime.strptime(self.departure_time,r"%H:%M:%S")
+        if self.__departure_datetime is None:
+            self.__departure_datetime = dt.datetime.strptime(self.departure_time,r"%H:%M:%S")
+        return self.__departure_datetime
 
 # Shapes Response objects
 class Shapes:
     def __init__(self,resp:list[dict]):
-        self.shapes = [Shape(d) for d in resp]
+        self.shapes = Rows(Columns(resp),Shape)
         
     def __getitem__(self,idx):
         return self.shapes[idx]
         
     def __iter__(self):
         return iter(self.shapes)
+    
+    def __len__(self) -> int:
+        return len(self.shapes)
 
 class Shape:
+    __slots__ = ('shape_id','lat','lon','sequence')
     def __init__(self,data:dict):
         self.shape_id: str = data.get('shape_id','')
         self.lat = data.get('shape_pt_lat')
@@ -147,7 +262,7 @@ class Shape:
 # Routes Response objects
 class Routes:
     def __init__(self,resp:list[dict]):
-        self.routes = [Route(d) for d in resp]
+        self.routes = Rows(Columns(resp),Route)
         self.bnsf_railway: Route
         self.herritage_corridor: Route
         self.milwaukee_north: Route
@@ -174,8 +289,7 @@ class Routes:
         self.upnw = self.union_pacific_northwest
         self.upw = self.union_pacific_west
         
-        rows = ["{:<8}{:<20}".format(r.route_id,r.long_name) for r in self.routes]
-        self.__repr = "\n".join(rows)
+        self.__repr = None
         
     def __getitem__(self,idx):
         return self.routes[idx]
@@ -183,7 +297,13 @@ class Routes:
     def __iter__(self):
         return iter(self.routes)
     
+    def __len__(self) -> int:
+        return len(self.routes)
+    
     def __repr__(self) -> str:
+        if self.__repr is None:
+            rows = ["{:<8}{:<20}".format(r.route_id,r.long_name) for r in self.routes]
+            self.__repr = "\n".join(rows)
         return self.__repr
     
     def __assign_routes(self):
@@ -202,6 +322,7 @@ class Routes:
             else: pass
 
 class Route:
+    __slots__ = ('route_id','short_name','long_name','desc','agency_id','type','color','text_color','url')
     def __init__(self,data:dict):
         self.route_id: str = data.get('route_id','')
         self.short_name: str = data.get('route_short_name','')
@@ -220,13 +341,16 @@ class Route:
 # Calendar Response objects
 class Calendars:
     def __init__(self,resp:list[dict]):
-        self.calendars = [Calendar(d) for d in resp]
+        self.calendars = Rows(Columns(resp),Calendar)
         
     def __getitem__(self,idx):
         return self.calendars[idx]
         
     def __iter__(self):
         return iter(self.calendars)
+    
+    def __len__(self) -> int:
+        return len(self.calendars)
 
     def get_active_calendars(self) -> list:
         calendars = []
@@ -236,6 +360,7 @@ class Calendars:
         return calendars
 
 class Calendar:
+    __slots__ = ('service_id','monday','tuesday','wednesday','thursday','friday','saturday','sunday','start_date','end_date','is_active')
     def __init__(self,data:dict):
         self.service_id: str = data.get('service_id','')
         self.monday: bool = True if data.get('monday',0) == 1 else False
@@ -0,0 +1,100 @@
+import functools
+
+def _grams(text:str,n:int) -> set[str]:
+    return {text[i:i+n] for i in range(len(text)-n+1)}
+
+class StopSearchIndex:
+    """Prebuilt search index over stop ids and names.
+
+    Every lowercased id and name is broken into 1-, 2- and 3-grams. Substring
+    candidates are the intersection of the query's gram postings, so only a
+    handful of stops are ever compared directly. Matches are ranked:
+
+        0. exact id or name
+        1. id or name starts with the query
+        2. a word of the name starts with the query
+        3. id or name contains the query
+        4. typo-tolerant match (trigram similarity)
+
+    Params:
+    -------
+    stop_ids : list[str]
+        Stop identifiers
+    stop_names : list[str]
+        Stop names, aligned with `stop_ids`
+    maxsize : int
+        Number of recent queries to memoize. Defaults to `1024`
+    """
+    def __init__(self,stop_ids:list[str],stop_names:list[str],maxsize:int=1024):
+        self.__ids = [str(s).lower() for s in stop_ids]
+        self.__names = [str(s).lower() for s in stop_names]
+        self.__words = [name.split() for name in self.__names]
+
+        self.__postings: dict[str,set[int]] = {}
+        self.__trigrams: list[set[str]] = []
+        for i, (sid, name) in enumerate(zip(self.__ids,self.__names)):
+            for text in (sid,name):
+                for n in (1,2,3):
+                    for gram in _grams(text,n):
+                        self.__postings.setdefault(gram,set()).add(i)
+            self.__trigrams.append(_grams(f'  {sid} ',3) | _grams(f'  {name} ',3))
+
+        self.search = functools.lru_cache(maxsize=maxsize)(self.__search)
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+    def __rank(self,i:int,query:str) -> int:
+        sid, name = self.__ids[i], self.__names[i]
+        if query == sid or query == name:
+            return 0
+        if sid.startswith(query) or name.startswith(query):
+            return 1
+        if any(word.startswith(query) for word in self.__words[i]):
+            return 2
+        return 3
+
+    def __substring_matches(self,query:str) -> set[int]:
+        grams = [query] if len(query) <= 3 else _grams(query,3)
+        postings = sorted((self.__postings.get(g,set()) for g in grams),key=len)
+        candidates = set.intersection(*postings) if postings else set()
+        if len(query) <= 3:
+            return candidates
+        return {i for i in candidates if query in self.__ids[i] or query in self.__names[i]}
+
+    def __fuzzy_matches(self,query:str,exclude:set[int],threshold:float=0.3) -> list[tuple[float,int]]:
+        candidates = set()
+        for gram in _grams(query,3):
+            candidates |= self.__postings.get(gram,set())
+        grams = _grams(f'  {query} ',3)
+        scored = []
+        for i in candidates - exclude:
+            score = 2 * len(grams & self.__trigrams[i]) / (len(grams) + len(self.__trigrams[i]))
+            if score >= threshold:
+                scored.append((score,i))
+        return scored
+
+    def __search(self,query:str,limit:int=None,fuzzy:bool=True) -> tuple[int]:
+        """Get positions of the stops matching `query`, best match first
+
+        Params:
+        -------
+        query : str
+            Search text (case-insensitive)
+        limit : Optional[int]
+            Maximum number of results. Defaults to no limit
+        fuzzy : bool
+            Fill remaining results with typo-tolerant matches when there are
+            fewer than `limit` (or, without a limit, no) direct matches.
+            Defaults to `True`
+        """
+        query = query.strip().lower()
+        if not query:
+            return tuple(range(len(self.__ids)))[:limit]
+
+        matches = self.__substring_matches(query)
+        ranked = sorted(matches,key=lambda i: (self.__rank(i,query),len(self.__names[i]),self.__names[i]))
+        if fuzzy and len(ranked) < (limit or 1):
+            scored = self.__fuzzy_matches(query,matches)
+            ranked += [i for _, i in sorted(scored,key=lambda x: (-x[0],self.__names[x[1]]))]
+        return tuple(ranked[:limit])
@@ -0,0 +1,76 @@
+import functools
+import datetime as dt
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .constants import DASH_FMT
+from .constants import SLASH_FMT
+
+WEEKDAYS = ['monday','tuesday','wednesday','thursday','friday','saturday','sunday']
+
+def to_service_date(date:Union[str,dt.date,dt.datetime,None]=None) -> dt.date:
+    """Normalize the date formats accepted by `StaticAPI` to a calendar date.
+    `None` (or an unparseable string) means today"""
+    if date is None:
+        return dt.date.today()
+    if isinstance(date,dt.datetime):
+        return date.date()
+    if isinstance(date,dt.date):
+        return date
+    for fmt in (DASH_FMT,SLASH_FMT):
+        try:
+            return dt.datetime.strptime(date,fmt).date()
+        except (TypeError,ValueError):
+            pass
+    return dt.date.today()
+
+class ServiceCalendar:
+    """Resolves which services and trips run on a given calendar date.
+
+    A service is active when the date falls within its `calendar` range and
+    its weekday flag is set, after which `calendar_dates` exceptions are
+    applied (1 = service added, 2 = service removed). Results are memoized
+    per date in a bounded LRU cache.
+
+    Params:
+    -------
+    calendar : pd.DataFrame
+        The calendar dataset (see `StaticAPI.calendar()`)
+    calendar_dates : pd.DataFrame
+        The calendar dates dataset (see `StaticAPI.calendar_dates()`)
+    trips : pd.DataFrame
+        The trips dataset (see `StaticAPI.trips()`)
+    maxsize : int
+        Number of dates to keep resolved. Defaults to `32`
+    """
+    def __init__(self,calendar:pd.DataFrame,calendar_dates:pd.DataFrame,trips:pd.DataFrame,maxsize:int=32):
+        self.__service_ids = calendar['service_id'].to_numpy()
+        self.__start = calendar['start_date'].to_numpy().astype('datetime64[D]')
+        self.__end = calendar['end_date'].to_numpy().astype('datetime64[D]')
+        self.__weekdays = calendar[WEEKDAYS].to_numpy() == 1
+
+        self.__added: dict[dt.date,set[str]] = {}
+        self.__removed: dict[dt.date,set[str]] = {}
+        for service_id, date, exception_type in zip(calendar_dates['service_id'],calendar_dates['date'],calendar_dates['exception_type']):
+            target = self.__added if exception_type == 1 else self.__removed
+            target.setdefault(pd.Timestamp(date).date(),set()).add(service_id)
+
+        self.__trip_services = trips['service_id'].to_numpy()
+
+        self.services = functools.lru_cache(maxsize=maxsize)(self.__services)
+        self.trip_rows = functools.lru_cache(maxsize=maxsize)(self.__trip_rows)
+
+    def __services(self,date:dt.date) -> frozenset[str]:
+        """Get the ids of every service running on `date`"""
+        day = np.datetime64(date,'D')
+        mask = (self.__start <= day) & (self.__end >= day) & self.__weekdays[:,date.weekday()]
+        active = set(self.__service_ids[mask])
+        active |= self.__added.get(date,set())
+        active -= self.__removed.get(date,set())
+        return frozenset(active)
+
+    def __trip_rows(self,date:dt.date) -> np.ndarray:
+        """Get row positions (into `trips`) of every trip running on `date`"""
+        return np.flatnonzero(pd.Series(self.__trip_services).isin(self.services(date)).to_numpy())
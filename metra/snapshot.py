@@ -0,0 +1,151 @@
+import os
+import json
+import mmap
+import struct
+import tempfile
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_MAGIC = b'METRASNP'
+SNAPSHOT_VERSION = 1
+ALIGN = 64
+
+# File layout:
+#
+#   MAGIC | array blocks (each 64-byte aligned) | footer JSON | footer length (u64) | MAGIC
+#
+# The footer describes every table and column: numeric and datetime columns
+# are a single "plain" block, string columns are "dictionary" encoded as a
+# codes block plus a fixed-width unicode block of distinct values. Readers
+# map the file once and wrap the blocks with `np.frombuffer`, so every
+# process attached to the same file shares the same physical pages.
+
+def _codes_dtype(n_values:int) -> np.dtype:
+    # the dtype pandas itself picks for categorical codes, so that
+    # `Categorical.from_codes` can use the mapped array without copying
+    for dtype in (np.int8,np.int16,np.int32):
+        if n_values < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+class _Writer:
+    def __init__(self,fp):
+        self.fp = fp
+        self.fp.write(SNAPSHOT_MAGIC)
+
+    def block(self,arr:np.ndarray) -> dict:
+        pos = self.fp.tell()
+        pad = -pos % ALIGN
+        self.fp.write(b'\0' * pad)
+        arr = np.ascontiguousarray(arr)
+        self.fp.write(arr.tobytes())
+        return {'offset':pos + pad,'count':len(arr),'dtype':arr.dtype.str}
+
+def write_snapshot(path:str,tables:dict[str,pd.DataFrame],base_dt:dt.datetime=None) -> None:
+    """Serialize parsed tables into one memory-mappable snapshot file. The
+    file is written next to `path` and renamed into place
+
+    Params:
+    -------
+    path : str
+        Destination file
+    tables : dict[str, pd.DataFrame]
+        Tables keyed by GTFS name
+    base_dt : Optional[datetime.datetime]
+        Service day the tables' times are relative to
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder,prefix='.snapshot-',suffix='.tmp')
+    try:
+        with os.fdopen(fd,'wb') as fp:
+            writer = _Writer(fp)
+            footer = {'version':SNAPSHOT_VERSION,'base_dt':base_dt.isoformat() if base_dt else None,'tables':{}}
+            for name, df in tables.items():
+                columns = []
+                for col, s in df.items():
+                    if s.dtype.kind in 'biufcmM':
+                        columns.append({'name':col,'dtype':str(s.dtype),'encoding':'plain','data':writer.block(s.to_numpy())})
+                    else:
+                        codes, values = pd.factorize(s,sort=True)
+                        columns.append({
+                            'name':col,'dtype':str(s.dtype),'encoding':'dictionary',
+                            'codes':writer.block(codes.astype(_codes_dtype(len(values)))),
+                            'values':writer.block(np.asarray(values,dtype=str)),
+                        })
+                footer['tables'][name] = {'rows':len(df),'columns':columns}
+            data = json.dumps(footer).encode()
+            fp.write(data)
+            fp.write(struct.pack('<Q',len(data)))
+            fp.write(SNAPSHOT_MAGIC)
+        os.replace(tmp,path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+class FeedSnapshot:
+    """Read-only view of a snapshot file written by `write_snapshot`.
+
+    The file is memory-mapped once. Numeric and datetime columns are
+    returned as zero-copy views of the mapping, so any number of worker
+    processes attached to the same file share one copy of the data. String
+    columns are rebuilt from their (small) dictionaries; with
+    `categorical=True` they are instead returned as categoricals over the
+    mapped codes, which is zero-copy as well.
+
+    Params:
+    -------
+    path : str
+        Snapshot file
+    categorical : bool
+        Return string columns as `pd.Categorical`. Defaults to `False`,
+        which keeps the dtypes of the original tables
+    """
+    def __init__(self,path:str,categorical:bool=False):
+        self.path = path
+        self.categorical = categorical
+        with open(path,'rb') as fp:
+            self.__mmap = mmap.mmap(fp.fileno(),0,access=mmap.ACCESS_READ)
+        buf = self.__mmap
+        if buf[:8] != SNAPSHOT_MAGIC or buf[-8:] != SNAPSHOT_MAGIC:
+            raise ValueError(f'{path} is not a feed snapshot')
+        (size,) = struct.unpack('<Q',buf[-16:-8])
+        footer = json.loads(buf[len(buf)-16-size:len(buf)-16])
+        if footer.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {footer.get('version')}")
+        self.__tables: dict = footer['tables']
+        self.base_dt = dt.datetime.fromisoformat(footer['base_dt']) if footer['base_dt'] else None
+
+    def __contains__(self,name:str) -> bool:
+        return name in self.__tables
+
+    def __iter__(self):
+        return iter(self.__tables)
+
+    def __len__(self) -> int:
+        return len(self.__tables)
+
+    def __block(self,block:dict) -> np.ndarray:
+        return np.frombuffer(self.__mmap,dtype=np.dtype(block['dtype']),count=block['count'],offset=block['offset'])
+
+    def table(self,name:str) -> pd.DataFrame:
+        """Get a table backed by the mapped file"""
+        data = {}
+        for col in self.__tables[name]['columns']:
+            if col['encoding'] == 'plain':
+                data[col['name']] = self.__block(col['data'])
+                continue
+            codes = self.__block(col['codes'])
+            values = self.__block(col['values']).astype(object)
+            if self.categorical:
+                data[col['name']] = pd.Categorical.from_codes(codes,categories=values)
+            else:
+                # trailing NaN so that the -1 "missing" code maps onto it
+                values = np.append(values,np.nan)
+                data[col['name']] = pd.Series(values[codes],dtype=object).astype(col['dtype'])
+        return pd.DataFrame(data,copy=False)
+
+    def tables(self) -> dict[str,pd.DataFrame]:
+        return {name:self.table(name) for name in self.__tables}
@@ -0,0 +1,157 @@
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+def haversine(lat1,lon1,lat2,lon2) -> np.ndarray:
+    """Great-circle distance in meters between points given in degrees.
+    Arguments broadcast against each other"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a,dtype=float)) for a in (lat1,lon1,lat2,lon2))
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a,0,1)))
+
+class SpatialIndex:
+    """Grid-bucket index over a set of lat/lon points.
+
+    Points are projected onto a flat plane (equirectangular, scaled for the
+    highest latitude in the data so projected distances never overstate true
+    ones) and bucketed into square cells of `cell_m` meters. A query only
+    measures exact haversine distances to the points in the cells around it,
+    widening the ring of cells until the answer is guaranteed.
+
+    Positions returned by queries refer to the order of the input arrays.
+    Points with missing coordinates are never returned.
+
+    Params:
+    -------
+    lats : array-like
+        Latitudes in degrees
+    lons : array-like
+        Longitudes in degrees, aligned with `lats`
+    cell_m : float
+        Cell edge length in meters. Defaults to `1000`
+    """
+    def __init__(self,lats,lons,cell_m:float=1000):
+        lats = np.asarray(lats,dtype=float)
+        lons = np.asarray(lons,dtype=float)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        self.cell_m = float(cell_m)
+        self.__positions = np.flatnonzero(valid)
+        self.lats = lats[valid]
+        self.lons = lons[valid]
+        self.__scale = max(np.cos(np.radians(np.abs(self.lats).max())),1e-6) if len(self.lats) else 1.0
+
+        cx, cy = self.__cells(self.lats,self.lons)
+        order = np.lexsort((cy,cx))
+        cx, cy = cx[order], cy[order]
+        bounds = np.flatnonzero((np.diff(cx) != 0) | (np.diff(cy) != 0)) + 1
+        starts = np.concatenate(([0],bounds)) if len(order) else np.array([],dtype=np.intp)
+        ends = np.concatenate((bounds,[len(order)])) if len(order) else np.array([],dtype=np.intp)
+        self.__buckets: dict[tuple[int,int],np.ndarray] = {
+            (int(cx[s]),int(cy[s])): order[s:e] for s, e in zip(starts,ends)
+        }
+        if len(order):
+            self.__extent = (int(cx.min()),int(cx.max()),int(cy.min()),int(cy.max()))
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def __cells(self,lats:np.ndarray,lons:np.ndarray) -> tuple[np.ndarray,np.ndarray]:
+        x = np.radians(lons) * EARTH_RADIUS_M * self.__scale
+        y = np.radians(lats) * EARTH_RADIUS_M
+        return np.floor(x / self.cell_m).astype(np.int64), np.floor(y / self.cell_m).astype(np.int64)
+
+    def __block(self,cx:int,cy:int,ring:int) -> np.ndarray:
+        """Internal positions of every point within `ring` cells of (cx, cy)"""
+        if (2*ring + 1)**2 >= len(self.__buckets):
+            found = [p for (x,y), p in self.__buckets.items() if abs(x - cx) <= ring and abs(y - cy) <= ring]
+        else:
+            found = [self.__buckets[c] for c in (
+                (x,y) for x in range(cx - ring,cx + ring + 1) for y in range(cy - ring,cy + ring + 1)
+            ) if c in self.__buckets]
+        return np.concatenate(found) if found else np.array([],dtype=np.intp)
+
+    def __max_ring(self,cx:int,cy:int) -> int:
+        x0, x1, y0, y1 = self.__extent
+        return max(abs(cx - x0),abs(cx - x1),abs(cy - y0),abs(cy - y1))
+
+    def within(self,lat:float,lon:float,radius_m:float) -> tuple[np.ndarray,np.ndarray]:
+        """Get the points within `radius_m` meters of (`lat`, `lon`)
+
+        Returns:
+        --------
+        tuple[numpy.ndarray, numpy.ndarray]
+            Positions and distances in meters, nearest first
+        """
+        if not len(self.lats):
+            return np.array([],dtype=np.intp), np.array([],dtype=float)
+        cx, cy = self.__cells(np.array([lat],dtype=float),np.array([lon],dtype=float))
+        ring = int(np.ceil(radius_m / self.cell_m))
+        candidates = self.__block(int(cx[0]),int(cy[0]),ring)
+        dist = haversine(lat,lon,self.lats[candidates],self.lons[candidates])
+        keep = dist <= radius_m
+        candidates, dist = candidates[keep], dist[keep]
+        order = np.argsort(dist,kind='stable')
+        return self.__positions[candidates[order]], dist[order]
+
+    def nearest(self,lat:float,lon:float,k:int=1) -> tuple[np.ndarray,np.ndarray]:
+        """Get the `k` points nearest to (`lat`, `lon`)
+
+        Returns:
+        --------
+        tuple[numpy.ndarray, numpy.ndarray]
+            Positions and distances in meters, nearest first
+        """
+        positions, dist = self.nearest_batch([lat],[lon],k)
+        found = positions[0] >= 0
+        return positions[0][found], dist[0][found]
+
+    def nearest_batch(self,lats,lons,k:int=1) -> tuple[np.ndarray,np.ndarray]:
+        """Get the `k` nearest points for many query points at once.
+
+        Queries are grouped by grid cell, and each group is answered with one
+        vectorized distance computation against its candidate block.
+
+        Returns:
+        --------
+        tuple[numpy.ndarray, numpy.ndarray]
+            `(n, k)` arrays of positions and distances in meters, nearest
+            first. Missing neighbours are padded with `-1` and `inf`
+        """
+        lats = np.asarray(lats,dtype=float).ravel()
+        lons = np.asarray(lons,dtype=float).ravel()
+        positions = np.full((len(lats),k),-1,dtype=np.intp)
+        distances = np.full((len(lats),k),np.inf)
+        queries = np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+        if not len(self.lats) or not len(queries) or k < 1:
+            return positions, distances
+
+        qx, qy = self.__cells(lats[queries],lons[queries])
+        cells, groups = np.unique(np.stack((qx,qy),axis=1),axis=0,return_inverse=True)
+        groups = groups.ravel()
+        group_order = np.argsort(groups,kind='stable')
+        group_bounds = np.searchsorted(groups[group_order],np.arange(len(cells) + 1))
+        n = min(k,len(self.lats))
+        for g, (cx, cy) in enumerate(cells.tolist()):
+            rows = queries[group_order[group_bounds[g]:group_bounds[g+1]]]
+            max_ring = self.__max_ring(cx,cy)
+            # widen until the block holds k points, then until it covers the
+            # farthest k-th neighbour of any query in the cell
+            ring = 0
+            candidates = self.__block(cx,cy,ring)
+            while len(candidates) < n and ring < max_ring:
+                ring += 1
+                candidates = self.__block(cx,cy,ring)
+            while True:
+                dist = haversine(lats[rows,None],lons[rows,None],self.lats[candidates],self.lons[candidates])
+                kth = np.partition(dist,n - 1,axis=1)[:,n - 1]
+                needed = min(int(np.ceil(kth.max() / self.cell_m)),max_ring)
+                if needed <= ring:
+                    break
+                ring = needed
+                candidates = self.__block(cx,cy,ring)
+            top = np.argpartition(dist,n - 1,axis=1)[:,:n]
+            top_dist = np.take_along_axis(dist,top,axis=1)
+            order = np.argsort(top_dist,axis=1,kind='stable')
+            positions[rows,:n] = self.__positions[candidates[np.take_along_axis(top,order,axis=1)]]
+            distances[rows,:n] = np.take_along_axis(top_dist,order,axis=1)
+        return positions, distances
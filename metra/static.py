@@ -1,10 +1,8 @@
-import io
-import zipfile
-import requests
+import functools
 import datetime as dt
-from requests.auth import HTTPBasicAuth
 from typing import Union
 
+import numpy as np
 import pandas as pd
 
 from .schemas import Stops, Stop
@@ -13,42 +11,122 @@ from .schemas import Trips, Trip
 from .schemas import Shapes, Shape
 from .schemas import Routes, Route
 from .schemas import Calendars, Calendar
-from .constants import METRA_BASE
 from .constants import DASH_FMT
 from .constants import SLASH_FMT
-from .auth import METRA_API_KEY
-from .auth import METRA_SECRET_KEY
 from .paths import DATA_PATH
 
 from .utils import get_last_local_publish
 from .utils import get_schedule_zip
-from .utils import CALENDAR_FMT
-from .utils import PUBLISHED_FMT
-
-AUTH = HTTPBasicAuth(METRA_API_KEY,METRA_SECRET_KEY)
+from .ingest import read_table
+from .ingest import TABLE_SPECS
+from .parallel import read_tables
+from .compact import CompactFeed
+from .compact import COMPACT_TABLES
+from .snapshot import FeedSnapshot
+from .snapshot import write_snapshot
+from .index import StopTripIndex
+from .index import TimeIndex
+from .patterns import TripPatterns
+from .service import ServiceCalendar
+from .service import to_service_date
+from .fares import FareTable
+from .search import StopSearchIndex
+from .spatial import SpatialIndex
+from .geometry import ShapeGeometry
+from .planner import ConnectionScan
+from .client import default_client
+from .realtime import RealtimeStore
+from .realtime import apply_trip_updates
+from .profiling import PROFILER
+from .profiling import profiled
+from .cache import cache_key
+from .cache import feed_hash
+from .cache import load_table as load_cached_table
+from .cache import save_table as save_cached_table
 
 class StaticAPI:
-    def __init__(self):
-        self.__zip = get_schedule_zip()
-        self.__published_date = get_last_local_publish()
-        self.__base_dt = dt.datetime.combine(self.__published_date.date(),time=dt.time(0,0,0))
-        
-        self.__stops = self.__get_stops()
-        self.__stop_times = self.__get_stop_times()
-        self.__trips = self.__get_trips()
-        self.__routes = self.__get_routes()
-        self.__shapes = self.__get_shapes()
-        self.__calendar = self.__get_calendar()
-        self.__fare_rules = self.__get_fare_rules()
-        self.__fare_attributes = self.__get_fare_attributes()
+    """Interface to the GTFS-Static schedule feed.
+
+    Tables are decompressed and parsed the first time they are accessed and
+    then kept for the lifetime of the instance.
+
+    Params:
+    -------
+    preload : Optional[list[str]]
+        Table names (e.g. `["stops","stop_times"]`) to load up front
+    eager : bool
+        Load every table up front. Useful for long-running servers.
+        Defaults to `False`
+    cache : bool
+        Read/write parsed tables from the on-disk cache in the data
+        directory. Defaults to `True`
+    verify_hash : bool
+        Include the SHA-256 of schedule.zip in the cache key in addition
+        to the publish timestamp. Defaults to `False`
+    workers : Optional[int]
+        Decode the preloaded tables in parallel on this many workers.
+        Defaults to loading them one after another
+    executor : str
+        Worker pool used when `workers` is set: "thread" or "process".
+        Defaults to "thread"
+    snapshot : Optional[str | FeedSnapshot]
+        Attach to a snapshot file written by `save_snapshot` instead of
+        parsing schedule.zip. Numeric and time columns are read-only views
+        of the mapped file, shared by every process attached to it. String
+        columns are rebuilt in each process from their dictionaries; pass
+        `FeedSnapshot(path,categorical=True)` to keep them as categoricals
+        over the mapped codes instead (zero-copy, but tables and query
+        results then have categorical id columns)
+    compact : bool
+        Keep `trips` and `stop_times` in compact form: categorical ids with
+        dictionaries shared between tables, `arrival_time` as int32 seconds
+        into the service day and small integer flags. Query results are
+        returned in the regular form. Defaults to `False`
+    """
+    @profiled
+    def __init__(self,preload:list[str]=None,eager:bool=False,cache:bool=True,verify_hash:bool=False,workers:int=None,executor:str='thread',snapshot:Union[str,FeedSnapshot]=None,compact:bool=False):
+        self.__zip = None
+        self.__base_dt = None
+        self.__cache_key = None
+        self.__use_cache = cache
+        self.__verify_hash = verify_hash
+        self.__tables: dict[str,pd.DataFrame] = {}
+        self.__compact = compact
+        self.__codec: CompactFeed = None
+        self.__stop_index = None
+        self.__index_trip_codes = None
+        self.__time_index = None
+        self.__trip_patterns = None
+        self.__service_calendar = None
+        self.__fare_table = None
+        self.__stop_search_index = None
+        self.__spatial_index = None
+        self.__shape_geometry = None
+        self.__trip_stops = functools.lru_cache(maxsize=1024)(self.__build_trip_stops)
+        self.__connection_scan = functools.lru_cache(maxsize=4)(self.__build_connection_scan)
+        
+        if snapshot is not None:
+            self.__attach(snapshot)
+        
+        preload = list(TABLE_SPECS) if eager else (preload or [])
+        for name in preload:
+            if name not in TABLE_SPECS:
+                raise ValueError(f"Unknown table '{name}'. Expected one of {list(TABLE_SPECS)}")
+        if workers is not None and len(preload) > 1:
+            self.__load_parallel(preload,workers,executor)
+        for name in preload:
+            self.__table(name)
+        if compact and any(name in self.__tables for name in COMPACT_TABLES):
+            self.__table(COMPACT_TABLES[0])
     
     def stops(self) -> pd.DataFrame:
         """Get dataframe of all serviced Metra stops"""
-        return self.__stops
+        return self.__table('stops')
     
     def stop_times(self) -> pd.DataFrame:
-        """Get stop times dataset provided by the Metra GTFS API"""
-        return self.__stop_times
+        """Get stop times dataset provided by the Metra GTFS API (in its
+        compact form when the instance was created with `compact=True`)"""
+        return self.__table('stop_times')
     
     def trips(self) -> pd.DataFrame:
         """Get dataset of each trip.
@@ -60,30 +138,36 @@ class StaticAPI:
         will provide a list of active service ids which can be used to filter
         currently active trips.
         """
-        return self.__trips
+        return self.__table('trips')
     
     def routes(self) -> pd.DataFrame:
         """Get dataframe of all Metra routes"""
-        return self.__routes
+        return self.__table('routes')
     
     def shapes(self) -> pd.DataFrame:
         """Get dataset of geographical points for all Metra services/routes"""
-        return self.__shapes
+        return self.__table('shapes')
     
     def calendar(self) -> pd.DataFrame:
         """Calendar dataset that details when certain trips and services
         become active/inactive"""
-        return self.__calendar
+        return self.__table('calendar')
+    
+    def calendar_dates(self) -> pd.DataFrame:
+        """Exceptions to the "calendar" dataset. Services are added
+        (exception_type 1) or removed (exception_type 2) on specific dates"""
+        return self.__table('calendar_dates')
     
     def fare_rules(self) -> pd.DataFrame:
         """Dataset that details fare prices. (Use with "fare_attributes"
         dataset"""
-        return self.__fare_rules
+        return self.__table('fare_rules')
     
     def fare_attributes(self) -> pd.DataFrame:
         """Dataset fare attributes. (Use with "fare_rules" dataset)"""
-        return self.__fare_attributes
+        return self.__table('fare_attributes')
     
+    @profiled
     def trip_fare(self,origin:str,destination:str):
         """Get transportation fare given the origin and destination stops
         
@@ -94,32 +178,279 @@ class StaticAPI:
         destination : str
             stop id for the end of a trip
         """
-        stops_df = self.stops()
-        stops_df.set_index('stop_id',inplace=True)
-        origin_zone = stops_df.loc[origin]["zone_id"]
-        destination_zone = stops_df.loc[destination]["zone_id"]
+        return self.fare_table().price(origin,destination)
+    
+    @profiled
+    def trip_fares(self,pairs:list[tuple[str,str]]) -> pd.DataFrame:
+        """Get transportation fares for many origin/destination pairs at once
+        
+        Params:
+        -------
+        pairs : list[tuple[str, str]]
+            (origin, destination) stop id pairs. Pairs that cannot be priced
+            get a NaN price
+        """
+        pairs = pd.DataFrame(list(pairs),columns=['origin','destination'])
+        pairs['price'] = self.fare_table().prices_for(pairs['origin'],pairs['destination'])
+        return pairs
+    
+    @profiled
+    def fare_matrix(self) -> pd.DataFrame:
+        """Get a stop x stop matrix of fares (rows are origins, columns are
+        destinations)"""
+        return self.fare_table().matrix()
+    
+    def fare_table(self) -> FareTable:
+        """Precomputed zone-to-zone fares. Built on first use and reused for
+        the lifetime of the instance"""
+        if self.__fare_table is None:
+            self.__fare_table = FareTable(self.stops(),self.fare_rules(),self.fare_attributes())
+        return self.__fare_table
+    
+    def stop_index(self) -> StopTripIndex:
+        """Inverted stop -> trip index over the stop times dataset. Built on
+        first use and reused for the lifetime of the instance"""
+        if self.__stop_index is None:
+            self.__stop_index = StopTripIndex(self.stop_times())
+        return self.__stop_index
+    
+    def time_index(self) -> TimeIndex:
+        """Stop times partitioned by service and sorted by arrival time. Built
+        on first use and reused for the lifetime of the instance"""
+        if self.__time_index is None:
+            self.__time_index = TimeIndex(self.stop_times(),self.trips(),self.__base_dt)
+        return self.__time_index
+    
+    def trip_patterns(self) -> TripPatterns:
+        """Trips grouped by identical stop sequence, each storing only a
+        pattern, a start time and shared stop offsets. Built on first use and
+        reused for the lifetime of the instance"""
+        if self.__trip_patterns is None:
+            self.__trip_patterns = TripPatterns(self.stop_times(),self.__base_dt)
+        return self.__trip_patterns
+    
+    def warm(self,date:Union[str,dt.datetime]=None) -> None:
+        """Build every index that queries otherwise build on first use (stop,
+        time and pattern indexes, the services and journey planner of
+        `date`, fares, stop search, spatial index and shape geometry), so
+        that no query pays for them
         
-        rules = self.fare_rules()
-        rules = rules[(rules["origin_id"]==origin_zone) & (rules["destination_id"]==destination_zone)]
-        fare_id = rules.iloc[0]["fare_id"]
-        return self.fare_attributes().set_index("fare_id").loc[fare_id]["price"]
+        Params:
+        -------
+        date : Optional[str | datetime.datetime | datetime.date]
+            Service day to resolve active trips for. Defaults to today
+        """
+        date = self.__query_datetime(date)
+        self.stop_index()
+        self.time_index()
+        self.trip_patterns()
+        self.__active_trip_mask(date)
+        self.connection_scan(date)
+        self.fare_table()
+        self.__search_index()
+        self.spatial_index()
+        self.shape_geometry()
     
+    @profiled
     def trips_with_stop(self,stop_id:str) -> list[str]:
-        df = self.upcoming_schedule()
-        df = df[df['stop_id']==stop_id]
-        return list(set(df['trip_id']))
+        """Get the ids of today's trips that still have to call at a stop"""
+        now = dt.datetime.today()
+        patterns = self.trip_patterns()
+        trips, _, times = patterns.stop_visits(stop_id)
+        keep = self.__active_trip_mask(now)[trips] & (times > patterns.key(now))
+        return list(patterns.trip_ids[trips[keep]])
     
-    def stop_search(self,query:str) -> pd.DataFrame:
-        """Search for stop from the \"stops\" dataset"""
-        query = query.lower()
-        rows = []
-        for idx,row in self.__stops.iterrows():
-            if query in row['stop_id'].lower() or query in row['stop_name'].lower():
-                rows.append(row)
-        return pd.DataFrame(rows)
-                
+    @profiled
+    def stop_search(self,query:str,limit:int=None,fuzzy:bool=True) -> pd.DataFrame:
+        """Search for stop from the \"stops\" dataset. Results are ranked with
+        exact and prefix matches first
+        
+        Params:
+        -------
+        query : str
+            Text to look for in the stop id or stop name (case-insensitive)
+        limit : Optional[int]
+            Maximum number of results. Defaults to no limit
+        fuzzy : bool
+            Fall back to typo-tolerant matches when there are not enough direct
+            matches. Defaults to `True`
+        """
+        rows = self.__search_index().search(query,limit,fuzzy)
+        return self.stops().iloc[list(rows)]
+    
+    def __search_index(self) -> StopSearchIndex:
+        if self.__stop_search_index is None:
+            stops_df = self.stops()
+            self.__stop_search_index = StopSearchIndex(stops_df['stop_id'],stops_df['stop_name'])
+        return self.__stop_search_index
+    
+    def spatial_index(self) -> SpatialIndex:
+        """Grid index over stop coordinates. Built on first use and reused for
+        the lifetime of the instance"""
+        if self.__spatial_index is None:
+            stops_df = self.stops()
+            self.__spatial_index = SpatialIndex(stops_df['stop_lat'],stops_df['stop_lon'],cell_m=2000)
+        return self.__spatial_index
     
-    def next_trains(self,origin:str,destination:str,date:Union[str,dt.datetime]=None) -> pd.DataFrame:
+    @profiled
+    def nearest_stops(self,lat:float,lon:float,k:int=5) -> pd.DataFrame:
+        """Get the `k` stops closest to a point, nearest first
+        
+        Params:
+        -------
+        lat : float
+            Latitude in degrees
+        lon : float
+            Longitude in degrees
+        k : int
+            Number of stops. Defaults to `5`
+        
+        Returns:
+        --------
+        pd.DataFrame
+            Rows of the "stops" dataset with a "distance_m" column
+        """
+        rows, dist = self.spatial_index().nearest(lat,lon,k)
+        return self.__stops_with_distance(rows,dist)
+    
+    @profiled
+    def stops_within(self,lat:float,lon:float,radius_m:float) -> pd.DataFrame:
+        """Get the stops within `radius_m` meters of a point, nearest first
+        
+        Params:
+        -------
+        lat : float
+            Latitude in degrees
+        lon : float
+            Longitude in degrees
+        radius_m : float
+            Search radius in meters
+        
+        Returns:
+        --------
+        pd.DataFrame
+            Rows of the "stops" dataset with a "distance_m" column
+        """
+        rows, dist = self.spatial_index().within(lat,lon,radius_m)
+        return self.__stops_with_distance(rows,dist)
+    
+    @profiled
+    def nearest_stops_batch(self,lats,lons,k:int=1) -> pd.DataFrame:
+        """Get the `k` closest stops for many points at once (e.g. resolving
+        a stream of GPS fixes to stations)
+        
+        Params:
+        -------
+        lats : array-like
+            Latitudes in degrees
+        lons : array-like
+            Longitudes in degrees, aligned with `lats`
+        k : int
+            Number of stops per point. Defaults to `1`
+        
+        Returns:
+        --------
+        pd.DataFrame
+            One row per (point, stop) with "point" (position of the query
+            point) and "rank" columns in front of the stops columns, plus a
+            "distance_m" column. Points without coordinates are left out
+        """
+        rows, dist = self.spatial_index().nearest_batch(lats,lons,k)
+        point, rank = np.nonzero(rows >= 0)
+        df = self.__stops_with_distance(rows[point,rank],dist[point,rank])
+        df.insert(0,'rank',rank)
+        df.insert(0,'point',point)
+        return df
+    
+    def __stops_with_distance(self,rows:np.ndarray,dist:np.ndarray) -> pd.DataFrame:
+        df = self.stops().iloc[rows].reset_index(drop=True)
+        df['distance_m'] = dist
+        return df
+    
+    def shape_geometry(self) -> ShapeGeometry:
+        """Packed shape coordinates with cumulative distances. Built on first
+        use and reused for the lifetime of the instance"""
+        if self.__shape_geometry is None:
+            self.__shape_geometry = ShapeGeometry(self.shapes())
+        return self.__shape_geometry
+    
+    @profiled
+    def trip_progress(self,trip_ids:Union[str,list[str]],lats,lons) -> pd.DataFrame:
+        """Snap vehicle positions onto their trips' shapes
+        
+        Params:
+        -------
+        trip_ids : str | list[str]
+            One trip id for all points, or one per point
+        lats : array-like
+            Latitudes in degrees
+        lons : array-like
+            Longitudes in degrees, aligned with `lats`
+        
+        Returns:
+        --------
+        pd.DataFrame
+            One row per point with "trip_id", "lat", "lon",
+            "shape_dist_traveled" (meters along the shape), "offset_m"
+            (meters from the shape), "next_stop_id", "next_stop_sequence" and
+            "distance_to_next_stop_m". Points on unknown trips, or past the
+            last stop, have missing values
+        """
+        lats = np.asarray(lats,dtype=float).ravel()
+        lons = np.asarray(lons,dtype=float).ravel()
+        trip_ids = np.full(len(lats),trip_ids,dtype=object) if isinstance(trip_ids,str) else np.asarray(trip_ids,dtype=object)
+        n = len(lats)
+        along, offset, to_next = np.full(n,np.nan), np.full(n,np.nan), np.full(n,np.nan)
+        next_stop = np.full(n,None,dtype=object)
+        next_seq = np.full(n,-1,dtype=np.int64)
+        
+        geometry = self.shape_geometry()
+        codes, uniques = pd.factorize(pd.Series(trip_ids,dtype=object))
+        order = np.argsort(codes,kind='stable')
+        bounds = np.searchsorted(codes[order],np.arange(len(uniques)+1))
+        for i, trip_id in enumerate(uniques):
+            trip = self.__trip_stops(trip_id)
+            if trip is None:
+                continue
+            shape_id, stop_ids, sequences, stop_dist = trip
+            rows = order[bounds[i]:bounds[i+1]]
+            along[rows], offset[rows], _ = geometry.project(shape_id,lats[rows],lons[rows])
+            nxt = np.searchsorted(stop_dist,along[rows],side='left')
+            ahead = nxt < len(stop_ids)
+            rows, nxt = rows[ahead], nxt[ahead]
+            next_stop[rows] = stop_ids[nxt]
+            next_seq[rows] = sequences[nxt]
+            to_next[rows] = stop_dist[nxt] - along[rows]
+        
+        return pd.DataFrame({
+            'trip_id': trip_ids,
+            'lat': lats,
+            'lon': lons,
+            'shape_dist_traveled': along,
+            'offset_m': offset,
+            'next_stop_id': next_stop,
+            'next_stop_sequence': next_seq,
+            'distance_to_next_stop_m': to_next,
+        })
+    
+    def __build_trip_stops(self,trip_id:str):
+        """(shape_id, stop ids, stop sequences, stop distances along the shape)
+        of a trip, or `None` if the trip or its shape is unknown"""
+        trips_df = self.trips()
+        shape = trips_df.loc[trips_df['trip_id'] == trip_id,'shape_id']
+        index = self.stop_index()
+        code = index.trip_lookup.get(trip_id)
+        if shape.empty or code is None or shape.iloc[0] not in self.shape_geometry().shape_lookup:
+            return None
+        rows = self.stop_times().iloc[np.flatnonzero(index.row_trips == code)]
+        rows = rows.sort_values('stop_sequence',kind='stable')
+        coords = self.stops().drop_duplicates('stop_id').set_index('stop_id').reindex(rows['stop_id'].to_numpy(dtype=object))
+        shape_id = shape.iloc[0]
+        stop_dist = self.shape_geometry().stop_distances(shape_id,coords['stop_lat'],coords['stop_lon'])
+        return shape_id, rows['stop_id'].to_numpy(dtype=object), rows['stop_sequence'].to_numpy(), stop_dist
+    
+    @profiled
+    def next_trains(self,origin:str,destination:str,date:Union[str,dt.datetime]=None,realtime:RealtimeStore=None) -> pd.DataFrame:
         """Get dataframe of upcoming departure times for trains traveling from
         one point, "origin", to another, "destination"
         
@@ -129,7 +460,119 @@ class StaticAPI:
             stop id for the start of a trip
         destination : str
             stop id for the end of a trip
+        realtime : Optional[RealtimeStore]
+            Latest realtime feeds. When given, "delay" and
+            "predicted_arrival_time" columns are added
         """
+        date = self.__query_datetime(date)
+        patterns = self.trip_patterns()
+        trips, origin_rows, departures, _, _ = patterns.journeys(origin,destination)
+        
+        keep = self.__active_trip_mask(date)[trips] & (departures > patterns.key(date))
+        order = np.argsort(departures[keep],kind='stable')
+        
+        df = self.__stop_time_rows(origin_rows[keep][order]).reset_index(drop=True)
+        if realtime is not None:
+            df = apply_trip_updates(df,realtime.trip_updates(),self.__trip_stop_times(df['trip_id']),self.__base_dt)
+        return df
+    
+    @profiled
+    def next_trains_batch(self,pairs:list[tuple[str,str]],date:Union[str,dt.datetime]=None) -> pd.DataFrame:
+        """Get upcoming departures for many origin/destination pairs at once.
+        The active trip set is resolved once and shared by every pair
+        
+        Params:
+        -------
+        pairs : list[tuple[str, str]]
+            (origin, destination) stop id pairs
+        date : Optional[str | datetime.datetime | datetime.date]
+            Point in time to look ahead from. Defaults to now
+        
+        Returns:
+        --------
+        pd.DataFrame
+            One row per departure with "origin", "destination" and
+            "destination_arrival_time" columns in front of the stop times
+            columns, ordered by pair and then by departure
+        """
+        date = self.__query_datetime(date)
+        patterns = self.trip_patterns()
+        now = patterns.key(date)
+        active = self.__active_trip_mask(date)
+        arrivals = self.stop_times()['arrival_time'].to_numpy()
+        
+        pairs = list(pairs)
+        pair_idx, o_rows, o_times, d_rows = [], [], [], []
+        for i, (origin, destination) in enumerate(pairs):
+            trips, origin_rows, departures, destination_rows, _ = patterns.journeys(origin,destination)
+            keep = active[trips] & (departures > now)
+            o_rows.append(origin_rows[keep])
+            o_times.append(departures[keep])
+            d_rows.append(destination_rows[keep])
+            pair_idx.append(np.full(keep.sum(),i,dtype=np.intp))
+        
+        empty = [np.empty(0,dtype=np.intp)]
+        pair_idx, o_rows, o_times, d_rows = (np.concatenate(a + empty) for a in (pair_idx,o_rows,o_times,d_rows))
+        order = np.lexsort((o_times,pair_idx))
+        pair_idx, o_rows, d_rows = pair_idx[order], o_rows[order], d_rows[order]
+        
+        df = self.__stop_time_rows(o_rows).reset_index(drop=True)
+        pair_df = pd.DataFrame(pairs,columns=['origin','destination'])
+        df.insert(0,'destination_arrival_time',self.__datetimes(arrivals[d_rows]))
+        df.insert(0,'destination',pair_df['destination'].to_numpy()[pair_idx])
+        df.insert(0,'origin',pair_df['origin'].to_numpy()[pair_idx])
+        return df
+    
+    @profiled
+    def plan_journey(self,origin:str,destination:str,date:Union[str,dt.datetime]=None,max_transfers:int=2,min_transfer:dt.timedelta=dt.timedelta(minutes=3)) -> pd.DataFrame:
+        """Plan journeys that may change trains along the way. Returns every
+        Pareto-optimal itinerary for arrival time versus number of transfers
+        
+        Params:
+        -------
+        origin : str
+            stop id for the start of a trip
+        destination : str
+            stop id for the end of a trip
+        date : Optional[str | datetime.datetime | datetime.date]
+            Earliest departure. Defaults to now
+        max_transfers : int
+            Maximum number of changes between trains. Defaults to `2`
+        min_transfer : datetime.timedelta
+            Minimum time needed to change trains. Defaults to 3 minutes
+        
+        Returns:
+        --------
+        pd.DataFrame
+            One row per leg, with "itinerary" numbering the alternatives
+            (fewest transfers first) and "leg" the order within one
+        """
+        date = self.__query_datetime(date)
+        csa = self.connection_scan(date)
+        journeys = csa.journeys(origin,destination,date,max_transfers=max_transfers,min_transfer=int(min_transfer.total_seconds()))
+        
+        rows = []
+        for i, legs in enumerate(journeys):
+            for j, (trip_id, from_stop, to_stop, departure, arrival) in enumerate(legs):
+                rows.append([i,len(legs)-1,j,trip_id,from_stop,to_stop,departure,arrival])
+        df = pd.DataFrame(rows,columns=['itinerary','transfers','leg','trip_id','origin','destination','departure_time','arrival_time'])
+        df['departure_time'] = pd.to_datetime(df['departure_time'])
+        df['arrival_time'] = pd.to_datetime(df['arrival_time'])
+        routes = self.__regular_table('trips').drop_duplicates('trip_id').set_index('trip_id')['route_id']
+        df.insert(4,'route_id',df['trip_id'].map(routes))
+        return df
+    
+    def connection_scan(self,date:Union[str,dt.datetime]=None) -> ConnectionScan:
+        """Connection arrays for the trips running on a service day. The most
+        recently used days are kept"""
+        return self.__connection_scan(to_service_date(self.__query_datetime(date)))
+    
+    def __build_connection_scan(self,date:dt.date) -> ConnectionScan:
+        index = self.stop_index()
+        active = self.__active_trip_mask(date)
+        return ConnectionScan(self.__stop_time_rows(np.flatnonzero(active[index.row_trips])))
+    
+    def __query_datetime(self,date:Union[str,dt.date,dt.datetime,None]) -> dt.datetime:
         if type(date) is str:
             try:
                 date = dt.datetime.strptime(date,DASH_FMT)
@@ -138,34 +581,31 @@ class StaticAPI:
                     date = dt.datetime.strptime(date,SLASH_FMT)
                 except:
                     date = dt.datetime.today()
-        elif type(date) is dt.datetime:
+        elif isinstance(date,dt.datetime):
             pass
-        elif type(date) is dt.date:
+        elif isinstance(date,dt.date):
             date = dt.datetime.combine(date,time=dt.time(3,1,0))
         else:
             date = dt.datetime.today()
-            
-        st = self.upcoming_schedule(date=date)
-        ordered_cols = list(st.columns)
-        relevant_st = st[st["stop_id"]==origin]
-        relevant_triplist: str = list(set(relevant_st["trip_id"]))
-        relevant_st = st[st['trip_id'].isin(relevant_triplist)]
-        relevant_st = relevant_st[relevant_st["stop_id"]==destination]
-        relevant_triplist: str = list(set(relevant_st["trip_id"]))
-        relevant_st = st[st['trip_id'].isin(relevant_triplist)]
-        
-        dfs_that_matter = []
-        for trip_id in relevant_triplist:
-            df = relevant_st[relevant_st["trip_id"]==trip_id]
-            df.set_index("stop_id",inplace=True)
-            if df.loc[origin]["stop_sequence"] < df.loc[destination]["stop_sequence"]:
-                dfs_that_matter.append(df.reset_index())
-        
-        df = pd.concat(dfs_that_matter)[ordered_cols]
-        
-        return df[df["stop_id"]==origin].sort_values(by="arrival_time").reset_index(drop=True)
-        
-    def upcoming_schedule(self,direction:str=None,date:dt.datetime=None) -> pd.DataFrame:
+        return date
+    
+    def __active_trip_mask(self,date:dt.datetime) -> np.ndarray:
+        # boolean mask over trip codes of the trips running on `date`
+        return self.__trip_mask(self.service_calendar().trip_rows(to_service_date(date)))
+    
+    def __trip_mask(self,trip_rows:np.ndarray) -> np.ndarray:
+        # boolean mask over trip codes of the given rows of `trips()`. The
+        # codes are shared by `stop_index()`, `time_index()` and `trip_patterns()`
+        trip_ids = self.trip_patterns().trip_ids
+        if self.__index_trip_codes is None:
+            self.__index_trip_codes = pd.Index(trip_ids).get_indexer(self.trips()['trip_id'])
+        codes = self.__index_trip_codes[trip_rows]
+        active = np.zeros(len(trip_ids),dtype=bool)
+        active[codes[codes >= 0]] = True
+        return active
+        
+    @profiled
+    def upcoming_schedule(self,direction:str=None,date:dt.datetime=None,start:dt.datetime=None,end:Union[dt.datetime,dt.timedelta]=None) -> pd.DataFrame:
         """Filters the stop times dataset by only retrieving upcoming 
         arrivals/departure times
         
@@ -174,15 +614,22 @@ class StaticAPI:
         direction : Optional[str | int]
             General direction ("inbound" or "outbound") of trips to specify.
             Defaults to `None`
+        start : Optional[datetime.datetime]
+            Only include stop times after this point. Defaults to `date`
+            (or the current time)
+        end : Optional[datetime.datetime | datetime.timedelta]
+            Only include stop times up to this point, or this long after
+            `start`. Defaults to the rest of the service day
         """
         if type(date) is str:
             try:
-                date = pd.to_datetime(dt.datetime.strptime(date,DASH_FMT))
+                date = dt.datetime.strptime(date,DASH_FMT)
             except:
                 try:
-                    date = pd.to_datetime(dt.datetime.strptime(date,SLASH_FMT))
+                    date = dt.datetime.strptime(date,SLASH_FMT)
                 except:
-                    date = pd.to_datetime(dt.datetime.today().date())
+                    date = dt.datetime.combine(dt.date.today(),time=dt.time(0,0,0))
+            now = pd.to_datetime(date)
         elif type(date) is dt.datetime:
             now = pd.to_datetime(date)
         else:
@@ -199,15 +646,11 @@ class StaticAPI:
         else:
             direction = None
 
-        trips_df = self.active_trips(direction=direction,date=date)
-        active_trips = list(set(trips_df['trip_id']))
-        
-        stop_times_df = self.__stop_times[self.__stop_times['trip_id'].isin(active_trips)]
-        stop_times_df = stop_times_df[stop_times_df['arrival_time'] > now]
-        
-        return stop_times_df.reset_index(drop=True)
+        trips_df = self.__active_trips(direction=direction,date=date)
+        return self.__stop_times_between(trips_df,start or now,end)
     
-    def upcoming_route_schedule(self,route_id:str,direction:Union[Union[str,int],None]=None) -> pd.DataFrame:
+    @profiled
+    def upcoming_route_schedule(self,route_id:str,direction:Union[Union[str,int],None]=None,start:dt.datetime=None,end:Union[dt.datetime,dt.timedelta]=None) -> pd.DataFrame:
         """Get a schedule of all scheduled stop times by route
         
         Parameters:
@@ -217,6 +660,11 @@ class StaticAPI:
         direction : str | int | None
             Filter results by direction ("inbound" or "outbound"). Alternatively, you can use the API's
             integer notation to indicate how to filter. 0 = "outbound", 1 = "inbound"
+        start : Optional[datetime.datetime]
+            Only include stop times after this point. Defaults to the current time
+        end : Optional[datetime.datetime | datetime.timedelta]
+            Only include stop times up to this point, or this long after
+            `start`. Defaults to the rest of the service day
         """
         
         if type(direction) is str:
@@ -231,144 +679,185 @@ class StaticAPI:
             direction = None
 
         now = pd.to_datetime(dt.datetime.today())
-        trips_df = self.active_trips(route_id=route_id.upper(),direction=direction)
-        active_trips = list(set(trips_df['trip_id']))
-        
-        stop_times_df = self.__stop_times[self.__stop_times['trip_id'].isin(active_trips)]
-        stop_times_df = stop_times_df[stop_times_df['arrival_time'] > now]
-        
-        return stop_times_df.reset_index(drop=True)
+        trips_df = self.__active_trips(route_id=route_id.upper(),direction=direction)
+        return self.__stop_times_between(trips_df,start or now,end)
     
+    def __stop_times_between(self,trips_df:pd.DataFrame,start:dt.datetime,end:Union[dt.datetime,dt.timedelta,None]) -> pd.DataFrame:
+        if isinstance(end,dt.timedelta):
+            end = start + end
+        rows = self.time_index().between(trips_df['service_id'].unique(),start,end)
+        active = self.__trip_mask(self.trips().index.get_indexer(trips_df.index))
+        rows = rows[active[self.time_index().row_trips[rows]]]
+        return self.__stop_time_rows(rows).reset_index(drop=True)
+    
+    def service_calendar(self) -> ServiceCalendar:
+        """Resolver for the services and trips active on a date. Built on
+        first use and reused for the lifetime of the instance"""
+        if self.__service_calendar is None:
+            try:
+                calendar_dates = self.calendar_dates()
+            except KeyError:
+                calendar_dates = pd.DataFrame(columns=['service_id','date','exception_type'])
+            self.__service_calendar = ServiceCalendar(self.calendar(),calendar_dates,self.trips())
+        return self.__service_calendar
+    
+    @profiled
     def active_calendar_services(self,date:dt.datetime=None) -> list[str]:
         """Get list of currently active services"""
-        if date is None:
-            today = pd.to_datetime(dt.date.today())
-        elif type(date) is str:
-            date = dt.datetime.strptime(date,DASH_FMT)
-            today = pd.to_datetime(date)
-        elif type(date) is dt.datetime:
-            today = pd.to_datetime(date)
-            
-        df = self.__calendar[self.__calendar['start_date'] <= today]
-        df = df[df['end_date'] >= today]
-        return list(set(df['service_id']))
+        return list(self.service_calendar().services(to_service_date(date)))
     
+    @profiled
     def active_trips(self,route_id:str=None,direction:Union[int,None]=None,date:dt.datetime=None) -> pd.DataFrame:
-        df = self.__trips
+        df = self.__active_trips(route_id,direction,date)
+        if self.__codec is not None:
+            df = self.__codec.decode('trips',df)
+        return df
+    
+    def __active_trips(self,route_id:str=None,direction:Union[int,None]=None,date:dt.datetime=None) -> pd.DataFrame:
+        df = self.trips().iloc[self.service_calendar().trip_rows(to_service_date(date))]
         if type(route_id) is str:
             df = df[df['route_id']==route_id]
-        df = df[df['service_id'].isin(self.active_calendar_services(date=date))]
         
         if type(direction) is int:
             df = df[df['direction_id']==direction]
         
         return df
     
-    def __convert_time_strings(self,time:str):
-        time = time.strip()
-        hh, mm, ss = (int(time[:2]), int(time[3:5]), int(time[-2:]))
-        return self.__base_dt + dt.timedelta(hours=hh,minutes=mm,seconds=ss)
-    
-    def __get_stops(self) -> pd.DataFrame:
-        bytes_io = io.BytesIO(self.__zip.read('stops.txt'))
-        df = pd.read_csv(bytes_io)
-        df.columns = list(map(lambda x: str(x).strip(),df.columns))
-        df.drop(columns=['stop_url','stop_desc'],inplace=True)
-        for col in ['stop_id','stop_name','zone_id']:
-            df[col] = df[col].apply(lambda x: str(x).strip())
+    def __table(self,name:str) -> pd.DataFrame:
+        df = self.__tables.get(name)
+        if df is None:
+            df = self.__tables[name] = self.__load_table(name)
+        if self.__compact and self.__codec is None and name in COMPACT_TABLES:
+            df = self.__compact_tables()[name]
         return df
     
-    def __get_stop_times(self) -> pd.DataFrame:
-        bytes_io = io.BytesIO(self.__zip.read('stop_times.txt'))
-        df = pd.read_csv(bytes_io)
-        df.columns = list(map(lambda x: str(x).strip(),df.columns))
-        df.drop(columns=['departure_time','notice'],inplace=True)
-        df['arrival_time'] = df['arrival_time'].apply(lambda time: self.__convert_time_strings(time))
-        df['trip_id'] = df['trip_id'].apply(lambda x : str(x).strip())
-        df['stop_id'] = df['stop_id'].apply(lambda x : str(x).strip())
-        return df
+    def __compact_tables(self) -> dict[str,pd.DataFrame]:
+        raw = {name:self.__tables.get(name) for name in COMPACT_TABLES}
+        for name, df in raw.items():
+            if df is None:
+                raw[name] = self.__load_table(name)
+        with PROFILER.span('compact'):
+            codec = CompactFeed(self.stops(),raw['trips'],raw['stop_times'],self.__base_dt)
+            for name, df in raw.items():
+                self.__tables[name] = codec.encode(name,df)
+        self.__codec = codec
+        return self.__tables
     
-    def __get_trips(self) -> pd.DataFrame:
-        bytes_io = io.BytesIO(self.__zip.read('trips.txt'))
-        df = pd.read_csv(bytes_io)
-        df.columns = list(map(lambda x: str(x).strip(),df.columns))
-        df.drop(columns=['block_id'],inplace=True)
-        for col in ['route_id','service_id','trip_id','trip_headsign','shape_id']:
-            df[col] = df[col].apply(lambda x: str(x).strip())
+    def __regular_table(self,name:str) -> pd.DataFrame:
+        df = self.__table(name)
+        if self.__codec is not None and name in COMPACT_TABLES:
+            df = self.__codec.decode(name,df)
         return df
     
-    def __get_routes(self) -> pd.DataFrame:
-        bytes_io = io.BytesIO(self.__zip.read('routes.txt'))
-        df = pd.read_csv(bytes_io)
-        df.columns = list(map(lambda x: str(x).strip(),df.columns))
-        df.rename(columns={'shape_pt_lat':'lat','shape_pt_lon':'lon'})
-        df.drop(columns=['route_desc','route_url','agency_id'],inplace=True)
-        for col in ['route_id','route_short_name','route_long_name','route_color','route_text_color']:
-            df[col] = df[col].apply(lambda x: str(x).strip())
+    def __stop_time_rows(self,rows:np.ndarray) -> pd.DataFrame:
+        """Rows of `stop_times()` in the regular form"""
+        df = self.stop_times().iloc[rows]
+        if self.__codec is not None:
+            df = self.__codec.decode('stop_times',df)
         return df
     
-    def __get_shapes(self) -> pd.DataFrame:
-        bytes_io = io.BytesIO(self.__zip.read('shapes.txt'))
-        df = pd.read_csv(bytes_io)
-        df.columns = list(map(lambda x: str(x).strip(),df.columns))
-        for col in ['shape_id']:
-            df[col] = df[col].apply(lambda x: str(x).strip())
-        return df
-
-    def __get_calendar(self) -> pd.DataFrame:
-        bytes_io = io.BytesIO(self.__zip.read('calendar.txt'))
-        df = pd.read_csv(bytes_io)
-        df.columns = list(map(lambda x: str(x).strip(),df.columns))
-        df['service_id'] = df['service_id'].apply(lambda x: str(x).strip())
-        df['start_date'] = pd.to_datetime(df['start_date'],format=CALENDAR_FMT)
-        df['end_date'] = pd.to_datetime(df['end_date'],format=CALENDAR_FMT)
-        return df
+    def __trip_stop_times(self,trip_ids:pd.Series) -> pd.DataFrame:
+        """Every stop time (regular form) of the given trips"""
+        patterns = self.trip_patterns()
+        codes = [patterns.trip_lookup[t] for t in pd.unique(trip_ids) if t in patterns.trip_lookup]
+        return self.__stop_time_rows(np.sort(patterns.trip_rows(codes)))
+    
+    def __datetimes(self,values:np.ndarray) -> np.ndarray:
+        return self.__codec.datetimes(values) if self.__codec is not None else values
+    
+    def save_snapshot(self,path:str) -> None:
+        """Write every table to a memory-mappable snapshot file that other
+        processes can attach to with `StaticAPI(snapshot=path)`"""
+        tables = {name:self.__regular_table(name) for name in TABLE_SPECS}
+        with PROFILER.span('snapshot.save'):
+            write_snapshot(path,tables,self.__base_dt)
     
-    def __get_fare_rules(self) -> pd.DataFrame:
-        bytes_io = io.BytesIO(self.__zip.read('fare_rules.txt'))
-        df = pd.read_csv(bytes_io)
-        df.columns = list(map(lambda x: str(x).strip(),df.columns))
-        df.drop(columns=['route_id','contains_id'],inplace=True)
-        for col in ['origin_id','destination_id']:
-            df[col] = df[col].apply(lambda x: str(x).strip())
+    def __attach(self,snapshot:Union[str,FeedSnapshot]) -> None:
+        with PROFILER.span('snapshot.attach'):
+            if not isinstance(snapshot,FeedSnapshot):
+                snapshot = FeedSnapshot(snapshot)
+            self.__tables.update(snapshot.tables())
+        if snapshot.base_dt is not None:
+            self.__base_dt = snapshot.base_dt
+    
+    def __prepare(self) -> None:
+        if self.__base_dt is None:
+            published_date = get_last_local_publish()
+            self.__base_dt = dt.datetime.combine(published_date.date(),time=dt.time(0,0,0))
+            if self.__use_cache:
+                if self.__verify_hash:
+                    self.__zip = get_schedule_zip()
+                    self.__cache_key = cache_key(published_date,feed_hash(self.__zip))
+                else:
+                    self.__cache_key = cache_key(published_date)
+    
+    def __open_zip(self) -> None:
+        if self.__zip is None:
+            with PROFILER.span('schedule_zip.open'):
+                self.__zip = get_schedule_zip()
+    
+    def __load_cached(self,name:str) -> Union[pd.DataFrame,None]:
+        if self.__cache_key is None:
+            return None
+        with PROFILER.span('cache.load',table=name) as span:
+            df = load_cached_table(self.__cache_key,name)
+            span.rows = None if df is None else len(df)
         return df
     
-    def __get_fare_attributes(self) -> pd.DataFrame:
-        bytes_io = io.BytesIO(self.__zip.read('fare_attributes.txt'))
-        df = pd.read_csv(bytes_io)
-        df.columns = list(map(lambda x: str(x).strip(),df.columns))
-        for col in ['currency_type']:
-            df[col] = df[col].apply(lambda x: str(x).strip())
+    def __save_cached(self,name:str,df:pd.DataFrame) -> None:
+        if self.__cache_key is not None:
+            try:
+                with PROFILER.span('cache.save',table=name):
+                    save_cached_table(self.__cache_key,name,df)
+            except OSError:
+                pass
+    
+    def __load_table(self,name:str) -> pd.DataFrame:
+        self.__prepare()
+        df = self.__load_cached(name)
+        if df is not None:
+            return df
+        self.__open_zip()
+        df = read_table(self.__zip,name,base_dt=self.__base_dt)
+        self.__save_cached(name,df)
         return df
+    
+    def __load_parallel(self,names:list[str],workers:int,executor:str) -> None:
+        """Decode every table in `names` that is not cached on a worker pool"""
+        self.__prepare()
+        missing = []
+        for name in names:
+            if name in self.__tables:
+                continue
+            df = self.__load_cached(name)
+            if df is None:
+                missing.append(name)
+            else:
+                self.__tables[name] = df
+        if not missing:
+            return
+        self.__open_zip()
+        with PROFILER.span('read_tables',executor=executor):
+            tables = read_tables(self.__zip,missing,self.__base_dt,workers=workers,executor=executor)
+        for name, df in tables.items():
+            self.__tables[name] = df
+            self.__save_cached(name,df)
 
 
 def stops() -> Stops:
-    url = METRA_BASE + "/schedule/stops"
-    resp = requests.get(url,auth=AUTH)
-    return Stops(resp.json())
+    return default_client().stops()
 
 def trips() -> Trips:
-    url = METRA_BASE + "/schedule/trips"
-    resp = requests.get(url,auth=AUTH)
-    return Trips(resp.json())
+    return default_client().trips()
     
 def shapes() -> Shapes:
-    url = METRA_BASE + "/schedule/shapes"
-    resp = requests.get(url,auth=AUTH)
-    return Shapes(resp.json())
+    return default_client().shapes()
     
 def routes() -> Routes:
-    url = METRA_BASE + "/schedule/routes"
-    resp = requests.get(url,auth=AUTH)
-    return Routes(resp.json())
+    return default_client().routes()
 
 def calendar():
-    url = METRA_BASE + "/schedule/calendar"
-    resp = requests.get(url,auth=AUTH)
-    return Calendars(resp.json())
+    return default_client().calendar()
     
 def calendar_dates():
-    url = METRA_BASE + "/schedule/calendar_dates"
-    resp = requests.get(url,auth=AUTH)
-    return resp.json()
-
+    return default_client().calendar_dates()
@@ -1,21 +1,38 @@
 import io
+import os
+import json
+import hashlib
 import zipfile
-import requests
+import functools
+import tempfile
 import datetime as dt
-from requests.auth import HTTPBasicAuth
 
 from .paths import DATA_PATH
 from .constants import METRA_BASE
-from .auth import METRA_API_KEY, METRA_SECRET_KEY
+from .auth import get_credentials
 
-AUTH = HTTPBasicAuth(METRA_API_KEY,METRA_SECRET_KEY)
+# `requests` and the credentials are only loaded once a request is made,
+# which keeps `import metra` fast and free of side effects
 PUBLISHED_FMT = r'%m/%d/%Y %I:%M:%S %p'
 CALENDAR_FMT = r'%Y%m%d'
+SCHEDULE_MEMBERS = ['stop_times','stops','calendar','calendar_dates','routes','shapes','trips','fare_rules','fare_attributes']
+
+@functools.lru_cache(maxsize=None)
+def _auth():
+    from requests.auth import HTTPBasicAuth
+    return HTTPBasicAuth(*get_credentials())
+
+def __getattr__(name:str):
+    if name == 'AUTH':
+        return _auth()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_publish_time() -> dt.datetime:
+    import requests
     url = METRA_BASE + "/raw/published.txt"
-    resp = requests.get(url,auth=AUTH)
-    time = resp.text
+    resp = requests.get(url,auth=_auth())
+    resp.raise_for_status()
+    time = resp.text.strip()
     with open(f'{DATA_PATH}/last_published.txt','w+') as txtfile:
         txtfile.write(time)
     return dt.datetime.strptime(time,PUBLISHED_FMT)
@@ -23,7 +40,7 @@ def get_publish_time() -> dt.datetime:
 def get_last_local_publish() -> dt.datetime:
     try:
         with open(f'{DATA_PATH}/last_published.txt','r+') as txtfile:
-            datetime = txtfile.read()
+            datetime = txtfile.read().strip()
             datetime = dt.datetime.strptime(datetime,PUBLISHED_FMT)
             # if dt.datetime.combine(datetime.date(),time=dt.time(3,0,0)) > dt.datetime.now():
             if datetime.date() < dt.datetime.today().date():
@@ -32,17 +49,99 @@ def get_last_local_publish() -> dt.datetime:
     except:
         return get_publish_time()
     
-def update_schedule_zip():
-    url = METRA_BASE + "/raw/schedule.zip"
-    resp = requests.get(url,auth=AUTH)
-    updated_zip = zipfile.ZipFile(io.BytesIO(resp.content),'r')
-    new_zip = zipfile.ZipFile(f'{DATA_PATH}/schedule.zip','w')
+def update_schedule_zip(force:bool=False) -> bool:
+    """Download the latest schedule.zip into the data directory.
+    
+    The download is streamed to a temporary file, every member is checked
+    against its CRC, and the file is then swapped in with an atomic rename,
+    so readers only ever see the old or the new feed. Nothing is replaced
+    when the publish timestamp or the content hash is unchanged.
+    
+    Params:
+    -------
+    force : bool
+        Download even if the local feed is already current. Defaults to `False`
+    
+    Returns:
+    --------
+    bool
+        Whether the local feed was replaced
+    """
+    import requests
+    from .cache import clear_cache
+    os.makedirs(DATA_PATH,exist_ok=True)
+    zip_path = os.path.join(DATA_PATH,'schedule.zip')
+    manifest = read_schedule_manifest()
+    resp = requests.get(METRA_BASE + "/raw/published.txt",auth=_auth())
+    resp.raise_for_status()
+    published = resp.text.strip()
+    if not force and os.path.exists(zip_path) and manifest.get('published') == published:
+        return False
+    
+    fd, tmp_path = tempfile.mkstemp(prefix='.schedule.',suffix='.zip',dir=DATA_PATH)
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd,'wb') as fp:
+            with requests.get(METRA_BASE + "/raw/schedule.zip",auth=_auth(),stream=True) as resp:
+                resp.raise_for_status()
+                for chunk in resp.iter_content(chunk_size=1 << 16):
+                    digest.update(chunk)
+                    fp.write(chunk)
+            fp.flush()
+            os.fsync(fp.fileno())
+        sha256 = digest.hexdigest()
+        
+        if not force and os.path.exists(zip_path) and manifest.get('sha256') == sha256:
+            os.remove(tmp_path)
+            _write_atomic(os.path.join(DATA_PATH,'schedule.json'),json.dumps(dict(manifest,published=published)))
+            _write_atomic(os.path.join(DATA_PATH,'last_published.txt'),published)
+            return False
+        
+        members = _verify_schedule_zip(tmp_path)
+        # mkstemp creates the file owner-only; give it the usual permissions
+        os.chmod(tmp_path,0o666 & ~_umask())
+        os.replace(tmp_path,zip_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     
-    for f in ['stop_times','stops','calendar','calendar_dates','routes','shapes','trips','fare_rules','fare_attributes']:
-        fbytes = updated_zip.read(f'{f}.txt')
-        new_zip.writestr(f'{f}.txt',fbytes,zipfile.ZIP_DEFLATED)
-    updated_zip.close()
-    new_zip.close()
+    _write_atomic(os.path.join(DATA_PATH,'schedule.json'),json.dumps({'published':published,'sha256':sha256,'members':members}))
+    _write_atomic(os.path.join(DATA_PATH,'last_published.txt'),published)
+    clear_cache()
+    return True
+
+def read_schedule_manifest() -> dict:
+    """Publish timestamp, SHA-256 and member CRCs recorded for the local
+    schedule.zip (empty if unknown)"""
+    try:
+        with open(os.path.join(DATA_PATH,'schedule.json'),'r') as fp:
+            return json.load(fp)
+    except (OSError,ValueError):
+        return {}
+
+def _verify_schedule_zip(path:str) -> dict[str,int]:
+    # streams every member through its CRC check; raises on a corrupt archive
+    with zipfile.ZipFile(path,'r') as zf:
+        names = set(zf.namelist())
+        missing = [f'{f}.txt' for f in SCHEDULE_MEMBERS if f'{f}.txt' not in names]
+        if missing:
+            raise zipfile.BadZipFile(f'schedule.zip is missing {missing}')
+        bad = zf.testzip()
+        if bad is not None:
+            raise zipfile.BadZipFile(f'CRC check failed for {bad}')
+        return {info.filename:info.CRC for info in zf.infolist()}
+
+def _umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+def _write_atomic(path:str,text:str) -> None:
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path,'w') as fp:
+        fp.write(text)
+    os.replace(tmp_path,path)
         
 def get_schedule_zip() -> zipfile.ZipFile:
     try:
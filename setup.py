@@ -12,4 +12,5 @@ setuptools.setup(
     license='GPU',
     packages=setuptools.find_packages(where='metra',include=["__init__"],exclude=["metra","constants","utils","utils_metra"]),
     install_requires=['requests','pandas','beautifulsoup4'],
+    extras_require={'realtime':['gtfs-realtime-bindings']},
 )
@@ -0,0 +1,133 @@
+import io
+import os
+import sys
+import json
+import time
+import zipfile
+import threading
+import datetime as dt
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+import metra.static
+from metra.static import StaticAPI
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.dirname(__file__)),'benchmarks'))
+from synthetic_feed import make_feed
+
+FIXTURES = os.path.join(os.path.dirname(__file__),'fixtures')
+
+# publish time of the synthetic feeds; the 15th is a Thursday
+PUBLISHED = dt.datetime(2026,1,15,6,0)
+
+def fixture_bytes(name:str) -> bytes:
+    with open(os.path.join(FIXTURES,name),'rb') as fp:
+        return fp.read()
+
+def synthetic_feed(blank:list[tuple[str,int]]=(),**kwargs) -> bytes:
+    """Small synthetic schedule.zip (see benchmarks/synthetic_feed.py) with
+    the times of the given (trip_id, stop_sequence) stops left blank"""
+    data = make_feed(**dict(dict(routes=2,trips_per_route=12,stops_per_trip=6,shape_points_per_stop=3,published=PUBLISHED.date()),**kwargs))
+    if not blank:
+        return data
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        members = {name:zf.read(name) for name in zf.namelist()}
+    df = pd.read_csv(io.BytesIO(members['stop_times.txt']),dtype=str,keep_default_na=False)
+    rows = pd.MultiIndex.from_frame(df[['trip_id','stop_sequence']]).isin([(t,str(s)) for t,s in blank])
+    df.loc[rows,['arrival_time','departure_time']] = ''
+    members['stop_times.txt'] = df.to_csv(index=False).encode()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer,'w') as zf:
+        for name, member in members.items():
+            zf.writestr(name,member)
+    return buffer.getvalue()
+
+@pytest.fixture
+def static_api(monkeypatch):
+    """Factory of uncached `StaticAPI` instances reading the given
+    schedule.zip bytes instead of the local feed"""
+    def make(data:bytes,**kwargs) -> StaticAPI:
+        monkeypatch.setattr(metra.static,'get_schedule_zip',lambda: zipfile.ZipFile(io.BytesIO(data)))
+        monkeypatch.setattr(metra.static,'get_last_local_publish',lambda: PUBLISHED)
+        return StaticAPI(cache=False,**kwargs)
+    return make
+
+class Response:
+    """Scripted response of the stand-in server"""
+    def __init__(self,body=b'',status:int=200,headers:dict=None,delay:float=0):
+        self.body = json.dumps(body).encode() if not isinstance(body,bytes) else body
+        self.status = status
+        self.headers = headers or {}
+        self.delay = delay
+
+class StandInServer:
+    """Threaded local HTTP/1.1 server that plays back scripted responses.
+
+    Every path maps to a list of `Response`s served in order; the last one
+    is repeated once the list runs out. Each request is logged with its
+    headers and the client's port, which identifies the connection.
+    """
+    def __init__(self):
+        self.routes: dict[str,list[Response]] = {}
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.__lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self,*args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1',0),Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self.__thread = threading.Thread(target=self.httpd.serve_forever,daemon=True)
+        self.__thread.start()
+
+    def route(self,path:str,*responses:Response) -> None:
+        self.routes[path] = list(responses)
+
+    def requests_to(self,path:str) -> list[dict]:
+        return [r for r in self.requests if r['path'] == path]
+
+    def handle(self,handler:BaseHTTPRequestHandler) -> None:
+        with self.__lock:
+            self.requests.append({'path':handler.path,'headers':dict(handler.headers),'port':handler.client_address[1]})
+            queue = self.routes.get(handler.path)
+            if not queue:
+                resp = Response(b'not found',status=404)
+            else:
+                resp = queue.pop(0) if len(queue) > 1 else queue[0]
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight,self.in_flight)
+        try:
+            time.sleep(resp.delay)
+            handler.send_response(resp.status)
+            for key, value in resp.headers.items():
+                handler.send_header(key,value)
+            body = resp.body if resp.status != 304 else b''
+            handler.send_header('Content-Length',str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        finally:
+            with self.__lock:
+                self.in_flight -= 1
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def server():
+    server = StandInServer()
+    yield server
+    server.close()
@@ -0,0 +1,11 @@
+
+
+2.0
+alert-1*
+֤*BNSF**LISLE*"
+BNSF_BN1200_V1_A0
+8R
+
+BNSF delaysenZ1
+/
+)Trains may be 10 minutes late near Lisle.en
\ No newline at end of file
@@ -0,0 +1,11 @@
+
+
+2.0p
+BNSF_BN1200_V1_A\
+"
+BNSF_BN1200_V1_A20260115*BNSFxx"
+NAPERVILLE"
+WESTERNAVEA
+UP-N_UN300_V1_A.
+!
+UP-N_UN300_V1_A20260115*UP-N	<"OTC
\ No newline at end of file
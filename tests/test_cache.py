@@ -0,0 +1,60 @@
+import io
+import os
+import hashlib
+import zipfile
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+from metra import cache
+
+PUBLISHED = dt.datetime(2026,1,15,12,0,0)
+TABLE = pd.DataFrame({'stop_id':['A','B'],'stop_sequence':[1,2]})
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path,monkeypatch):
+    monkeypatch.setattr(cache,'CACHE_PATH',str(tmp_path))
+    return tmp_path
+
+def test_save_keeps_other_keys_of_the_same_feed():
+    plain = cache.cache_key(PUBLISHED)
+    hashed = cache.cache_key(PUBLISHED,'0123456789abcdef0123')
+    cache.save_table(plain,'stops',TABLE)
+    cache.save_table(hashed,'stops',TABLE)
+    pd.testing.assert_frame_equal(cache.load_table(plain,'stops'),TABLE)
+    pd.testing.assert_frame_equal(cache.load_table(hashed,'stops'),TABLE)
+
+def test_save_prunes_only_older_feeds(cache_path):
+    old = cache.cache_key(PUBLISHED - dt.timedelta(days=7))
+    current = cache.cache_key(PUBLISHED)
+    new = cache.cache_key(PUBLISHED + dt.timedelta(days=7))
+    stale = f'v{cache.CACHE_VERSION - 1}-{PUBLISHED:%Y%m%d%H%M%S}'
+    for key in (old,new,stale):
+        (cache_path / key).mkdir()
+    cache.save_table(current,'stops',TABLE)
+    assert sorted(p.name for p in cache_path.iterdir()) == sorted([current,new])
+
+def test_clear_cache(cache_path):
+    cache.save_table(cache.cache_key(PUBLISHED),'stops',TABLE)
+    cache.clear_cache()
+    assert list(cache_path.iterdir()) == []
+
+def test_feed_hash_of_loaded_zip(tmp_path):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer,'w') as zf:
+        zf.writestr('stops.txt','stop_id\nA\n')
+    data = buffer.getvalue()
+    path = tmp_path / 'schedule.zip'
+    path.write_bytes(data)
+    expected = hashlib.sha256(data).hexdigest()
+
+    loaded = zipfile.ZipFile(io.BytesIO(data))
+    opened = zipfile.ZipFile(path)
+    # the file on disk is replaced after it was opened
+    (tmp_path / 'next.zip').write_bytes(b'replaced')
+    os.replace(tmp_path / 'next.zip',path)
+    assert cache.feed_hash(loaded) == expected
+    assert cache.feed_hash(opened) == expected
+    assert opened.read('stops.txt') == b'stop_id\nA\n'
+    assert cache.feed_hash(str(path)) == hashlib.sha256(b'replaced').hexdigest()
@@ -0,0 +1,97 @@
+import asyncio
+
+from metra.client import ENDPOINTS
+from metra.client import ScheduleClient
+from metra.client import AsyncScheduleClient
+from metra.constants import ROUTE_NAMES
+from metra.schemas import Stops
+
+from conftest import Response
+
+STOPS = [{'stop_id':'CUS','stop_name':'Chicago Union Station','stop_lat':41.878,'stop_lon':-87.639,'zone_id':'A','stop_url':'','wheelchair_boarding':1}]
+
+PAYLOADS = {
+    'stops': STOPS,
+    'trips': [{'route_id':'BNSF','service_id':'A1','trip_id':'BNSF_BN1200_V1_A','trip_headsign':'Chicago Union Station','block_id':'','shape_id':'BNSF_IB_1','direction_id':1}],
+    'shapes': [{'shape_id':'BNSF_IB_1','shape_pt_lat':41.878,'shape_pt_lon':-87.639,'shape_pt_sequence':1}],
+    'routes': [{'route_id':r,'route_short_name':'','route_long_name':name,'route_desc':'','agency_id':'METRA','route_type':2,'route_color':'','route_text_color':'','route_url':''}
+               for name, r in ROUTE_NAMES.items()],
+    'calendar': [{'service_id':'A1','monday':1,'tuesday':1,'wednesday':1,'thursday':1,'friday':1,'saturday':0,'sunday':0,'start_date':'20260101','end_date':'20261231'}],
+    'calendar_dates': [{'service_id':'A1','date':'20260704','exception_type':2}],
+}
+
+def client(server,**kwargs) -> ScheduleClient:
+    return ScheduleClient(base=server.url,auth=('key','secret'),backoff=0,**kwargs)
+
+def test_session_reused_across_requests(server):
+    server.route('/schedule/stops',Response(STOPS))
+    with client(server) as c:
+        for _ in range(3):
+            assert c.get_json('stops') == STOPS
+    requests = server.requests_to('/schedule/stops')
+    assert len(requests) == 3
+    # one kept-alive connection serves every request
+    assert len({r['port'] for r in requests}) == 1
+    assert requests[0]['headers']['Authorization'].startswith('Basic ')
+
+def test_retries_on_503_and_429(server):
+    server.route('/schedule/stops',Response(status=503),Response(status=429),Response(STOPS))
+    with client(server) as c:
+        stops = c.fetch('stops')
+    assert isinstance(stops,Stops)
+    assert len(server.requests_to('/schedule/stops')) == 3
+
+def test_gives_up_after_retries(server):
+    server.route('/schedule/stops',Response(status=503))
+    with client(server,retries=1) as c:
+        try:
+            c.get_json('stops')
+        except Exception:
+            pass
+        else:
+            raise AssertionError('expected the request to fail')
+    assert len(server.requests_to('/schedule/stops')) == 2
+
+def test_revalidation_returns_cached_body_on_304(server):
+    validators = {'ETag':'"v1"','Last-Modified':'Thu, 15 Jan 2026 12:00:00 GMT'}
+    server.route('/schedule/stops',Response(STOPS,headers=validators),Response(status=304))
+    with client(server) as c:
+        first = c.get_json('stops')
+        second = c.get_json('stops')
+    assert first == second == STOPS
+    initial, revalidation = server.requests_to('/schedule/stops')
+    assert 'If-None-Match' not in initial['headers']
+    assert revalidation['headers']['If-None-Match'] == '"v1"'
+    assert revalidation['headers']['If-Modified-Since'] == validators['Last-Modified']
+
+def test_changed_body_replaces_cached_one(server):
+    updated = STOPS + [dict(STOPS[0],stop_id='WESTERNAVE',stop_name='Western Ave')]
+    server.route('/schedule/stops',Response(STOPS,headers={'ETag':'"v1"'}),Response(updated,headers={'ETag':'"v2"'}))
+    with client(server) as c:
+        assert c.get_json('stops') == STOPS
+        assert c.get_json('stops') == updated
+
+def route_all(server,delay:float) -> None:
+    for endpoint, payload in PAYLOADS.items():
+        server.route(f'/schedule/{endpoint}',Response(payload,delay=delay))
+
+def test_fetch_all_is_concurrent(server):
+    route_all(server,delay=0.2)
+    with client(server) as c:
+        results = c.fetch_all()
+    assert list(results) == list(ENDPOINTS)
+    assert results['calendar_dates'] == PAYLOADS['calendar_dates']
+    assert len(results['stops']) == 1
+    assert server.max_in_flight == len(ENDPOINTS)
+
+def test_async_fetch_all_is_concurrent(server):
+    route_all(server,delay=0.2)
+
+    async def main():
+        async with AsyncScheduleClient(base=server.url,auth=('key','secret')) as c:
+            return await c.fetch_all()
+
+    results = asyncio.run(main())
+    assert list(results) == list(ENDPOINTS)
+    assert results['routes'].bnsf.route_id == 'BNSF'
+    assert server.max_in_flight == len(ENDPOINTS)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from metra.compact import CompactFeed
+from metra.compact import MISSING_SECONDS
+from metra.static import StaticAPI
+
+from conftest import PUBLISHED
+from conftest import synthetic_feed
+
+# an intermediate stop and the first stop of a trip without times
+BLANK = [('R0000_T00000',3),('R0000_T00001',1)]
+
+def test_round_trip_with_missing_times(static_api):
+    api = static_api(synthetic_feed(BLANK))
+    stops, trips, stop_times = api.stops(), api.trips(), api.stop_times()
+    assert stop_times['arrival_time'].isna().sum() == 2
+
+    codec = CompactFeed(stops,trips,stop_times,PUBLISHED.replace(hour=0))
+    encoded = codec.encode('stop_times',stop_times)
+    assert encoded['arrival_time'].dtype == np.int32
+    assert (encoded['arrival_time'] == MISSING_SECONDS).sum() == 2
+    pd.testing.assert_frame_equal(codec.decode('stop_times',encoded),stop_times)
+    pd.testing.assert_frame_equal(codec.decode('trips',codec.encode('trips',trips)),trips)
+    assert codec.datetimes(encoded['arrival_time'].to_numpy()[:3]).tolist() == stop_times['arrival_time'].to_numpy()[:3].tolist()
+
+def test_compact_api_with_missing_times(static_api,tmp_path):
+    data = synthetic_feed(BLANK)
+    regular, compact = static_api(data), static_api(data,compact=True)
+    assert (compact.stop_times()['arrival_time'] == MISSING_SECONDS).sum() == 2
+
+    start = PUBLISHED.replace(hour=4)
+    expected = regular.upcoming_schedule(date=start)
+    assert len(expected) and expected['arrival_time'].notna().all()
+    pd.testing.assert_frame_equal(compact.upcoming_schedule(date=start),expected)
+
+    path = str(tmp_path / 'feed.snapshot')
+    regular.save_snapshot(path)
+    attached = StaticAPI(snapshot=path,compact=True)
+    assert (attached.stop_times()['arrival_time'] == MISSING_SECONDS).sum() == 2
+    pd.testing.assert_frame_equal(attached.upcoming_schedule(date=start),expected)
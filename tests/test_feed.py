@@ -0,0 +1,129 @@
+import io
+import time
+import types
+import zipfile
+import datetime as dt
+
+import pytest
+
+import metra.feed
+import metra.static
+from metra.feed import FeedManager
+from metra.static import StaticAPI
+
+from conftest import PUBLISHED
+from conftest import synthetic_feed
+
+class Today(dt.date):
+    current = dt.date(2026,1,15)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+class Feed:
+    """Stand-in for the local schedule.zip and `update_schedule_zip`"""
+    def __init__(self):
+        self.data = synthetic_feed()
+        self.changed = False
+        self.error: Exception = None
+        self.updates = 0
+
+    def publish(self,data:bytes) -> None:
+        self.data = data
+        self.changed = True
+
+    def update(self) -> bool:
+        self.updates += 1
+        if self.error is not None:
+            raise self.error
+        changed, self.changed = self.changed, False
+        return changed
+
+    def open(self) -> zipfile.ZipFile:
+        return zipfile.ZipFile(io.BytesIO(self.data))
+
+@pytest.fixture
+def feed(monkeypatch):
+    feed = Feed()
+    monkeypatch.setattr(metra.feed,'update_schedule_zip',feed.update)
+    monkeypatch.setattr(metra.feed,'dt',types.SimpleNamespace(date=Today,datetime=dt.datetime))
+    monkeypatch.setattr(metra.static,'get_schedule_zip',feed.open)
+    monkeypatch.setattr(metra.static,'get_last_local_publish',lambda: PUBLISHED)
+    Today.current = dt.date(2026,1,15)
+    return feed
+
+def manager(**kwargs) -> FeedManager:
+    return FeedManager(cache=False,**kwargs)
+
+def test_first_access_builds_snapshot(feed):
+    published = []
+    m = manager(on_update=published.append)
+    snapshot = m.snapshot
+    assert isinstance(snapshot,StaticAPI)
+    assert published == [snapshot]
+    assert feed.updates == 1
+    # attribute access falls through to the snapshot
+    assert len(m.stops()) == len(snapshot.stops())
+
+def test_unchanged_feed_keeps_snapshot(feed):
+    m = manager()
+    snapshot = m.snapshot
+    assert not m.refresh()
+    assert m.snapshot is snapshot
+    assert m.refresh(force=True)
+    assert m.snapshot is not snapshot
+
+def test_new_feed_is_swapped_in(feed):
+    published = []
+    m = manager(on_update=published.append)
+    old = m.snapshot
+    feed.publish(synthetic_feed(routes=3))
+    assert m.refresh()
+    new = m.snapshot
+    assert new is not old and published == [old,new]
+    assert len(new.routes()) == 3
+    # queries holding the previous snapshot keep working against it
+    assert len(old.routes()) == 2
+    assert len(old.stop_times()) < len(new.stop_times())
+
+def test_service_day_rollover(feed):
+    m = manager()
+    snapshot = m.snapshot
+    assert not m.refresh()
+    Today.current = dt.date(2026,1,16)
+    assert m.refresh()
+    assert m.snapshot is not snapshot
+    assert not m.refresh()
+
+@pytest.mark.parametrize('failure',['update','build'])
+def test_failed_refresh_keeps_old_snapshot(feed,failure):
+    m = manager()
+    snapshot = m.snapshot
+    if failure == 'update':
+        feed.error = OSError('network down')
+    else:
+        feed.publish(b'not a zip')
+    with pytest.raises(Exception):
+        m.refresh()
+    assert m.snapshot is snapshot
+    assert len(m.stops()) == len(snapshot.stops())
+
+def test_background_refresh_survives_failures(feed):
+    with manager(interval=0.02) as m:
+        snapshot = m.snapshot
+        feed.error = OSError('network down')
+        deadline = time.monotonic() + 5
+        while feed.updates < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert feed.updates >= 4
+        assert m.snapshot is snapshot
+
+        feed.error = None
+        feed.publish(synthetic_feed(routes=3))
+        while m.snapshot is snapshot and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(m.snapshot.routes()) == 3
+    updates = feed.updates
+    time.sleep(0.1)
+    assert feed.updates == updates
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from metra.geometry import ShapeGeometry
+
+def shapes() -> pd.DataFrame:
+    # a straight line with one kink, sequence numbers with gaps and rows out of order
+    lats = np.array([41.80,41.81,41.82,41.83,41.84,41.84,41.84])
+    lons = np.array([-87.70,-87.70,-87.70,-87.70,-87.70,-87.69,-87.68])
+    df = pd.DataFrame({
+        'shape_id': 'BNSF_IB_1',
+        'shape_pt_lat': lats,
+        'shape_pt_lon': lons,
+        'shape_pt_sequence': np.arange(1,len(lats)+1) * 10,
+    })
+    other = pd.DataFrame({'shape_id':'ME_IB_1','shape_pt_lat':[41.70,41.71],'shape_pt_lon':[-87.60,-87.60],'shape_pt_sequence':[3,7]})
+    return pd.concat([df,other],ignore_index=True).iloc[::-1].reset_index(drop=True)
+
+def test_simplified_keeps_sequence_numbers():
+    df = shapes()
+    simplified = ShapeGeometry(df).simplified(tolerance_m=5)
+    assert simplified['shape_id'].tolist() == ['BNSF_IB_1']*3 + ['ME_IB_1']*2
+    assert simplified['shape_pt_sequence'].tolist() == [10,50,70,3,7]
+    # kept points join back to the shapes dataset
+    joined = simplified.merge(df,on=['shape_id','shape_pt_sequence'],suffixes=('','_orig'))
+    assert len(joined) == len(simplified)
+    np.testing.assert_array_equal(joined['shape_pt_lat'],joined['shape_pt_lat_orig'])
+    np.testing.assert_array_equal(joined['shape_pt_lon'],joined['shape_pt_lon_orig'])
+
+def test_simplified_distances():
+    geometry = ShapeGeometry(shapes())
+    simplified = geometry.simplified(tolerance_m=5)
+    bnsf = simplified[simplified['shape_id'] == 'BNSF_IB_1']
+    assert bnsf['shape_dist_traveled'].iloc[0] == 0
+    assert bnsf['shape_dist_traveled'].iloc[-1] == geometry.length('BNSF_IB_1')
@@ -0,0 +1,57 @@
+import io
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from metra.ingest import read_table
+from metra.ingest import parse_time_seconds
+
+BASE_DT = dt.datetime(2026,1,15)
+
+STOP_TIMES = b"""trip_id,arrival_time,departure_time,stop_id,stop_sequence,pickup_type,drop_off_type,center_boarding,south_boarding,bikes_allowed,notice
+T1, 09:00:00,09:00:00,A,1,0,0,0,0,1,0
+T1,,,B,2,0,0,0,0,1,0
+T1,09:30:00,09:30:00, C ,3,0,0,0,0,1,0
+T1,   ,,D,4,0,0,0,0,1,0
+T1,25:05:00,25:05:00,E,5,0,0,0,0,1,0
+"""
+
+STOPS = b"""stop_id,stop_name,stop_desc,stop_lat,stop_lon,zone_id,stop_url,wheelchair_boarding
+0042, Western Ave ,,41.889,-87.687,1,,1
+7,Lisle,,41.795,-88.075,,,0
+"""
+
+def legacy(data:bytes,drop:list[str],strip:list[str]) -> pd.DataFrame:
+    # the per-row loaders `read_table` replaces
+    df = pd.read_csv(io.BytesIO(data))
+    df.columns = list(map(lambda x: str(x).strip(),df.columns))
+    df.drop(columns=drop,inplace=True)
+    for col in strip:
+        df[col] = df[col].apply(lambda x: str(x).strip())
+    return df
+
+def test_parse_time_seconds():
+    seconds = parse_time_seconds(pd.Series(['09:00:00',' 09:30:00','25:05:00','09:00:00']))
+    assert seconds.dtype == np.int64
+    assert seconds.tolist() == [32400,34200,90300,32400]
+
+def test_parse_time_seconds_missing():
+    seconds = parse_time_seconds(pd.Series(['09:00:00',np.nan,'09:30:00','  ',''],dtype=object))
+    np.testing.assert_array_equal(seconds,[32400,np.nan,34200,np.nan,np.nan])
+
+def test_read_table_times():
+    df = read_table(STOP_TIMES,'stop_times',base_dt=BASE_DT)
+    assert list(df.columns) == ['trip_id','arrival_time','stop_id','stop_sequence','pickup_type','drop_off_type','center_boarding','south_boarding','bikes_allowed']
+    expected = pd.to_datetime(['2026-01-15 09:00','NaT','2026-01-15 09:30','NaT','2026-01-16 01:05'])
+    np.testing.assert_array_equal(df['arrival_time'].to_numpy(),expected.to_numpy().astype(df['arrival_time'].dtype))
+    assert df['stop_id'].tolist() == ['A','B','C','D','E']
+
+def test_read_table_matches_legacy_strip():
+    df = read_table(STOPS,'stops')
+    expected = legacy(STOPS,['stop_url','stop_desc'],['stop_id','stop_name','zone_id'])
+    pd.testing.assert_frame_equal(df,expected)
+    # same text as `str(x).strip()` on the inferred values
+    assert df['stop_id'].tolist() == ['42','7']
+    assert df['zone_id'].tolist() == ['1.0','nan']
+    assert df['stop_name'].tolist() == ['Western Ave','Lisle']
@@ -0,0 +1,23 @@
+import sys
+import subprocess
+
+import pytest
+
+def run(code:str) -> str:
+    out = subprocess.run([sys.executable,'-c',code],capture_output=True,text=True,check=True)
+    return out.stdout.strip()
+
+@pytest.mark.parametrize('names',[('Route','routes'),('routes','Route')])
+def test_routes_is_the_static_table_in_any_order(names):
+    code = ';'.join([
+        'import metra',
+        *[f'metra.{name}' for name in names],
+        'from metra.static import routes',
+        'from metra.routes import Route',
+        'print(metra.routes is routes, metra.Route is Route)',
+    ])
+    assert run(code) == 'True True'
+
+def test_import_is_lazy():
+    code = 'import sys, metra; from metra import Route; print([m for m in ("pandas","requests") if m in sys.modules])'
+    assert run(code) == '[]'
@@ -0,0 +1,56 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from metra.ingest import TABLE_SPECS
+from metra.ingest import read_table
+from metra.parallel import read_feeds
+from metra.parallel import read_tables
+
+from conftest import PUBLISHED
+from conftest import synthetic_feed
+
+BASE_DT = PUBLISHED.replace(hour=0)
+FEED = synthetic_feed([('R0000_T00000',5)])
+
+def expected(data:bytes) -> dict[str,pd.DataFrame]:
+    zf = zipfile.ZipFile(io.BytesIO(data))
+    return {name:read_table(zf,name,base_dt=BASE_DT) for name in TABLE_SPECS}
+
+def assert_tables_equal(tables:dict[str,pd.DataFrame],data:bytes) -> None:
+    reference = expected(data)
+    assert list(tables) == list(reference)
+    for name, df in reference.items():
+        pd.testing.assert_frame_equal(tables[name],df)
+
+@pytest.mark.parametrize('executor',['thread','process'])
+def test_read_tables_matches_read_table(executor):
+    tables = read_tables(FEED,base_dt=BASE_DT,workers=2,executor=executor)
+    assert_tables_equal(tables,FEED)
+    assert tables['stop_times']['arrival_time'].isna().sum() == 1
+
+@pytest.mark.parametrize('executor',['thread','process'])
+def test_read_feeds_sources(executor,tmp_path):
+    other = synthetic_feed(routes=3)
+    path = tmp_path / 'other.zip'
+    path.write_bytes(other)
+    sources = [zipfile.ZipFile(io.BytesIO(FEED)),str(path),other]
+    results = read_feeds(sources,base_dts=[BASE_DT]*3,workers=2,executor=executor)
+    assert_tables_equal(results[0],FEED)
+    assert_tables_equal(results[1],other)
+    assert_tables_equal(results[2],other)
+
+def test_read_tables_subset_and_unknown_executor():
+    tables = read_tables(FEED,['trips','stops'],base_dt=BASE_DT,workers=2)
+    assert list(tables) == ['trips','stops']
+    with pytest.raises(ValueError):
+        read_tables(FEED,executor='fiber')
+
+@pytest.mark.parametrize('executor',['thread','process'])
+def test_static_api_workers(static_api,executor):
+    serial = static_api(FEED,eager=True)
+    parallel = static_api(FEED,eager=True,workers=2,executor=executor)
+    for name in TABLE_SPECS:
+        pd.testing.assert_frame_equal(getattr(parallel,name)(),getattr(serial,name)())
@@ -0,0 +1,69 @@
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from metra.compact import missing_times
+from metra.index import StopTripIndex
+from metra.patterns import MISSING_TIME
+
+from conftest import PUBLISHED
+from conftest import synthetic_feed
+
+# R0000S04 on an intermediate stop and R0001S05 at the start of a trip,
+# both on weekday (SV0) trips
+BLANK = [('R0000_T00000',5),('R0001_T00017',1)]
+MORNING = PUBLISHED.replace(hour=10)
+
+@pytest.fixture(params=[False,True],ids=['regular','compact'])
+def api(request,static_api):
+    return static_api(synthetic_feed(BLANK),compact=request.param)
+
+def expected_times(api,rows:np.ndarray) -> np.ndarray:
+    arrivals = api.stop_times()['arrival_time'].to_numpy()[rows]
+    if arrivals.dtype.kind in 'iu':
+        times = arrivals.astype(np.int64)
+    else:
+        times = arrivals.astype('datetime64[s]').astype(np.int64)
+    return np.where(missing_times(arrivals),MISSING_TIME,times)
+
+def test_stop_visits_match_stop_index(api):
+    patterns, index = api.trip_patterns(), StopTripIndex(api.stop_times())
+    for stop_id in index.stop_ids:
+        trips, rows, times = patterns.stop_visits(stop_id)
+        code = index.stop_lookup[stop_id]
+        expected = index.rows[index.offsets[code]:index.offsets[code+1]]
+        assert trips.tolist() == index.row_trips[expected].tolist()
+        assert rows.tolist() == expected.tolist()
+        assert times.tolist() == expected_times(api,expected).tolist()
+
+def test_journeys_match_stop_index(api):
+    patterns, index = api.trip_patterns(), StopTripIndex(api.stop_times())
+    n = 0
+    for origin in index.stop_ids:
+        for destination in index.stop_ids:
+            trips, o_rows, o_times, d_rows, d_times = patterns.journeys(origin,destination)
+            exp_o, exp_d = index.journeys(origin,destination)
+            order = np.argsort(index.row_trips[exp_o],kind='stable')
+            exp_o, exp_d = exp_o[order], exp_d[order]
+            assert trips.tolist() == index.row_trips[exp_o].tolist()
+            assert (o_rows.tolist(), d_rows.tolist()) == (exp_o.tolist(), exp_d.tolist())
+            assert o_times.tolist() == expected_times(api,exp_o).tolist()
+            assert d_times.tolist() == expected_times(api,exp_d).tolist()
+            n += len(trips)
+    assert n > 0
+
+def test_next_trains_with_blank_times(api):
+    # a blank first stop does not drop the rest of the trip
+    df = api.next_trains('R0001S04','CUS',date=MORNING)
+    assert df['trip_id'].tolist() == ['R0001_T00017','R0001_T00023']
+    assert df['arrival_time'].notna().all()
+    # a stop without a time is never a departure
+    assert api.next_trains('R0000S04','R0000S05',date=MORNING).empty
+    assert api.next_trains('R0001S05','CUS',date=MORNING)['trip_id'].tolist() == ['R0001_T00023']
+    assert api.next_trains('R0000S03','R0000S05',date=MORNING)['trip_id'].tolist() == ['R0000_T00000']
+
+def test_next_trains_batch_with_blank_times(api):
+    df = api.next_trains_batch([('R0000S03','R0000S04'),('R0001S05','CUS')],date=MORNING)
+    assert df['trip_id'].tolist() == ['R0000_T00000','R0001_T00023']
+    assert df['destination_arrival_time'].isna().tolist() == [True,False]
@@ -0,0 +1,47 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from metra.planner import ConnectionScan
+
+BASE_DT = dt.datetime(2026,1,15)
+DEPART = BASE_DT + dt.timedelta(hours=7)
+
+def stop_times(rows:list[tuple]) -> pd.DataFrame:
+    df = pd.DataFrame(rows,columns=['trip_id','stop_sequence','stop_id','arrival_time'])
+    df['arrival_time'] = pd.Timestamp(BASE_DT) + pd.to_timedelta(df['arrival_time'] + ':00')
+    return df
+
+def legs(csa:ConnectionScan,origin:str,destination:str) -> list[list[tuple]]:
+    return [[(t,o,d,str(dep),str(arr)) for t,o,d,dep,arr in legs] for legs in csa.journeys(origin,destination,DEPART)]
+
+def test_transfer():
+    csa = ConnectionScan(stop_times([
+        ('A',1,'S1','08:00'),('A',2,'S2','08:10'),('A',3,'S3','08:20'),('A',4,'S4','08:30'),
+        ('B',1,'S3','08:25'),('B',2,'X','08:40'),
+    ]))
+    assert legs(csa,'S1','X') == [[
+        ('A','S1','S3','2026-01-15T08:00:00','2026-01-15T08:20:00'),
+        ('B','S3','X','2026-01-15T08:25:00','2026-01-15T08:40:00'),
+    ]]
+
+def test_blank_intermediate_times():
+    csa = ConnectionScan(stop_times([
+        ('A',1,'S1','08:00'),('A',2,'S2','08:10'),('A',3,'S3',None),('A',4,'S4','08:30'),
+        ('B',1,'S3','08:25'),('B',2,'X','08:40'),
+    ]))
+    # the trip runs straight past the untimed stop
+    assert legs(csa,'S1','S4') == [[('A','S1','S4','2026-01-15T08:00:00','2026-01-15T08:30:00')]]
+    assert legs(csa,'S2','S4') == [[('A','S2','S4','2026-01-15T08:10:00','2026-01-15T08:30:00')]]
+    # but it can neither be left nor boarded there
+    assert legs(csa,'S1','S3') == []
+    assert legs(csa,'S3','S4') == []
+    assert legs(csa,'S1','X') == []
+    assert legs(csa,'S3','X') == [[('B','S3','X','2026-01-15T08:25:00','2026-01-15T08:40:00')]]
+
+def test_blank_first_time():
+    csa = ConnectionScan(stop_times([('A',1,'S1',None),('A',2,'S2','08:10'),('A',3,'S3','08:20')]))
+    assert len(csa) == 1
+    assert legs(csa,'S1','S3') == []
+    assert legs(csa,'S2','S3') == [[('A','S2','S3','2026-01-15T08:10:00','2026-01-15T08:20:00')]]
@@ -0,0 +1,187 @@
+import time
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metra.client import ScheduleClient
+from metra.realtime import FEEDS
+from metra.realtime import DECODERS
+from metra.realtime import RealtimePoller
+from metra.realtime import RealtimeStore
+from metra.realtime import _epoch
+from metra.realtime import apply_trip_updates
+from metra.realtime import decode_alerts
+from metra.realtime import decode_trip_updates
+from metra.realtime import decode_vehicle_positions
+
+from conftest import Response
+from conftest import fixture_bytes
+
+# Fixtures hold the same feeds in three encodings: protobuf (.pb), proto3
+# JSON with camelCase names (.json) and Metra's snake_case JSON, where
+# times are protobuf.js Longs holding ISO strings (_snake.json)
+ENCODINGS = ['.json','_snake.json',pytest.param('.pb',id='protobuf')]
+
+BASE_DT = dt.datetime(2026,1,15)
+
+@pytest.fixture(autouse=True)
+def protobuf_bindings(request):
+    if 'protobuf' in request.node.name:
+        pytest.importorskip('google.transit.gtfs_realtime_pb2')
+
+@pytest.mark.parametrize('suffix',ENCODINGS)
+def test_decode_trip_updates(suffix):
+    df = decode_trip_updates(fixture_bytes(f'trip_updates{suffix}'))
+    assert df['trip_id'].tolist() == ['BNSF_BN1200_V1_A','BNSF_BN1200_V1_A','UP-N_UN300_V1_A']
+    assert df['route_id'].tolist() == ['BNSF','BNSF','UP-N']
+    assert df['start_date'].tolist() == ['20260115']*3
+    assert df['stop_id'].tolist() == ['NAPERVILLE','WESTERNAVE','OTC']
+    assert df['stop_sequence'].tolist() == [2,4,pd.NA]
+    np.testing.assert_array_equal(df['arrival_delay'],[120,np.nan,60])
+    np.testing.assert_array_equal(df['departure_delay'],[120,np.nan,np.nan])
+    # absolute times are converted to naive Chicago time
+    assert df['arrival_time'].isna().tolist() == [True,False,True]
+    assert df.loc[1,'arrival_time'] == pd.Timestamp('2026-01-15 08:35')
+    assert df.loc[1,'departure_time'] == pd.Timestamp('2026-01-15 08:36')
+
+@pytest.mark.parametrize('suffix',ENCODINGS)
+def test_decode_vehicle_positions(suffix):
+    df = decode_vehicle_positions(fixture_bytes(f'vehicle_positions{suffix}'))
+    assert len(df) == 1
+    row = df.iloc[0]
+    assert (row['trip_id'],row['route_id'],row['vehicle_id'],row['vehicle_label']) == ('BNSF_BN1200_V1_A','BNSF','8501','1200')
+    assert (row['lat'],row['lon'],row['bearing']) == (41.75,-88.125,90.0)
+    assert (row['current_stop_sequence'],row['stop_id']) == (3,'LISLE')
+    assert row['timestamp'] == pd.Timestamp('2026-01-15 08:18')
+
+@pytest.mark.parametrize('suffix',ENCODINGS)
+def test_decode_alerts(suffix):
+    df = decode_alerts(fixture_bytes(f'alerts{suffix}'))
+    assert len(df) == 1
+    row = df.iloc[0]
+    assert row['alert_id'] == 'alert-1'
+    assert (row['cause'],row['effect']) == (10,3)
+    assert row['header'] == 'BNSF delays'
+    assert row['description'] == 'Trains may be 10 minutes late near Lisle.'
+    assert (row['route_ids'],row['stop_ids'],row['trip_ids']) == (['BNSF'],['LISLE'],['BNSF_BN1200_V1_A'])
+    assert row['active_start'] == pd.Timestamp('2026-01-15 06:00')
+    assert row['active_end'] == pd.Timestamp('2026-01-15 12:00')
+
+@pytest.mark.parametrize('feed',list(DECODERS))
+def test_encodings_decode_identically(feed):
+    expected = DECODERS[feed](fixture_bytes(f'{feed}.json'))
+    pd.testing.assert_frame_equal(DECODERS[feed](fixture_bytes(f'{feed}_snake.json')),expected)
+    pd.testing.assert_frame_equal(DECODERS[feed](fixture_bytes(f'{feed}.json').decode()),expected)
+
+def test_decode_empty_feed():
+    df = decode_trip_updates(b'{"header": {}, "entity": []}')
+    assert df.empty
+    assert list(df.columns) == list(decode_trip_updates(fixture_bytes('trip_updates.json')).columns)
+
+def schedule() -> pd.DataFrame:
+    rows = [
+        ('BNSF_BN1200_V1_A','08:00','AURORA',1),
+        ('BNSF_BN1200_V1_A','08:10','NAPERVILLE',2),
+        ('BNSF_BN1200_V1_A','08:20','LISLE',3),
+        ('BNSF_BN1200_V1_A','08:30','WESTERNAVE',4),
+        ('BNSF_BN1200_V1_A','08:40','CUS',5),
+        ('UP-N_UN300_V1_A','06:00','KENOSHA',1),
+        ('UP-N_UN300_V1_A','06:40','EVANSTON',2),
+        ('UP-N_UN300_V1_A','07:00','OTC',3),
+        ('ME_MA100_V1_A','09:00','MILLENNIUM',1),
+    ]
+    df = pd.DataFrame(rows,columns=['trip_id','arrival_time','stop_id','stop_sequence'])
+    df['arrival_time'] = pd.Timestamp(BASE_DT) + pd.to_timedelta(df['arrival_time'] + ':00')
+    return df
+
+def test_apply_trip_updates():
+    stop_times = schedule()
+    updates = decode_trip_updates(fixture_bytes('trip_updates.json'))
+    out = apply_trip_updates(stop_times,updates,stop_times,BASE_DT)
+    delays = dict(zip(zip(out['trip_id'],out['stop_sequence']),out['delay']))
+
+    # stops before a trip's first update get no prediction
+    assert np.isnan(delays[('BNSF_BN1200_V1_A',1)])
+    # a delay is carried forward to later stops until the next update
+    assert delays[('BNSF_BN1200_V1_A',2)] == 120
+    assert delays[('BNSF_BN1200_V1_A',3)] == 120
+    # an absolute time becomes a delay against the scheduled 08:30
+    assert delays[('BNSF_BN1200_V1_A',4)] == 300
+    assert delays[('BNSF_BN1200_V1_A',5)] == 300
+    # updates without a stop_sequence are resolved by stop id
+    assert np.isnan(delays[('UP-N_UN300_V1_A',2)])
+    assert delays[('UP-N_UN300_V1_A',3)] == 60
+    # trips without updates are left alone
+    assert np.isnan(delays[('ME_MA100_V1_A',1)])
+
+    predicted = out.set_index(['trip_id','stop_sequence'])['predicted_arrival_time']
+    assert predicted[('BNSF_BN1200_V1_A',3)] == pd.Timestamp('2026-01-15 08:22')
+    assert predicted[('BNSF_BN1200_V1_A',5)] == pd.Timestamp('2026-01-15 08:45')
+    assert pd.isna(predicted[('BNSF_BN1200_V1_A',1)])
+    # rows keep their order and index
+    assert out.index.equals(stop_times.index)
+    assert out['stop_id'].tolist() == stop_times['stop_id'].tolist()
+
+def test_apply_trip_updates_to_a_subset_of_rows():
+    stop_times = schedule()
+    rows = stop_times.iloc[[4,2]]
+    updates = decode_trip_updates(fixture_bytes('trip_updates_snake.json'))
+    out = apply_trip_updates(rows,updates,stop_times,BASE_DT)
+    assert out.index.tolist() == [4,2]
+    assert out['delay'].tolist() == [300,120]
+
+def test_apply_trip_updates_without_updates():
+    stop_times = schedule()
+    out = apply_trip_updates(stop_times,RealtimeStore().trip_updates(),stop_times,BASE_DT)
+    assert out['delay'].isna().all()
+    assert out['predicted_arrival_time'].isna().all()
+
+def route_feeds(server) -> None:
+    for feed, (json_path, protobuf_path) in FEEDS.items():
+        server.route(f'/{json_path}',Response(fixture_bytes(f'{feed}_snake.json'),headers={'Content-Type':'application/json'}))
+        server.route(f'/{protobuf_path}',Response(fixture_bytes(f'{feed}.pb'),headers={'Content-Type':'application/octet-stream'}))
+
+@pytest.mark.parametrize('protobuf',[False,pytest.param(True,id='protobuf')])
+def test_poller_poll(server,protobuf):
+    route_feeds(server)
+    client = ScheduleClient(base=server.url,auth=('key','secret'))
+    store = RealtimePoller(client=client,protobuf=protobuf).poll()
+
+    for feed in FEEDS:
+        expected = DECODERS[feed](fixture_bytes(f'{feed}.json'))
+        pd.testing.assert_frame_equal(store.frame(feed),expected)
+        assert feed in store.updated_at
+    assert store.for_trip('UP-N_UN300_V1_A')['stop_id'].tolist() == ['OTC']
+    assert store.for_stop('LISLE','vehicle_positions')['vehicle_id'].tolist() == ['8501']
+    assert store.for_trip('UNKNOWN').empty
+
+    paths = [r['path'] for r in server.requests]
+    assert paths == [f'/{FEEDS[feed][1 if protobuf else 0]}' for feed in FEEDS]
+    # every feed is fetched over the client's one pooled connection
+    assert len({r['port'] for r in server.requests}) == 1
+
+def test_poller_start_and_stop(server):
+    route_feeds(server)
+    client = ScheduleClient(base=server.url,auth=('key','secret'))
+    with RealtimePoller(client=client,interval=0.05,feeds=['alerts']) as poller:
+        assert poller.store.alerts()['alert_id'].tolist() == ['alert-1']
+        deadline = dt.datetime.now() + dt.timedelta(seconds=5)
+        while len(server.requests) < 3 and dt.datetime.now() < deadline:
+            time.sleep(0.01)
+    assert len(server.requests) >= 3
+
+def long(value:int,unsigned:bool=False) -> dict:
+    # protobuf.js Long: signed 32-bit halves
+    low, high = value & 0xffffffff, value >> 32
+    return {'low':low - (1 << 32) if low >= 1 << 31 else low,'high':high - (1 << 32) if high >= 1 << 31 else high,'unsigned':unsigned}
+
+@pytest.mark.parametrize('seconds',[1768487700,2**31 + 1000,2**32 + 5,4102444800])
+def test_epoch_of_long(seconds):
+    assert _epoch(long(seconds)) == seconds
+    assert _epoch(long(seconds,unsigned=True)) == seconds
+    assert _epoch(dict(long(seconds),low=str(long(seconds)['low']))) == seconds
+
+def test_epoch_of_long_holding_iso_string():
+    assert _epoch({'low':'2026-01-15T14:35:00.000Z','high':0,'unsigned':False}) == 1768487700
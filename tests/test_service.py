@@ -0,0 +1,63 @@
+import datetime as dt
+
+from metra.ingest import read_table
+from metra.service import ServiceCalendar
+from metra.service import to_service_date
+
+CALENDAR = b"""service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date
+WK,1,1,1,1,1,0,0,20260101,20260131
+SAT,0,0,0,0,0,1,0,20260101,20260131
+SUN,0,0,0,0,0,0,1,20260101,20260131
+"""
+
+CALENDAR_DATES = b"""service_id,date,exception_type
+WK,20260115,2
+SUN,20260115,1
+SAT,20260220,1
+"""
+
+TRIPS = b"""route_id,service_id,trip_id,trip_headsign,block_id,shape_id,direction_id
+BNSF,WK,BN1200,Chicago Union Station,,BNSF_IB_1,1
+BNSF,SAT,BN1300,Chicago Union Station,,BNSF_IB_1,1
+BNSF,WK,BN1201,Aurora,,BNSF_OB_1,0
+BNSF,SUN,BN1400,Aurora,,BNSF_OB_1,0
+"""
+
+def calendar() -> ServiceCalendar:
+    return ServiceCalendar(read_table(CALENDAR,'calendar'),read_table(CALENDAR_DATES,'calendar_dates'),read_table(TRIPS,'trips'))
+
+def test_weekday_filter():
+    services = calendar()
+    assert services.services(dt.date(2026,1,14)) == {'WK'}
+    assert services.services(dt.date(2026,1,17)) == {'SAT'}
+    assert services.services(dt.date(2026,1,18)) == {'SUN'}
+    assert services.trip_rows(dt.date(2026,1,14)).tolist() == [0,2]
+    assert services.trip_rows(dt.date(2026,1,17)).tolist() == [1]
+
+def test_date_range():
+    services = calendar()
+    assert services.services(dt.date(2026,1,1)) == {'WK'}
+    assert services.services(dt.date(2026,1,31)) == {'SAT'}
+    assert services.services(dt.date(2025,12,31)) == set()
+    assert services.services(dt.date(2026,2,2)) == set()
+
+def test_removed_service_date():
+    services = calendar()
+    # Thursday: the weekday service is removed and the sunday one added
+    assert services.services(dt.date(2026,1,15)) == {'SUN'}
+    assert services.trip_rows(dt.date(2026,1,15)).tolist() == [3]
+
+def test_added_date_outside_range():
+    services = calendar()
+    assert services.services(dt.date(2026,2,20)) == {'SAT'}
+    assert services.trip_rows(dt.date(2026,2,20)).tolist() == [1]
+    # only that date
+    assert services.services(dt.date(2026,2,21)) == set()
+
+def test_to_service_date():
+    assert to_service_date('2026-01-15') == dt.date(2026,1,15)
+    assert to_service_date('01/15/2026') == dt.date(2026,1,15)
+    assert to_service_date(dt.datetime(2026,1,15,23,59)) == dt.date(2026,1,15)
+    assert to_service_date(dt.date(2026,1,15)) == dt.date(2026,1,15)
+    assert to_service_date(None) == dt.date.today()
+    assert to_service_date('not a date') == dt.date.today()
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metra.ingest import TABLE_SPECS
+from metra.snapshot import FeedSnapshot
+from metra.static import StaticAPI
+
+from conftest import PUBLISHED
+from conftest import synthetic_feed
+
+MORNING = PUBLISHED.replace(hour=10)
+
+@pytest.fixture
+def saved(static_api,tmp_path):
+    api = static_api(synthetic_feed([('R0000_T00000',5)]),eager=True)
+    path = str(tmp_path / 'feed.snap')
+    api.save_snapshot(path)
+    return api, path
+
+def test_round_trip(saved):
+    api, path = saved
+    snapshot = FeedSnapshot(path)
+    assert sorted(snapshot) == sorted(TABLE_SPECS)
+    assert snapshot.base_dt == PUBLISHED.replace(hour=0)
+    for name in TABLE_SPECS:
+        pd.testing.assert_frame_equal(snapshot.table(name),getattr(api,name)())
+    assert snapshot.table('stop_times')['arrival_time'].isna().sum() == 1
+
+def test_columns_are_views_of_the_mapping(saved):
+    _, path = saved
+    stop_times = FeedSnapshot(path).table('stop_times')
+    for col in ('arrival_time','stop_sequence'):
+        assert not stop_times[col].to_numpy().flags.writeable
+    # string columns are rebuilt unless they are categorical
+    assert stop_times['trip_id'].to_numpy().flags.writeable
+
+    categorical = FeedSnapshot(path,categorical=True).table('stop_times')
+    assert isinstance(categorical['trip_id'].dtype,pd.CategoricalDtype)
+    assert not categorical['trip_id'].cat.codes.to_numpy().flags.writeable
+    pd.testing.assert_frame_equal(categorical.astype(stop_times.dtypes.to_dict()),stop_times)
+
+@pytest.mark.parametrize('categorical',[False,True])
+def test_attached_api_answers_queries(saved,categorical):
+    api, path = saved
+    attached = StaticAPI(snapshot=FeedSnapshot(path,categorical=categorical))
+    expected = api.next_trains('R0001S04','CUS',date=MORNING)
+    assert len(expected)
+    pd.testing.assert_frame_equal(attached.next_trains('R0001S04','CUS',date=MORNING),expected,check_categorical=False,check_dtype=not categorical)
+    pd.testing.assert_frame_equal(attached.upcoming_schedule(date=MORNING),api.upcoming_schedule(date=MORNING),check_categorical=False,check_dtype=not categorical)
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'feed.snap'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        FeedSnapshot(str(path))
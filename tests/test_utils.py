@@ -0,0 +1,99 @@
+import os
+import json
+import hashlib
+import zipfile
+
+import pytest
+import requests
+
+import metra.cache
+import metra.utils
+from metra.utils import update_schedule_zip
+
+from conftest import Response
+from conftest import synthetic_feed
+
+PUBLISHED = '01/15/2026 06:00:00 AM'
+FEED = synthetic_feed()
+
+@pytest.fixture
+def data_path(tmp_path,monkeypatch,server):
+    monkeypatch.setattr(metra.utils,'DATA_PATH',str(tmp_path))
+    monkeypatch.setattr(metra.utils,'METRA_BASE',server.url)
+    monkeypatch.setattr(metra.utils,'_auth',lambda: ('key','secret'))
+    monkeypatch.setattr(metra.cache,'CACHE_PATH',str(tmp_path / 'cache'))
+    return tmp_path
+
+def route(server,published:str=PUBLISHED,feed:bytes=FEED) -> None:
+    server.route('/raw/published.txt',Response(f'{published}\r\n'.encode()))
+    server.route('/raw/schedule.zip',Response(feed))
+
+def manifest(data_path) -> dict:
+    return json.loads((data_path / 'schedule.json').read_text())
+
+def leftovers(data_path) -> list[str]:
+    return [p.name for p in data_path.iterdir() if p.name.startswith('.schedule.')]
+
+def test_download_swaps_in_feed(data_path,server):
+    route(server)
+    assert update_schedule_zip()
+    zip_path = data_path / 'schedule.zip'
+    assert zip_path.read_bytes() == FEED
+    assert manifest(data_path)['published'] == PUBLISHED
+    assert manifest(data_path)['sha256'] == hashlib.sha256(FEED).hexdigest()
+    assert 'stop_times.txt' in manifest(data_path)['members']
+    assert (data_path / 'last_published.txt').read_text() == PUBLISHED
+    # the usual umask permissions, not mkstemp's owner-only ones
+    umask = os.umask(0)
+    os.umask(umask)
+    assert zip_path.stat().st_mode & 0o777 == 0o666 & ~umask
+    assert leftovers(data_path) == []
+
+def test_skips_download_when_published_unchanged(data_path,server):
+    route(server)
+    assert update_schedule_zip()
+    assert not update_schedule_zip()
+    assert len(server.requests_to('/raw/schedule.zip')) == 1
+    assert update_schedule_zip(force=True)
+    assert len(server.requests_to('/raw/schedule.zip')) == 2
+
+def test_keeps_feed_when_content_unchanged(data_path,server):
+    route(server)
+    assert update_schedule_zip()
+    inode = (data_path / 'schedule.zip').stat().st_ino
+    route(server,published='01/16/2026 06:00:00 AM')
+    assert not update_schedule_zip()
+    assert (data_path / 'schedule.zip').stat().st_ino == inode
+    assert manifest(data_path)['published'] == '01/16/2026 06:00:00 AM'
+    assert (data_path / 'last_published.txt').read_text() == '01/16/2026 06:00:00 AM'
+    assert leftovers(data_path) == []
+
+@pytest.mark.parametrize('feed',[FEED[:len(FEED)//2],b'not a zip'],ids=['truncated','garbage'])
+def test_corrupt_download_keeps_old_feed(data_path,server,feed):
+    route(server)
+    assert update_schedule_zip()
+    route(server,published='01/16/2026 06:00:00 AM',feed=feed)
+    with pytest.raises(zipfile.BadZipFile):
+        update_schedule_zip()
+    assert (data_path / 'schedule.zip').read_bytes() == FEED
+    assert manifest(data_path)['published'] == PUBLISHED
+    assert leftovers(data_path) == []
+
+def test_missing_member_is_rejected(data_path,server):
+    with zipfile.ZipFile(data_path / 'partial.zip','w') as zf:
+        zf.writestr('stops.txt','stop_id\n')
+    route(server,feed=(data_path / 'partial.zip').read_bytes())
+    with pytest.raises(zipfile.BadZipFile):
+        update_schedule_zip()
+    assert not (data_path / 'schedule.zip').exists()
+
+@pytest.mark.parametrize('status',[401,503])
+def test_failed_publish_time_writes_nothing(data_path,server,status):
+    route(server)
+    assert update_schedule_zip()
+    server.route('/raw/published.txt',Response(b'Unauthorized',status=status))
+    with pytest.raises(requests.HTTPError):
+        update_schedule_zip()
+    assert manifest(data_path)['published'] == PUBLISHED
+    assert (data_path / 'last_published.txt').read_text() == PUBLISHED
+    assert len(server.requests_to('/raw/schedule.zip')) == 1